@@ -24,8 +24,8 @@ from app.models import user, card, tag, link, kanban
 # Alembic Config对象
 config = context.config
 
-# 设置数据库URL（从配置中获取）
-config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
+# 设置数据库URL（从配置中获取，迁移始终使用同步驱动）
+config.set_main_option("sqlalchemy.url", settings.sync_database_url)
 
 # 解释日志配置
 if config.config_file_name is not None:
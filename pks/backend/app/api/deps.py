@@ -6,11 +6,10 @@ API依赖注入
 from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from app.db.session import get_db
-from app.core.security import verify_token
-from app.models.user import User
-from app.services.auth_service import AuthService
+from app.db.session import get_db, DBSession
+from app.core.security import verify_token, get_cached_principal, cache_principal
+from app.schemas.user import UserPrincipal
+from app.services.auth_service import AsyncAuthService
 
 # OAuth2 密码模式
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
@@ -18,17 +17,21 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
+    db: DBSession = Depends(get_db)
+) -> UserPrincipal:
     """
     获取当前登录用户
 
+    已解码的Token和用户身份（id、is_active、is_superuser）保存在认证缓存中，
+    缓存命中时不查询数据库；用户信息变更或被禁用时缓存会主动失效。
+    需要完整用户信息的接口应自行按 id 加载。
+
     Args:
         token: JWT Token
         db: 数据库会话
 
     Returns:
-        User: 当前用户对象
+        UserPrincipal: 当前用户身份
 
     Raises:
         HTTPException: Token无效或用户不存在
@@ -44,27 +47,34 @@ async def get_current_user(
     if payload is None:
         raise credentials_exception
 
-    user_id: int = int(payload.get("sub"))
-    if user_id is None:
+    try:
+        user_id = int(payload.get("sub"))
+    except (TypeError, ValueError):
         raise credentials_exception
 
-    # 获取用户
-    user = AuthService.get_user_by_id(db, user_id=user_id)
-    if user is None:
-        raise credentials_exception
+    # 优先使用缓存的用户身份
+    principal = get_cached_principal(user_id)
+    if principal is None:
+        # 获取用户（在线程池或异步会话中执行，不阻塞事件循环）
+        user = await AsyncAuthService.get_user_by_id(db, user_id=user_id)
+        if user is None:
+            raise credentials_exception
+
+        principal = UserPrincipal.model_validate(user)
+        cache_principal(principal)
 
-    if not user.is_active:
+    if not principal.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="用户已被禁用"
         )
 
-    return user
+    return principal
 
 
 async def get_current_active_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: UserPrincipal = Depends(get_current_user)
+) -> UserPrincipal:
     """
     获取当前活跃用户
 
@@ -72,7 +82,7 @@ async def get_current_active_user(
         current_user: 当前用户
 
     Returns:
-        User: 当前活跃用户对象
+        UserPrincipal: 当前活跃用户身份
 
     Raises:
         HTTPException: 用户不活跃
@@ -86,8 +96,8 @@ async def get_current_active_user(
 
 
 async def get_current_superuser(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: UserPrincipal = Depends(get_current_user)
+) -> UserPrincipal:
     """
     获取当前超级用户
 
@@ -95,7 +105,7 @@ async def get_current_superuser(
         current_user: 当前用户
 
     Returns:
-        User: 当前超级用户对象
+        UserPrincipal: 当前超级用户身份
 
     Raises:
         HTTPException: 用户不是超级用户
@@ -2,33 +2,49 @@
 认证相关API路由
 """
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.db.session import get_db
-from app.api.deps import get_current_user
-from app.models.user import User
+from app.db.session import get_db, DBSession
+from app.api.deps import get_current_user, get_current_superuser
 from app.schemas.user import (
     UserCreate,
+    UserActiveUpdate,
     UserResponse,
     UserWithToken,
+    UserPrincipal,
     LoginRequest,
     Token
 )
-from app.services.auth_service import AuthService
+from app.core.password_pool import password_pool, PasswordHashBusy, RETRY_AFTER_SECONDS
+from app.services.auth_service import AuthService, AsyncAuthService, authenticate_user_async
 from app.schemas.common import ApiResponse
 
 router = APIRouter()
 
 
+def _busy_error(e: PasswordHashBusy) -> HTTPException:
+    """密码哈希排队已满时的响应"""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=str(e),
+        headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+    )
+
+
 @router.post("/register", response_model=ApiResponse[UserWithToken], status_code=status.HTTP_201_CREATED)
-def register(user_in: UserCreate, db: Session = Depends(get_db)):
+async def register(user_in: UserCreate, db: DBSession = Depends(get_db)):
     """
     用户注册
 
     创建新用户并返回访问令牌
     """
+    try:
+        # 密码哈希在独立的执行池中计算
+        password_hash = await password_pool.hash(user_in.password)
+    except PasswordHashBusy as e:
+        raise _busy_error(e)
+
     try:
         # 创建用户
-        user = AuthService.create_user(db, user_in)
+        user = await AsyncAuthService.create_user(db, user_in, password_hash)
 
         # 生成Token
         tokens = AuthService.create_user_tokens(user)
@@ -54,19 +70,22 @@ def register(user_in: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=ApiResponse[UserWithToken])
-def login(user_credentials: LoginRequest, db: Session = Depends(get_db)):
+async def login(user_credentials: LoginRequest, db: DBSession = Depends(get_db)):
     """
     用户登录
 
-    支持用户名或邮箱登录
+    支持用户名或邮箱登录；登录请求过多时返回503（带 Retry-After 头）
     """
     # 验证用户
-    user = AuthService.authenticate_user(
-        db,
-        username=user_credentials.username,
-        email=user_credentials.email,
-        password=user_credentials.password
-    )
+    try:
+        user = await authenticate_user_async(
+            db,
+            username=user_credentials.username,
+            email=user_credentials.email,
+            password=user_credentials.password
+        )
+    except PasswordHashBusy as e:
+        raise _busy_error(e)
 
     if not user:
         raise HTTPException(
@@ -94,14 +113,52 @@ def login(user_credentials: LoginRequest, db: Session = Depends(get_db)):
 
 
 @router.get("/me", response_model=ApiResponse[UserResponse])
-def get_current_user_info(current_user: User = Depends(get_current_user)):
+async def get_current_user_info(
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: DBSession = Depends(get_db)
+):
     """
     获取当前用户信息
 
     需要认证
     """
+    user = await AsyncAuthService.get_user_by_id(db, current_user.id)
+
     return ApiResponse(
         code=0,
         message="success",
-        data=current_user
+        data=user
+    )
+
+
+@router.put("/users/{user_id}/active", response_model=ApiResponse[UserResponse])
+async def set_user_active(
+    user_id: int,
+    request: UserActiveUpdate,
+    current_user: UserPrincipal = Depends(get_current_superuser),
+    db: DBSession = Depends(get_db)
+):
+    """
+    启用或禁用用户
+
+    需要超级用户；禁用立即生效（认证缓存中的用户身份随之失效）
+    """
+    if user_id == current_user.id and not request.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="不能禁用当前用户"
+        )
+
+    user = await AsyncAuthService.get_user_by_id(db, user_id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="用户不存在"
+        )
+
+    user = await AsyncAuthService.set_user_active(db, user, request.is_active)
+    return ApiResponse(
+        code=0,
+        message="更新成功",
+        data=user
     )
@@ -0,0 +1,88 @@
+"""
+备份与恢复相关API路由
+"""
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi.responses import StreamingResponse
+from app.db.session import get_db, DBSession
+from app.api.deps import get_current_user, get_current_superuser
+from app.schemas.user import UserPrincipal
+from app.schemas.backup import RestoreResponse
+from app.schemas.common import ApiResponse
+from app.services.backup_service import (
+    iter_backup,
+    iter_sqlite_snapshot,
+    restore_archive,
+    sqlite_database_path
+)
+
+router = APIRouter()
+
+
+def _attachment(filename: str) -> dict:
+    """下载文件名响应头"""
+    return {"Content-Disposition": f'attachment; filename="{filename}"'}
+
+
+@router.get("")
+async def download_backup(
+    current_user: UserPrincipal = Depends(get_current_user)
+):
+    """下载当前用户的备份（标签、文件、卡片、链接和看板，gzip 压缩的 NDJSON 流）"""
+    filename = f"pks-backup-{current_user.id}-{datetime.now():%Y%m%d%H%M%S}.ndjson.gz"
+    return StreamingResponse(
+        iter_backup(current_user.id),
+        media_type="application/gzip",
+        headers=_attachment(filename)
+    )
+
+
+@router.post("/restore", response_model=ApiResponse[RestoreResponse])
+async def restore_backup(
+    request: Request,
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: DBSession = Depends(get_db)
+):
+    """
+    从单用户备份恢复到当前用户
+
+    请求体为备份文件内容，边接收边解压、按批写入；当前用户需没有卡片、标签和看板列。
+    """
+    try:
+        result = await restore_archive(db, request.stream(), current_user.id)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    return ApiResponse(
+        code=0,
+        message="恢复完成",
+        data=result
+    )
+
+
+@router.get("/instance")
+async def download_instance_backup(
+    current_user: UserPrincipal = Depends(get_current_superuser)
+):
+    """
+    下载整个实例的备份（需要超级用户）
+
+    SQLite 文件数据库返回在线备份 API 生成的数据库快照（gzip 压缩的 .db 文件），
+    其他数据库返回包含全部用户的逻辑备份，使用 scripts/restore.py 恢复。
+    """
+    timestamp = f"{datetime.now():%Y%m%d%H%M%S}"
+    if sqlite_database_path() is not None:
+        return StreamingResponse(
+            iter_sqlite_snapshot(),
+            media_type="application/gzip",
+            headers=_attachment(f"pks-{timestamp}.db.gz")
+        )
+
+    return StreamingResponse(
+        iter_backup(),
+        media_type="application/gzip",
+        headers=_attachment(f"pks-backup-instance-{timestamp}.ndjson.gz")
+    )
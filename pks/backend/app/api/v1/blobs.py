@@ -0,0 +1,119 @@
+"""
+上传文件相关API路由
+"""
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, status, File, Header, UploadFile
+from fastapi.responses import Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.db.session import get_db, DBSession
+from app.api.deps import get_current_user
+from app.schemas.user import UserPrincipal
+from app.schemas.blob import BlobResponse
+from app.schemas.common import ApiResponse
+from app.services.blob_service import AsyncBlobService, blob_data, sniff_content_type
+from app.services.blob_store import blob_store, BlobTooLargeError, CHUNK_SIZE
+from app.utils.http_range import ranged_file_response
+
+router = APIRouter()
+
+
+@router.post("", response_model=ApiResponse[BlobResponse], status_code=status.HTTP_201_CREATED)
+async def upload_blob(
+    file: UploadFile = File(..., description="上传的文件"),
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: DBSession = Depends(get_db)
+):
+    """上传文件（按内容去重，返回的 url 可作为图片卡片的内容）"""
+    # 文件按块写入存储并计算哈希，不整体读入内存
+    head = await file.read(16)
+    await file.seek(0)
+    content_type = file.content_type
+    if not content_type or content_type == "application/octet-stream":
+        content_type = sniff_content_type(head)
+
+    try:
+        sha256, size = await run_in_threadpool(
+            blob_store.put, file.file, settings.MAX_UPLOAD_SIZE
+        )
+    except BlobTooLargeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e)
+        )
+
+    blob = await AsyncBlobService.register_blob(
+        db,
+        current_user.id,
+        sha256,
+        size,
+        content_type,
+        filename=file.filename
+    )
+
+    return ApiResponse(
+        code=0,
+        message="上传成功",
+        data=blob_data(blob)
+    )
+
+
+@router.get("/{blob_id}")
+async def download_blob(
+    blob_id: int,
+    range_header: Optional[str] = Header(None, alias="Range"),
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: DBSession = Depends(get_db)
+):
+    """下载文件（支持 Range 请求；内容不可变，可长期缓存）"""
+    blob = await AsyncBlobService.get_blob(db, blob_id, current_user.id)
+
+    if not blob or not blob_store.exists(blob.sha256):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="文件不存在"
+        )
+
+    etag = f'"{blob.sha256}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"private, max-age={settings.BLOB_CACHE_MAX_AGE}, immutable",
+    }
+
+    if if_none_match and etag in [value.strip() for value in if_none_match.split(",")]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    path = blob_store.local_path(blob.sha256)
+    if path is not None:
+        return ranged_file_response(path, blob.content_type, range_header, headers)
+
+    # 非本地存储：流式读取完整内容
+    def iter_blob():
+        with blob_store.open(blob.sha256) as f:
+            while chunk := f.read(CHUNK_SIZE):
+                yield chunk
+
+    return StreamingResponse(
+        iter_blob(),
+        media_type=blob.content_type,
+        headers={**headers, "Content-Length": str(blob.size)}
+    )
+
+
+@router.delete("/{blob_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_blob(
+    blob_id: int,
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: DBSession = Depends(get_db)
+):
+    """删除文件"""
+    blob = await AsyncBlobService.get_blob(db, blob_id, current_user.id)
+
+    if not blob:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="文件不存在"
+        )
+
+    await AsyncBlobService.delete_blob(db, blob)
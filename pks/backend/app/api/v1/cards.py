@@ -2,11 +2,13 @@
 卡片相关API路由
 """
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from app.db.session import get_db
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.responses import StreamingResponse
+from app.core.config import settings
+from app.db.session import get_db, DBSession
 from app.api.deps import get_current_user
-from app.models.user import User
+from app.core.query_budget import query_budget
+from app.schemas.user import UserPrincipal
 from app.models.card import CardType
 from app.schemas.card import (
     CardCreate,
@@ -17,23 +19,28 @@ from app.schemas.card import (
     BatchDeleteRequest,
     BatchDeleteResponse,
     BatchTagRequest,
-    BatchTagResponse
+    BatchTagResponse,
+    CardImportResponse
 )
 from app.schemas.common import ApiResponse, PaginatedResponse
-from app.services.card_service import CardService
+from app.services.card_service import CardService, AsyncCardService
+from app.services.transfer_service import import_records, iter_export
+from app.utils.projection import parse_fields, card_list_item
+from app.utils.ndjson import iter_json_records
 
 router = APIRouter()
 
 
 @router.post("", response_model=ApiResponse[CardResponse], status_code=status.HTTP_201_CREATED)
-def create_card(
+@query_budget(10)
+async def create_card(
     card_in: CardCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: DBSession = Depends(get_db)
 ):
     """创建卡片"""
     try:
-        card = CardService.create_card(db, current_user.id, card_in)
+        card = await AsyncCardService.create_card(db, current_user.id, card_in)
 
         # 构建标签数据
         tags_data = []
@@ -72,21 +79,29 @@ def create_card(
 
 
 @router.get("", response_model=ApiResponse[PaginatedResponse])
-def get_cards(
+async def get_cards(
     page: int = Query(1, ge=1, description="页码"),
     page_size: int = Query(20, ge=1, le=100, description="每页数量"),
     card_type: Optional[str] = Query(None, description="卡片类型"),
     tag_id: Optional[int] = Query(None, description="标签ID"),
+    include_descendants: bool = Query(False, description="标签筛选是否包含子孙标签"),
     is_pinned: Optional[str] = Query(None, description="是否置顶"),
     search: Optional[str] = Query(None, description="搜索关键词"),
     sort_by: str = Query("created_at", description="排序字段"),
     order: str = Query("desc", regex="^(asc|desc)$", description="排序方向"),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="分页游标（传入时忽略page）"),
+    with_total: Optional[bool] = Query(None, description="是否统计总数（默认仅首页统计）"),
+    fields: Optional[str] = Query(None, description="额外返回的字段（逗号分隔，如 content）"),
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: DBSession = Depends(get_db)
 ):
     """获取卡片列表"""
     skip = (page - 1) * page_size
 
+    # 游标翻页时默认不再统计总数
+    if with_total is None:
+        with_total = cursor is None
+
     # 处理 card_type 参数（空字符串转为 None）
     parsed_card_type = None
     if card_type and card_type.strip():
@@ -100,34 +115,44 @@ def get_cards(
     if is_pinned is not None and is_pinned.strip():
         parsed_is_pinned = is_pinned.lower() in ('true', '1', 'yes')
 
-    cards, total = CardService.get_cards(
-        db,
-        current_user.id,
-        skip=skip,
-        limit=page_size,
-        card_type=parsed_card_type,
-        tag_id=tag_id,
-        is_pinned=parsed_is_pinned,
-        search=search,
-        sort_by=sort_by,
-        order=order
-    )
+    try:
+        extra_fields = parse_fields(fields)
+        cards, total, next_cursor = await AsyncCardService.get_cards(
+            db,
+            current_user.id,
+            skip=skip,
+            limit=page_size,
+            card_type=parsed_card_type,
+            tag_id=tag_id,
+            include_descendants=include_descendants,
+            is_pinned=parsed_is_pinned,
+            search=search,
+            sort_by=sort_by,
+            order=order,
+            cursor=cursor,
+            with_total=with_total,
+            fields=extra_fields
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
 
-    total_pages = (total + page_size - 1) // page_size
+    total_pages = None
+    if total is not None:
+        total_pages = (total + page_size - 1) // page_size
 
-    # 转换 Card 对象为字典
+    # 转换 Card 对象为字典（只包含摘要，完整内容需通过 fields 请求）
     items_data = []
     for card in cards:
         items_data.append({
-            "id": card.id,
-            "title": card.title,
-            "content": card.content,
-            "card_type": card.card_type,
+            **card_list_item(card, extra_fields),
             "user_id": card.user_id,
-            "is_pinned": card.is_pinned,
-            "view_count": card.view_count,
-            "created_at": card.created_at,
-            "updated_at": card.updated_at
+            "tags": [
+                {"id": ct.tag.id, "name": ct.tag.name, "color": ct.tag.color}
+                for ct in card.tags
+            ]
         })
 
     return ApiResponse(
@@ -138,19 +163,55 @@ def get_cards(
             total=total,
             page=page,
             page_size=page_size,
-            total_pages=total_pages
+            total_pages=total_pages,
+            next_cursor=next_cursor
         )
     )
 
 
+@router.post("/import", response_model=ApiResponse[CardImportResponse])
+async def import_cards(
+    request: Request,
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: DBSession = Depends(get_db)
+):
+    """
+    批量导入卡片、标签和链接
+
+    请求体为 NDJSON（每行一条记录）或 JSON 数组，边接收边解析，按批写入；
+    无效记录计入 errors，不影响其他记录。记录格式与导出一致。
+    """
+    records = iter_json_records(request.stream(), settings.IMPORT_MAX_RECORD_SIZE)
+    result = await import_records(db, current_user.id, records)
+
+    return ApiResponse(
+        code=0,
+        message="导入完成",
+        data=result
+    )
+
+
+@router.get("/export")
+async def export_cards(
+    current_user: UserPrincipal = Depends(get_current_user)
+):
+    """导出当前用户的全部标签、卡片和链接（NDJSON 流）"""
+    return StreamingResponse(
+        iter_export(current_user.id),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="pks-export.ndjson"'}
+    )
+
+
 @router.get("/{card_id}", response_model=ApiResponse[CardDetailResponse])
-def get_card(
+@query_budget(5)
+async def get_card(
     card_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: DBSession = Depends(get_db)
 ):
     """获取卡片详情"""
-    card = CardService.get_card_by_id(db, card_id, current_user.id)
+    card = await AsyncCardService.get_card_by_id(db, card_id, current_user.id)
 
     if not card:
         raise HTTPException(
@@ -158,11 +219,11 @@ def get_card(
             detail="卡片不存在"
         )
 
-    # 增加浏览次数
-    CardService.increment_view_count(db, card)
+    # 增加浏览次数（不写数据库，由后台任务批量写回）
+    view_count = CardService.increment_view_count(card)
 
     # 获取链接信息
-    links = CardService.get_card_links(db, card)
+    links = await AsyncCardService.get_card_links(db, card)
 
     # 转换 Card 对象为字典
     card_data = {
@@ -172,7 +233,7 @@ def get_card(
         "card_type": card.card_type,
         "user_id": card.user_id,
         "is_pinned": card.is_pinned,
-        "view_count": card.view_count,
+        "view_count": view_count,
         "created_at": card.created_at,
         "updated_at": card.updated_at
     }
@@ -188,14 +249,15 @@ def get_card(
 
 
 @router.put("/{card_id}", response_model=ApiResponse[CardResponse])
-def update_card(
+@query_budget(10)
+async def update_card(
     card_id: int,
     card_in: CardUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: DBSession = Depends(get_db)
 ):
     """更新卡片"""
-    card = CardService.get_card_by_id(db, card_id, current_user.id)
+    card = await AsyncCardService.get_card_by_id(db, card_id, current_user.id)
 
     if not card:
         raise HTTPException(
@@ -204,7 +266,7 @@ def update_card(
         )
 
     try:
-        updated_card = CardService.update_card(db, card, card_in)
+        updated_card = await AsyncCardService.update_card(db, card, card_in)
 
         # 构建标签数据
         tags_data = []
@@ -243,13 +305,13 @@ def update_card(
 
 
 @router.delete("/{card_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_card(
+async def delete_card(
     card_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: DBSession = Depends(get_db)
 ):
     """删除卡片"""
-    card = CardService.get_card_by_id(db, card_id, current_user.id)
+    card = await AsyncCardService.get_card_by_id(db, card_id, current_user.id)
 
     if not card:
         raise HTTPException(
@@ -257,17 +319,17 @@ def delete_card(
             detail="卡片不存在"
         )
 
-    CardService.delete_card(db, card)
+    await AsyncCardService.delete_card(db, card)
 
 
 @router.post("/batch-delete", response_model=ApiResponse[BatchDeleteResponse])
-def batch_delete_cards(
+async def batch_delete_cards(
     request: BatchDeleteRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: DBSession = Depends(get_db)
 ):
     """批量删除卡片"""
-    deleted_count = CardService.batch_delete_cards(
+    deleted_count = await AsyncCardService.batch_delete_cards(
         db,
         request.card_ids,
         current_user.id
@@ -278,3 +340,46 @@ def batch_delete_cards(
         message="删除成功",
         data={"deleted_count": deleted_count}
     )
+
+
+@router.post("/batch-tag", response_model=ApiResponse[BatchTagResponse])
+@query_budget(5)
+async def batch_tag_cards(
+    request: BatchTagRequest,
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: DBSession = Depends(get_db)
+):
+    """批量为卡片打标签"""
+    affected_count = await AsyncCardService.batch_tag_cards(
+        db,
+        request.card_ids,
+        request.tag_ids,
+        current_user.id
+    )
+
+    return ApiResponse(
+        code=0,
+        message="打标签成功",
+        data={"affected_count": affected_count}
+    )
+
+
+@router.post("/batch-untag", response_model=ApiResponse[BatchTagResponse])
+async def batch_untag_cards(
+    request: BatchTagRequest,
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: DBSession = Depends(get_db)
+):
+    """批量移除卡片标签"""
+    affected_count = await AsyncCardService.batch_untag_cards(
+        db,
+        request.card_ids,
+        request.tag_ids,
+        current_user.id
+    )
+
+    return ApiResponse(
+        code=0,
+        message="移除标签成功",
+        data={"affected_count": affected_count}
+    )
@@ -1,36 +1,47 @@
 """
 看板相关API路由
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.db.session import get_db
+from typing import Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query
+from app.db.session import get_db, DBSession
 from app.api.deps import get_current_user
-from app.models.user import User
+from app.core.query_budget import query_budget
+from app.schemas.user import UserPrincipal
 from app.schemas.kanban import (
     KanbanColumnCreate,
     KanbanColumnUpdate,
+    KanbanColumnResponse,
     KanbanBoardResponse,
+    KanbanColumnCardsResponse,
     MoveCardRequest,
     MoveCardResponse,
     BatchMoveRequest,
-    BatchMoveResponse
+    BatchMoveResponse,
+    BoardMovesRequest,
+    BoardMovesResponse
 )
 from app.schemas.common import ApiResponse
-from app.services.kanban_service import KanbanService
+from app.services.kanban_service import KanbanService, AsyncKanbanService
 
 router = APIRouter()
 
 
 @router.get("", response_model=ApiResponse[KanbanBoardResponse])
-def get_kanban_board(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+@query_budget(8)
+async def get_kanban_board(
+    cards_limit: Optional[int] = Query(None, ge=1, le=500, description="每列最多返回的卡片数"),
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: DBSession = Depends(get_db)
 ):
     """获取看板配置"""
     # 初始化默认列（如果是第一次）
-    KanbanService.init_default_columns(db, current_user.id)
+    await AsyncKanbanService.init_default_columns(db, current_user.id)
 
-    columns = KanbanService.get_kanban_board(db, current_user.id)
+    columns = await AsyncKanbanService.get_kanban_board(
+        db,
+        current_user.id,
+        cards_limit=cards_limit
+    )
 
     return ApiResponse(
         code=0,
@@ -39,41 +50,65 @@ def get_kanban_board(
     )
 
 
-@router.post("/columns", response_model=ApiResponse, status_code=status.HTTP_201_CREATED)
-def create_column(
-    column_in: KanbanColumnCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+@router.get("/columns/{column_id}/cards", response_model=ApiResponse[KanbanColumnCardsResponse])
+async def get_column_cards(
+    column_id: int,
+    cursor: Optional[str] = Query(None, description="上一页返回的游标"),
+    limit: int = Query(50, ge=1, le=500, description="每页数量"),
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: DBSession = Depends(get_db)
 ):
-    """创建看板列"""
+    """加载看板列中的更多卡片"""
     try:
-        column = KanbanService.create_column(db, current_user.id, column_in)
+        result = await AsyncKanbanService.get_column_cards(
+            db,
+            current_user.id,
+            column_id,
+            cursor=cursor,
+            limit=limit
+        )
         return ApiResponse(
             code=0,
-            message="创建成功",
-            data=column
+            message="success",
+            data=result
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
         )
+
+
+@router.post("/columns", response_model=ApiResponse[KanbanColumnResponse], status_code=status.HTTP_201_CREATED)
+async def create_column(
+    column_in: KanbanColumnCreate,
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: DBSession = Depends(get_db)
+):
+    """创建看板列（插入到指定位置）"""
+    try:
+        column = await AsyncKanbanService.create_column(db, current_user.id, column_in)
     except ValueError as e:
         raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
+            status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
+    return ApiResponse(
+        code=0,
+        message="创建成功",
+        data=column
+    )
 
 
-@router.put("/columns/{column_id}", response_model=ApiResponse)
-def update_column(
+@router.put("/columns/{column_id}", response_model=ApiResponse[KanbanColumnResponse])
+async def update_column(
     column_id: int,
     column_in: KanbanColumnUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: DBSession = Depends(get_db)
 ):
     """更新看板列"""
-    from app.models.kanban import KanbanColumn
-
-    column = db.query(KanbanColumn).filter(
-        KanbanColumn.id == column_id,
-        KanbanColumn.user_id == current_user.id
-    ).first()
+    column = await AsyncKanbanService.get_column_by_id(db, column_id, current_user.id)
 
     if not column:
         raise HTTPException(
@@ -82,32 +117,27 @@ def update_column(
         )
 
     try:
-        updated_column = KanbanService.update_column(db, column, column_in)
-        return ApiResponse(
-            code=0,
-            message="更新成功",
-            data=updated_column
-        )
+        updated_column = await AsyncKanbanService.update_column(db, column, column_in)
     except ValueError as e:
         raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
+            status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
+    return ApiResponse(
+        code=0,
+        message="更新成功",
+        data=updated_column
+    )
 
 
 @router.delete("/columns/{column_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_column(
+async def delete_column(
     column_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: DBSession = Depends(get_db)
 ):
     """删除看板列"""
-    from app.models.kanban import KanbanColumn
-
-    column = db.query(KanbanColumn).filter(
-        KanbanColumn.id == column_id,
-        KanbanColumn.user_id == current_user.id
-    ).first()
+    column = await AsyncKanbanService.get_column_by_id(db, column_id, current_user.id)
 
     if not column:
         raise HTTPException(
@@ -115,24 +145,27 @@ def delete_column(
             detail="列不存在"
         )
 
-    KanbanService.delete_column(db, column)
+    await AsyncKanbanService.delete_column(db, column)
 
 
 @router.post("/cards/move", response_model=ApiResponse[MoveCardResponse])
-def move_card(
+async def move_card(
     request: MoveCardRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    background_tasks: BackgroundTasks,
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: DBSession = Depends(get_db)
 ):
     """移动卡片到指定列的指定位置"""
     try:
-        result = KanbanService.move_card(
+        result = await AsyncKanbanService.move_card(
             db,
             current_user.id,
             request.card_id,
             request.column_id,
             request.position
         )
+        # 排序键过长时在后台重新分配
+        background_tasks.add_task(KanbanService.rebalance_if_needed, [result])
         return ApiResponse(
             code=0,
             message="移动成功",
@@ -146,23 +179,52 @@ def move_card(
 
 
 @router.post("/cards/batch-move", response_model=ApiResponse[BatchMoveResponse])
-def batch_move_cards(
+async def batch_move_cards(
     request: BatchMoveRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    background_tasks: BackgroundTasks,
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: DBSession = Depends(get_db)
 ):
     """批量移动卡片到指定列"""
     try:
-        moved_count = KanbanService.batch_move_cards(
+        result = await AsyncKanbanService.batch_move_cards(
             db,
             current_user.id,
             request.card_ids,
             request.target_column_id
         )
+        background_tasks.add_task(KanbanService.rebalance_if_needed, result["changes"])
+        return ApiResponse(
+            code=0,
+            message="移动成功",
+            data=result
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+@router.post("/cards/moves", response_model=ApiResponse[BoardMovesResponse])
+async def apply_moves(
+    request: BoardMovesRequest,
+    background_tasks: BackgroundTasks,
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: DBSession = Depends(get_db)
+):
+    """按顺序执行一次拖拽会话中的多个移动操作，返回位置变化"""
+    try:
+        result = await AsyncKanbanService.apply_moves(
+            db,
+            current_user.id,
+            [(move.card_id, move.column_id, move.position) for move in request.moves]
+        )
+        background_tasks.add_task(KanbanService.rebalance_if_needed, result["changes"])
         return ApiResponse(
             code=0,
             message="移动成功",
-            data={"moved_count": moved_count}
+            data=result
         )
     except ValueError as e:
         raise HTTPException(
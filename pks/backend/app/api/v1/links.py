@@ -4,14 +4,16 @@
 from typing import Optional
 from pydantic import BaseModel, Field
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Body
-from sqlalchemy.orm import Session
-from app.db.session import get_db
+from app.db.session import get_db, DBSession
 from app.api.deps import get_current_user
-from app.models.user import User
+from app.core.query_budget import query_budget
+from app.schemas.user import UserPrincipal
 from app.models.link import LinkType
 from app.schemas.card import CardLinkInfo
 from app.schemas.common import ApiResponse
-from app.services.card_service import CardService
+from app.core.config import settings
+from app.services.card_service import AsyncCardService
+from app.services.graph_service import AsyncGraphService
 
 
 class CardLinkCreate(BaseModel):
@@ -24,14 +26,14 @@ router = APIRouter()
 
 
 @router.post("/{card_id}/links", response_model=ApiResponse, status_code=status.HTTP_201_CREATED)
-def create_card_link(
+async def create_card_link(
     card_id: int,
     link_in: CardLinkCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: DBSession = Depends(get_db)
 ):
     """创建卡片链接（双向）"""
-    source_card = CardService.get_card_by_id(db, card_id, current_user.id)
+    source_card = await AsyncCardService.get_card_by_id(db, card_id, current_user.id)
 
     if not source_card:
         raise HTTPException(
@@ -40,7 +42,7 @@ def create_card_link(
         )
 
     try:
-        link_info = CardService.create_card_link(
+        link_info = await AsyncCardService.create_card_link(
             db,
             source_card,
             link_in.target_card_id,
@@ -59,14 +61,15 @@ def create_card_link(
 
 
 @router.get("/{card_id}/links", response_model=ApiResponse)
-def get_card_links(
+@query_budget(4)
+async def get_card_links(
     card_id: int,
     link_type: Optional[LinkType] = Query(None, description="链接类型"),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: DBSession = Depends(get_db)
 ):
     """获取卡片的所有链接"""
-    card = CardService.get_card_by_id(db, card_id, current_user.id)
+    card = await AsyncCardService.get_card_by_id(db, card_id, current_user.id)
 
     if not card:
         raise HTTPException(
@@ -74,19 +77,7 @@ def get_card_links(
             detail="卡片不存在"
         )
 
-    links = CardService.get_card_links(db, card)
-
-    # 如果指定了链接类型，进行过滤
-    if link_type:
-        links["outgoing"] = [
-            link for link in links["outgoing"]
-            if link["link_type"] == link_type
-        ]
-        links["incoming"] = [
-            link for link in links["incoming"]
-            if link["link_type"] == link_type
-        ]
-        links["total"] = len(links["outgoing"]) + len(links["incoming"])
+    links = await AsyncCardService.get_card_links(db, card, link_type=link_type)
 
     return ApiResponse(
         code=0,
@@ -96,14 +87,14 @@ def get_card_links(
 
 
 @router.delete("/{card_id}/links/{target_card_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_card_link(
+async def delete_card_link(
     card_id: int,
     target_card_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: DBSession = Depends(get_db)
 ):
     """删除卡片链接（双向）"""
-    source_card = CardService.get_card_by_id(db, card_id, current_user.id)
+    source_card = await AsyncCardService.get_card_by_id(db, card_id, current_user.id)
 
     if not source_card:
         raise HTTPException(
@@ -111,4 +102,85 @@ def delete_card_link(
             detail="源卡片不存在"
         )
 
-    CardService.delete_card_link(db, source_card, target_card_id)
+    await AsyncCardService.delete_card_link(db, source_card, target_card_id)
+
+
+@router.get("/graph/components", response_model=ApiResponse)
+async def get_graph_components(
+    min_size: int = Query(2, ge=1, description="最小分量大小"),
+    limit: int = Query(20, ge=1, le=100, description="最多返回的分量数"),
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: DBSession = Depends(get_db)
+):
+    """获取链接图的连通分量（按大小降序）"""
+    components = await AsyncGraphService.get_components(
+        db, current_user.id, min_size=min_size, limit=limit
+    )
+
+    return ApiResponse(
+        code=0,
+        message="success",
+        data=components
+    )
+
+
+@router.get("/{card_id}/graph", response_model=ApiResponse)
+async def get_card_graph(
+    card_id: int,
+    depth: int = Query(2, ge=1, le=settings.GRAPH_MAX_DEPTH, description="最大跳数"),
+    limit: int = Query(100, ge=1, le=settings.GRAPH_MAX_NODES, description="最多返回的节点数"),
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: DBSession = Depends(get_db)
+):
+    """获取卡片的 k 跳邻域（节点和链接）"""
+    card = await AsyncCardService.get_card_by_id(db, card_id, current_user.id)
+
+    if not card:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="卡片不存在"
+        )
+
+    graph = await AsyncGraphService.get_neighbourhood(
+        db, current_user.id, card_id, depth=depth, max_nodes=limit
+    )
+
+    return ApiResponse(
+        code=0,
+        message="success",
+        data=graph
+    )
+
+
+@router.get("/{card_id}/path/{target_card_id}", response_model=ApiResponse)
+async def get_card_path(
+    card_id: int,
+    target_card_id: int,
+    max_depth: int = Query(6, ge=1, le=2 * settings.GRAPH_MAX_DEPTH, description="最大路径长度"),
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: DBSession = Depends(get_db)
+):
+    """获取两张卡片之间的最短链接路径"""
+    card = await AsyncCardService.get_card_by_id(db, card_id, current_user.id)
+
+    if not card:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="源卡片不存在"
+        )
+
+    try:
+        path = await AsyncGraphService.shortest_path(
+            db, current_user.id, card_id, target_card_id, max_depth=max_depth
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+
+    return ApiResponse(
+        code=0,
+        message="success",
+        data=path
+    )
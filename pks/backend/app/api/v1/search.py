@@ -3,37 +3,53 @@
 """
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from app.db.session import get_db
+from app.db.session import get_db, DBSession
 from app.api.deps import get_current_user
-from app.models.user import User
+from app.schemas.user import UserPrincipal
 from app.schemas.search import SearchQuery, SearchResponse
 from app.schemas.common import ApiResponse
-from app.services.search_service import SearchService
+from app.services.search_service import AsyncSearchService
+from app.utils.projection import parse_fields
 
 router = APIRouter()
 
 
 @router.get("", response_model=ApiResponse[SearchResponse])
-def global_search(
+async def global_search(
     q: str = Query(..., min_length=1, description="搜索关键词"),
     type: str = Query("all", regex="^(all|cards|tags)$", description="搜索类型"),
     page: int = Query(1, ge=1, description="页码"),
     page_size: int = Query(20, ge=1, le=100, description="每页数量"),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="卡片结果分页游标（传入时忽略page）"),
+    with_total: Optional[bool] = Query(None, description="是否统计卡片总数（默认仅首页统计）"),
+    fields: Optional[str] = Query(None, description="卡片结果额外返回的字段（逗号分隔，如 content）"),
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: DBSession = Depends(get_db)
 ):
     """全局搜索"""
     skip = (page - 1) * page_size
 
-    result = SearchService.global_search(
-        db,
-        current_user.id,
-        q,
-        search_type=type,
-        skip=skip,
-        limit=page_size
-    )
+    # 游标翻页时默认不再统计总数
+    if with_total is None:
+        with_total = cursor is None
+
+    try:
+        result = await AsyncSearchService.global_search(
+            db,
+            current_user.id,
+            q,
+            search_type=type,
+            skip=skip,
+            limit=page_size,
+            cursor=cursor,
+            with_total=with_total,
+            fields=parse_fields(fields)
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
 
     return ApiResponse(
         code=0,
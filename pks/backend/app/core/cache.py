@@ -0,0 +1,105 @@
+"""
+进程内缓存
+
+线程安全的 LRU + TTL 缓存，带命中/未命中计数。
+缓存仅在当前进程内有效，多进程部署时各 worker 独立缓存，
+数据一致性依赖 TTL 上限和写操作时的主动失效。
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class TTLCache:
+    """LRU + TTL 缓存"""
+
+    def __init__(self, max_size: int = 1024, ttl: float = 60.0):
+        """
+        Args:
+            max_size: 最大条目数，超出时淘汰最久未使用的条目
+            ttl: 默认过期时间（秒）
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        读取缓存
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            Optional[Any]: 缓存值，不存在或已过期返回None
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        写入缓存
+
+        Args:
+            key: 缓存键
+            value: 缓存值
+            ttl: 过期时间（秒），None 使用默认值
+        """
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0 or self.max_size <= 0:
+            return
+
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        """
+        删除缓存
+
+        Args:
+            key: 缓存键
+        """
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        获取缓存统计
+
+        Returns:
+            Dict[str, int]: 条目数、命中数和未命中数
+        """
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+    def __len__(self) -> int:
+        return len(self._data)
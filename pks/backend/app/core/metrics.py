@@ -0,0 +1,401 @@
+"""
+请求级性能指标
+
+- MetricsMiddleware 按路由统计请求耗时、响应字节数，以及每个请求执行的SQL语句数和耗时
+- SQL 统计使用 SQLAlchemy 的 before_cursor_execute / after_cursor_execute 事件，
+  通过 contextvars 归集到所属请求（线程池和 AsyncSession.run_sync 中执行的语句同样计入）
+- 耗时超过 SLOW_QUERY_THRESHOLD_MS 的语句写入 pks.slow_query 日志
+- render_metrics 输出 Prometheus 文本格式，同时汇总连接池、认证缓存、
+  响应缓存和密码哈希执行池的统计
+"""
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.routing import Match
+from app.core.config import settings
+
+# 请求耗时和SQL耗时的桶上限（秒）
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# 每个请求的SQL语句数的桶上限
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+# 响应字节数的桶上限
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# 慢查询日志中语句的最大字符数
+SLOW_QUERY_MAX_CHARS = 2000
+
+# 未匹配任何路由的请求（404等）使用的路由标签，避免路径参数导致标签数量无限增长
+UNMATCHED_ROUTE = "unmatched"
+
+slow_query_logger = logging.getLogger("pks.slow_query")
+
+
+class Histogram:
+    """直方图（各桶计数、总和、最大值）"""
+
+    def __init__(self, buckets: Iterable[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        """记录一个值（调用方负责加锁）"""
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        获取统计快照
+
+        Returns:
+            Dict[str, Any]: 次数、总和、最大值、平均值和各桶计数（非累计）
+        """
+        labels = [f"le_{bound}" for bound in self.buckets] + ["le_inf"]
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "max": round(self.max, 6),
+            "avg": round(self.sum / self.count, 6) if self.count else 0.0,
+            "histogram": dict(zip(labels, self.counts))
+        }
+
+
+class RequestStats:
+    """单个请求执行的SQL统计"""
+
+    __slots__ = ("method", "path", "queries", "query_seconds")
+
+    def __init__(self, method: str = "", path: str = ""):
+        self.method = method
+        self.path = path
+        self.queries = 0
+        self.query_seconds = 0.0
+
+
+# 当前请求的SQL统计（请求之外为None）
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("pks_request_stats", default=None)
+
+
+class RequestMetrics:
+    """按 (方法, 路由) 汇总的请求指标"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """清空统计"""
+        with self._lock:
+            self.requests: Dict[Tuple[str, str, str], int] = {}
+            self.latency: Dict[Tuple[str, str], Histogram] = {}
+            self.response_bytes: Dict[Tuple[str, str], Histogram] = {}
+            self.request_queries: Dict[Tuple[str, str], Histogram] = {}
+            self.request_query_seconds: Dict[Tuple[str, str], Histogram] = {}
+            self.queries = 0
+            self.slow_queries = 0
+            self.query_latency = Histogram(LATENCY_BUCKETS)
+
+    def observe_request(
+        self,
+        method: str,
+        route: str,
+        status: int,
+        seconds: float,
+        size: int,
+        stats: RequestStats
+    ) -> None:
+        """
+        记录一个请求
+
+        Args:
+            method: 请求方法
+            route: 路由模板（如 /api/v1/cards/{card_id}）
+            status: 响应状态码
+            seconds: 耗时（秒）
+            size: 响应体字节数
+            stats: 请求的SQL统计
+        """
+        key = (method, route)
+        with self._lock:
+            status_key = (method, route, str(status))
+            self.requests[status_key] = self.requests.get(status_key, 0) + 1
+            for family, buckets, value in (
+                (self.latency, LATENCY_BUCKETS, seconds),
+                (self.response_bytes, SIZE_BUCKETS, size),
+                (self.request_queries, QUERY_COUNT_BUCKETS, stats.queries),
+                (self.request_query_seconds, LATENCY_BUCKETS, stats.query_seconds),
+            ):
+                histogram = family.get(key)
+                if histogram is None:
+                    histogram = family[key] = Histogram(buckets)
+                histogram.observe(value)
+
+    def observe_query(self, seconds: float, slow: bool) -> None:
+        """记录一条SQL语句"""
+        with self._lock:
+            self.queries += 1
+            self.query_latency.observe(seconds)
+            if slow:
+                self.slow_queries += 1
+
+
+# 全局请求指标
+request_metrics = RequestMetrics()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("query_start")
+    if not starts:
+        return
+    seconds = time.perf_counter() - starts.pop()
+
+    stats = current_request.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.query_seconds += seconds
+
+    threshold = settings.SLOW_QUERY_THRESHOLD_MS
+    slow = threshold > 0 and seconds * 1000 >= threshold
+    request_metrics.observe_query(seconds, slow)
+    if slow:
+        slow_query_logger.warning(
+            "慢查询 %.1fms [%s %s]: %s",
+            seconds * 1000,
+            stats.method if stats else "-",
+            stats.path if stats else "-",
+            " ".join(statement.split())[:SLOW_QUERY_MAX_CHARS]
+        )
+
+
+_listeners_installed = False
+
+
+def install_query_listeners() -> None:
+    """为所有引擎（含异步引擎的同步内核）注册SQL计时事件（幂等）"""
+    global _listeners_installed
+    if _listeners_installed:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    _listeners_installed = True
+
+
+# 端点函数 -> 路由模板
+_route_templates: Dict[Any, str] = {}
+
+
+def route_template(scope: Dict[str, Any]) -> str:
+    """
+    获取请求匹配的路由模板
+
+    路由匹配后 scope 中有 endpoint；未经过路由的请求（如响应缓存命中）按路由表匹配。
+
+    Args:
+        scope: ASGI scope
+
+    Returns:
+        str: 路由模板，未匹配时为 UNMATCHED_ROUTE
+    """
+    app = scope.get("app")
+    routes = getattr(app, "routes", [])
+
+    endpoint = scope.get("endpoint")
+    if endpoint is not None:
+        template = _route_templates.get(endpoint)
+        if template is not None:
+            return template
+        for route in routes:
+            if getattr(route, "endpoint", None) is endpoint:
+                _route_templates[endpoint] = route.path
+                return route.path
+
+    for route in routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", UNMATCHED_ROUTE)
+    return UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """
+    请求指标中间件
+
+    记录每个请求的耗时（到响应体发送完毕）、响应字节数、SQL语句数和SQL耗时。
+    需注册为最外层中间件，使缓存命中的请求同样被统计。
+    """
+
+    def __init__(self, app, metrics: RequestMetrics = request_metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope["method"], scope["path"])
+        token = current_request.set(stats)
+        status = 500
+        size = 0
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_request.reset(token)
+            self.metrics.observe_request(
+                scope["method"],
+                route_template(scope),
+                status,
+                time.perf_counter() - start,
+                size,
+                stats
+            )
+
+
+def _format_labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class _Writer:
+    """Prometheus 文本格式输出"""
+
+    def __init__(self):
+        self.lines: List[str] = []
+
+    def header(self, name: str, kind: str, help_text: str) -> None:
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+
+    def sample(self, name: str, value: Any, labels: Optional[Dict[str, Any]] = None) -> None:
+        self.lines.append(f"{name}{_format_labels(labels or {})} {value}")
+
+    def metric(self, name: str, kind: str, help_text: str, value: Any) -> None:
+        self.header(name, kind, help_text)
+        self.sample(name, value)
+
+    def histogram(self, name: str, buckets: Iterable[float], counts: List[int], total: float, labels: Optional[Dict[str, Any]] = None) -> None:
+        """输出一组直方图样本（counts 为各桶非累计计数，最后一个为 +Inf 桶）"""
+        labels = labels or {}
+        cumulative = 0
+        for bound, count in zip(list(buckets) + ["+Inf"], counts):
+            cumulative += count
+            self.sample(f"{name}_bucket", cumulative, {**labels, "le": bound})
+        self.sample(f"{name}_sum", round(total, 6), labels)
+        self.sample(f"{name}_count", cumulative, labels)
+
+    def render(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+
+def render_metrics() -> str:
+    """
+    生成 Prometheus 文本格式的指标
+
+    Returns:
+        str: 指标文本
+    """
+    from app.db.base import engine, async_engine
+    from app.db.pool import pool_status, WAIT_BUCKETS
+    from app.core.security import auth_cache_stats
+    from app.core.response_cache import response_cache
+    from app.core.password_pool import password_pool, LATENCY_BUCKETS as HASH_BUCKETS
+
+    out = _Writer()
+    metrics = request_metrics
+
+    with metrics._lock:
+        out.header("pks_http_requests_total", "counter", "HTTP请求数")
+        for (method, route, status), count in sorted(metrics.requests.items()):
+            out.sample("pks_http_requests_total", count, {"method": method, "route": route, "status": status})
+
+        for name, kind, family in (
+            ("pks_http_request_duration_seconds", "请求耗时（秒）", metrics.latency),
+            ("pks_http_response_size_bytes", "响应体字节数", metrics.response_bytes),
+            ("pks_http_request_queries", "每个请求执行的SQL语句数", metrics.request_queries),
+            ("pks_http_request_query_duration_seconds", "每个请求的SQL总耗时（秒）", metrics.request_query_seconds),
+        ):
+            out.header(name, "histogram", kind)
+            for (method, route), histogram in sorted(family.items()):
+                out.histogram(name, histogram.buckets, histogram.counts, histogram.sum, {"method": method, "route": route})
+
+        out.metric("pks_db_queries_total", "counter", "SQL语句数（含后台任务）", metrics.queries)
+        out.metric("pks_db_slow_queries_total", "counter", "超过慢查询阈值的SQL语句数", metrics.slow_queries)
+        out.header("pks_db_query_duration_seconds", "histogram", "SQL语句耗时（秒）")
+        query_latency = metrics.query_latency
+        out.histogram("pks_db_query_duration_seconds", query_latency.buckets, query_latency.counts, query_latency.sum)
+
+    # 连接池
+    active_engine = async_engine.sync_engine if async_engine is not None else engine
+    pool = pool_status(active_engine)
+    for key in ("size", "checked_in", "checked_out", "overflow"):
+        if key in pool:
+            out.metric(f"pks_db_pool_{key}", "gauge", f"连接池 {key}", pool[key])
+    checkout = pool["checkout"]
+    out.metric("pks_db_pool_checkout_timeouts_total", "counter", "取连接超时次数", checkout["timeouts"])
+    out.header("pks_db_pool_checkout_wait_seconds", "histogram", "取连接等待时间（秒）")
+    out.histogram(
+        "pks_db_pool_checkout_wait_seconds",
+        WAIT_BUCKETS,
+        list(checkout["wait_histogram"].values()),
+        checkout["wait_seconds_total"]
+    )
+
+    # 认证缓存和响应缓存
+    caches = [(f"auth_{name}", stats) for name, stats in auth_cache_stats().items()]
+    caches.append(("response", response_cache.stats()))
+    for suffix, kind, help_text in (
+        ("hits_total", "counter", "缓存命中次数"),
+        ("misses_total", "counter", "缓存未命中次数"),
+        ("size", "gauge", "缓存条目数"),
+    ):
+        name = f"pks_cache_{suffix}"
+        out.header(name, kind, help_text)
+        for cache, stats in caches:
+            key = suffix.replace("_total", "")
+            if key in stats:
+                out.sample(name, stats[key], {"cache": cache})
+
+    # 密码哈希执行池
+    hashing = password_pool.snapshot()
+    out.metric("pks_password_hash_pending", "gauge", "排队和计算中的密码哈希任务数", hashing["pending"])
+    for key in ("completed", "failed", "rejected"):
+        out.metric(f"pks_password_hash_{key}_total", "counter", f"密码哈希任务 {key} 次数", hashing[key])
+    for key, help_text in (("wait", "密码哈希排队时间（秒）"), ("run", "密码哈希计算时间（秒）")):
+        name = f"pks_password_hash_{key}_seconds"
+        out.header(name, "histogram", help_text)
+        histogram = hashing[key]
+        out.histogram(name, HASH_BUCKETS, list(histogram["histogram"].values()), histogram["sum"])
+
+    return out.render()
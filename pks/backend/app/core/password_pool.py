@@ -0,0 +1,202 @@
+"""
+密码哈希执行池
+
+bcrypt / argon2 的计算刻意设计得很慢（几十到几百毫秒）。在请求线程或异步会话中直接计算时，
+集中登录会占满 worker 线程，拖慢所有其他接口。这里将哈希计算放到独立的有界执行器：
+
+- 执行器大小由 PASSWORD_HASH_WORKERS 决定，与数据库线程池互不占用
+- 排队任务超过 PASSWORD_HASH_QUEUE_LIMIT 时立即拒绝（PasswordHashBusy），
+  由路由返回 503 和 Retry-After，而不是无限排队
+- 分别统计排队等待时间和计算耗时，登录延迟可单独观测
+
+执行器类型由 PASSWORD_HASH_EXECUTOR 决定：thread（默认，bcrypt 和 argon2-cffi
+计算时释放GIL）或 process（子进程按相同配置构建哈希上下文）。
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+from app.core.config import settings
+from app.core import security
+from app.core.metrics import Histogram
+
+# 耗时直方图的桶上限（秒）
+LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# 拒绝请求时建议的重试间隔（秒）
+RETRY_AFTER_SECONDS = 1
+
+
+class PasswordHashBusy(RuntimeError):
+    """密码哈希排队已满"""
+
+
+def _timed(fn: Callable[..., Any], *args: Any) -> Tuple[Any, float, float]:
+    """
+    在执行器中运行函数并记录起止时间
+
+    使用 time.monotonic（系统范围的单调时钟），子进程中记录的时间可与主进程比较。
+    """
+    started = time.monotonic()
+    result = fn(*args)
+    return result, started, time.monotonic()
+
+
+class PasswordHashPool:
+    """有界的密码哈希执行池"""
+
+    def __init__(self, workers: int, queue_limit: int, executor: str = "thread"):
+        """
+        Args:
+            workers: 并发计算数
+            queue_limit: 计算槽位之外允许排队的任务数
+            executor: 执行器类型（thread / process）
+        """
+        if executor not in ("thread", "process"):
+            raise ValueError(f"不支持的密码哈希执行器: {executor}")
+
+        self.workers = max(1, workers)
+        self.queue_limit = max(0, queue_limit)
+        self.executor_type = executor
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.reset()
+
+    def reset(self) -> None:
+        """清空统计"""
+        with self._lock:
+            self.completed = 0
+            self.failed = 0
+            self.rejected = 0
+            self.pending_max = 0
+            self.wait = Histogram(LATENCY_BUCKETS)
+            self.run = Histogram(LATENCY_BUCKETS)
+
+    def _get_executor(self) -> Executor:
+        """获取执行器（首次使用时创建）"""
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.executor_type == "process":
+                        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                    else:
+                        self._executor = ThreadPoolExecutor(
+                            max_workers=self.workers,
+                            thread_name_prefix="password-hash"
+                        )
+        return self._executor
+
+    def _acquire(self) -> None:
+        """占用一个排队名额，已满时抛出 PasswordHashBusy"""
+        with self._lock:
+            if self._pending >= self.workers + self.queue_limit:
+                self.rejected += 1
+                raise PasswordHashBusy("登录请求过多，请稍后重试")
+            self._pending += 1
+            self.pending_max = max(self.pending_max, self._pending)
+
+    def _release(self, submitted: float, future: Future) -> None:
+        """任务结束后释放名额并记录耗时（任务真正结束时调用，不受调用方取消影响）"""
+        with self._lock:
+            self._pending -= 1
+            if future.cancelled() or future.exception() is not None:
+                self.failed += 1
+                return
+            _, started, finished = future.result()
+            self.completed += 1
+            self.wait.observe(max(started - submitted, 0.0))
+            self.run.observe(finished - started)
+
+    async def submit(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        在执行池中运行函数
+
+        Args:
+            fn: 模块级函数（process 执行器需要可序列化）
+            *args: 函数参数
+
+        Returns:
+            函数返回值
+
+        Raises:
+            PasswordHashBusy: 排队已满
+        """
+        self._acquire()
+        submitted = time.monotonic()
+        try:
+            future = self._get_executor().submit(_timed, fn, *args)
+        except BaseException:
+            with self._lock:
+                self._pending -= 1
+            raise
+
+        future.add_done_callback(lambda f: self._release(submitted, f))
+        result, _, _ = await asyncio.wrap_future(future)
+        return result
+
+    async def hash(self, password: str) -> str:
+        """
+        对密码进行哈希
+
+        Args:
+            password: 明文密码
+
+        Returns:
+            str: 哈希后的密码
+        """
+        return await self.submit(security.get_password_hash, password)
+
+    async def verify_and_update(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """
+        验证密码，哈希方案或参数已变更时同时返回新哈希
+
+        Args:
+            password: 明文密码
+            hashed: 已保存的哈希
+
+        Returns:
+            Tuple[bool, Optional[str]]: 是否匹配，以及需要保存的新哈希（无需更新时为None）
+        """
+        return await self.submit(security.verify_and_update_password, password, hashed)
+
+    async def dummy_verify(self) -> None:
+        """执行一次与真实验证耗时相当的空验证（用户不存在时使用，避免通过响应时间探测用户名）"""
+        await self.submit(security.dummy_verify_password)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        获取统计快照
+
+        Returns:
+            Dict[str, Any]: 执行池配置、排队数、完成/失败/拒绝次数和耗时直方图
+        """
+        with self._lock:
+            return {
+                "executor": self.executor_type,
+                "workers": self.workers,
+                "queue_limit": self.queue_limit,
+                "pending": self._pending,
+                "pending_max": self.pending_max,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "wait": self.wait.snapshot(),
+                "run": self.run.snapshot()
+            }
+
+    def shutdown(self) -> None:
+        """关闭执行器（等待进行中的任务结束）"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+# 全局执行池
+password_pool = PasswordHashPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    queue_limit=settings.PASSWORD_HASH_QUEUE_LIMIT,
+    executor=settings.PASSWORD_HASH_EXECUTOR
+)
@@ -0,0 +1,256 @@
+"""
+SQL 查询预算（N+1 检测）
+
+在路由或服务函数上声明允许执行的SQL语句数，超出预算或同一形状的语句重复过多时
+抛出 QueryBudgetExceeded 或发出警告，用于在测试中发现逐行查询导致的性能回退：
+
+    @router.get("/{card_id}")
+    @query_budget(6)
+    async def get_card(...):
+        ...
+
+    with query_budget(3) as budget:
+        CardService.batch_tag_cards(db, card_ids, tag_ids, user_id)
+    assert budget.queries == 3
+
+语句通过 after_cursor_execute 事件记录，与 app.core.metrics 的请求统计一样
+借助 contextvars 归集到所属的调用（线程池和 AsyncSession.run_sync 中执行的语句同样计入）。
+语句形状去掉字面量并合并 IN 列表和多值 INSERT 中的占位符，循环中按不同ID执行的同一查询视为同一形状。
+
+仅在 DEBUG 或 pytest 下生效（可用 QUERY_BUDGET_ENABLED 覆盖），其他情况下不记录任何语句。
+"""
+import functools
+import inspect
+import logging
+import re
+import sys
+import warnings
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Callable, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+
+# 报告中每条语句形状的最大字符数
+SHAPE_MAX_CHARS = 300
+
+logger = logging.getLogger("pks.query_budget")
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w$])\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"\?|%\(\w+\)s|%s|\$\d+")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_VALUES_ROWS = re.compile(r"\(\?, \.\.\.\)(?:, \(\?, \.\.\.\))+")
+
+
+class QueryBudgetExceeded(AssertionError):
+    """SQL语句数超出预算"""
+
+
+class QueryBudgetWarning(UserWarning):
+    """SQL语句数超出预算（警告模式）"""
+
+
+@functools.lru_cache(maxsize=2048)
+def statement_shape(statement: str) -> str:
+    """
+    计算语句形状
+
+    Args:
+        statement: 发送给数据库驱动的SQL语句
+
+    Returns:
+        str: 去掉字面量、统一占位符并合并 IN 列表和多值 INSERT 后的语句
+    """
+    shape = " ".join(statement.split())
+    shape = _STRING.sub("?", shape)
+    shape = _PLACEHOLDER.sub("?", shape)
+    shape = _NUMBER.sub("?", shape)
+    shape = _IN_LIST.sub("(?, ...)", shape)
+    return _VALUES_ROWS.sub("(?, ...), ...", shape)
+
+
+class QueryRecorder:
+    """记录一次调用中执行的SQL语句"""
+
+    def __init__(self):
+        self.queries = 0
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str) -> None:
+        self.queries += 1
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, max_repeats: int) -> List[Tuple[str, int]]:
+        """
+        获取重复次数超过上限的语句形状
+
+        Args:
+            max_repeats: 同一形状允许执行的次数
+
+        Returns:
+            List[Tuple[str, int]]: (语句形状, 次数)，按次数降序
+        """
+        return [(shape, count) for shape, count in self.shapes.most_common() if count > max_repeats]
+
+
+# 当前生效的记录器（预算可以嵌套，每层独立计数）
+_active: ContextVar[Tuple[QueryRecorder, ...]] = ContextVar("pks_query_budget", default=())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    for recorder in _active.get():
+        recorder.record(statement)
+
+
+_listener_installed = False
+
+
+def _install_listener() -> None:
+    """注册语句记录事件（幂等，首次启用预算时调用）"""
+    global _listener_installed
+    if not _listener_installed:
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        _listener_installed = True
+
+
+def _under_pytest() -> bool:
+    return "pytest" in sys.modules
+
+
+def budget_enabled() -> bool:
+    """查询预算是否生效（QUERY_BUDGET_ENABLED 未设置时为 DEBUG 或 pytest 下）"""
+    if settings.QUERY_BUDGET_ENABLED is not None:
+        return settings.QUERY_BUDGET_ENABLED
+    return settings.DEBUG or _under_pytest()
+
+
+class QueryBudget:
+    """
+    SQL查询预算（上下文管理器或装饰器）
+
+    作为装饰器使用时每次调用独立计数，可用于同步函数和协程函数。
+    """
+
+    def __init__(
+        self,
+        max_queries: Optional[int] = None,
+        max_repeats: Optional[int] = None,
+        action: Optional[str] = None,
+        name: Optional[str] = None
+    ):
+        """
+        Args:
+            max_queries: 允许执行的SQL语句数（None表示不限制）
+            max_repeats: 同一形状的语句允许执行的次数（None使用 QUERY_BUDGET_MAX_REPEATS）
+            action: 超出预算时的处理（raise / warn，None使用 QUERY_BUDGET_ACTION，
+                未配置时 pytest 下为 raise，否则为 warn）
+            name: 报告中显示的名称（装饰器默认使用函数名）
+        """
+        if action not in (None, "raise", "warn"):
+            raise ValueError(f"不支持的查询预算处理方式: {action}")
+        self.max_queries = max_queries
+        self.max_repeats = max_repeats
+        self.action = action
+        self.name = name
+        self.recorder: Optional[QueryRecorder] = None
+        self._token = None
+
+    @property
+    def queries(self) -> int:
+        """已执行的SQL语句数（预算未生效时为0）"""
+        return self.recorder.queries if self.recorder else 0
+
+    def __enter__(self) -> "QueryBudget":
+        if budget_enabled():
+            _install_listener()
+            self.recorder = QueryRecorder()
+            self._token = _active.set(_active.get() + (self.recorder,))
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self._token is not None:
+            _active.reset(self._token)
+            self._token = None
+        # 调用本身失败时不再报告预算
+        if exc_type is None and self.recorder is not None:
+            self.check()
+
+    def violations(self) -> List[str]:
+        """
+        检查预算
+
+        Returns:
+            List[str]: 超出预算的说明（未超出时为空列表）
+        """
+        if self.recorder is None:
+            return []
+
+        problems = []
+        if self.max_queries is not None and self.recorder.queries > self.max_queries:
+            problems.append(f"执行了 {self.recorder.queries} 条SQL语句，预算为 {self.max_queries}")
+
+        max_repeats = self.max_repeats if self.max_repeats is not None else settings.QUERY_BUDGET_MAX_REPEATS
+        for shape, count in self.recorder.repeated(max_repeats):
+            problems.append(f"同一语句执行了 {count} 次（疑似 N+1，上限 {max_repeats}）: {shape[:SHAPE_MAX_CHARS]}")
+        return problems
+
+    def check(self) -> None:
+        """
+        超出预算时按 action 抛出异常或发出警告
+
+        Raises:
+            QueryBudgetExceeded: 超出预算且 action 为 raise
+        """
+        problems = self.violations()
+        if not problems:
+            return
+
+        message = f"查询预算超出 [{self.name or '-'}]: " + "；".join(problems)
+        action = self.action or settings.QUERY_BUDGET_ACTION or ("raise" if _under_pytest() else "warn")
+        if action == "raise":
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+        warnings.warn(message, QueryBudgetWarning, stacklevel=3)
+
+    def _copy(self, name: str) -> "QueryBudget":
+        return QueryBudget(self.max_queries, self.max_repeats, self.action, self.name or name)
+
+    def __call__(self, fn: Callable[..., Any]) -> Callable[..., Any]:
+        name = fn.__qualname__
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with self._copy(name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with self._copy(name):
+                return fn(*args, **kwargs)
+        return wrapper
+
+
+def query_budget(
+    max_queries: Optional[int] = None,
+    *,
+    max_repeats: Optional[int] = None,
+    action: Optional[str] = None,
+    name: Optional[str] = None
+) -> QueryBudget:
+    """
+    声明SQL查询预算
+
+    Args:
+        max_queries: 允许执行的SQL语句数（None表示只检查重复语句）
+        max_repeats: 同一形状的语句允许执行的次数
+        action: 超出预算时的处理（raise / warn）
+        name: 报告中显示的名称
+
+    Returns:
+        QueryBudget: 可用作上下文管理器或装饰器
+    """
+    return QueryBudget(max_queries, max_repeats=max_repeats, action=action, name=name)
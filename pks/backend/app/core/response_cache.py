@@ -0,0 +1,367 @@
+"""
+接口响应缓存
+
+按 (用户, 资源范围, 路径, 规范化查询参数) 缓存读多写少接口的序列化结果，
+并通过 ETag / If-None-Match 在内容未变化时直接返回 304。
+
+失效采用"版本号"方式：每个 (用户, 资源范围) 有一个随机版本号，缓存键包含版本号，
+服务层写操作提交后删除对应版本号即可使该用户该范围下的所有缓存失效（O(1)），
+旧条目由 LRU/TTL 自然淘汰。版本号丢失（淘汰或过期）时会生成新版本号，
+因此永远不会读到旧数据。
+
+后端可替换：默认进程内 LRU，多进程部署可使用 Redis 兼容后端
+（任何提供 get / set(ex=) / delete 的客户端均可，本地可用兼容实现替代）。
+"""
+import hashlib
+import math
+import secrets
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.security import decode_token, get_cached_principal
+
+# 资源范围
+SCOPE_CARDS = "cards"
+SCOPE_TAGS = "tags"
+SCOPE_KANBAN = "kanban"
+
+# 版本号的存活时间相对条目TTL的倍数
+_GENERATION_TTL_FACTOR = 10
+
+
+class MemoryCacheBackend:
+    """进程内 LRU 缓存后端"""
+
+    def __init__(self, max_size: int, ttl: float):
+        """
+        Args:
+            max_size: 最大条目数
+            ttl: 默认过期时间（秒）
+        """
+        self._cache = TTLCache(max_size=max_size, ttl=ttl)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._cache.get(key)
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._cache.set(key, value, ttl=ttl)
+
+    def delete(self, key: str) -> None:
+        self._cache.delete(key)
+
+    def stats(self) -> Dict[str, int]:
+        return self._cache.stats()
+
+
+class RedisCacheBackend:
+    """Redis 兼容缓存后端（多进程共享缓存和失效）"""
+
+    def __init__(self, client: Any, prefix: str = "pks:"):
+        """
+        Args:
+            client: 提供 get / set(ex=) / delete 的客户端（如 redis.Redis）
+            prefix: 键前缀
+        """
+        self._client = client
+        self._prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisCacheBackend":
+        """
+        根据URL创建后端
+
+        Args:
+            url: Redis URL
+
+        Returns:
+            RedisCacheBackend: 缓存后端
+
+        Raises:
+            RuntimeError: 未安装 redis 包
+        """
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("使用 Redis 响应缓存需要安装 redis 包: pip install redis")
+
+        return cls(redis.Redis.from_url(url))
+
+    def get(self, key: str) -> Optional[bytes]:
+        value = self._client.get(self._prefix + key)
+        if isinstance(value, str):
+            value = value.encode()
+        return value
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._client.set(self._prefix + key, value, ex=max(1, math.ceil(ttl)))
+
+    def delete(self, key: str) -> None:
+        self._client.delete(self._prefix + key)
+
+    def stats(self) -> Dict[str, int]:
+        return {}
+
+
+class ResponseCache:
+    """接口响应缓存"""
+
+    def __init__(self, backend: Optional[Any], ttl: float):
+        """
+        Args:
+            backend: 缓存后端，None 表示禁用
+            ttl: 条目过期时间（秒）
+        """
+        self.backend = backend
+        self.ttl = ttl
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None and self.ttl > 0
+
+    def _generation(self, user_id: int, scope: str) -> str:
+        """获取 (用户, 资源范围) 的当前版本号，不存在时生成新版本号"""
+        key = f"gen:{user_id}:{scope}"
+        value = self.backend.get(key)
+        if value is None:
+            value = secrets.token_hex(8).encode()
+            self.backend.set(key, value, self.ttl * _GENERATION_TTL_FACTOR)
+        return value.decode()
+
+    def build_key(self, user_id: int, scope: str, path: str, query_string: str) -> str:
+        """
+        构建缓存键
+
+        Args:
+            user_id: 用户ID
+            scope: 资源范围
+            path: 请求路径
+            query_string: 原始查询字符串
+
+        Returns:
+            str: 缓存键
+        """
+        query = urlencode(sorted(parse_qsl(query_string, keep_blank_values=True)))
+        generation = self._generation(user_id, scope)
+        return f"resp:{user_id}:{scope}:{generation}:{path}?{query}"
+
+    def get(self, key: str) -> Optional[Tuple[str, bytes]]:
+        """
+        读取缓存的响应
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            Optional[tuple]: (ETag, 响应体)
+        """
+        value = self.backend.get(key)
+        if value is None:
+            return None
+        etag, _, body = value.partition(b"\n")
+        return etag.decode(), body
+
+    def set(self, key: str, body: bytes) -> str:
+        """
+        写入响应
+
+        Args:
+            key: 缓存键
+            body: 响应体
+
+        Returns:
+            str: 响应的 ETag
+        """
+        etag = make_etag(body)
+        self.backend.set(key, etag.encode() + b"\n" + body, self.ttl)
+        return etag
+
+    def invalidate(self, user_id: int, *scopes: str) -> None:
+        """
+        使用户指定资源范围下的所有缓存失效
+
+        Args:
+            user_id: 用户ID
+            scopes: 资源范围
+        """
+        if not self.enabled:
+            return
+        for scope in scopes:
+            self.backend.delete(f"gen:{user_id}:{scope}")
+
+    def stats(self) -> Dict[str, int]:
+        """获取缓存统计"""
+        return self.backend.stats() if self.enabled else {}
+
+
+def make_etag(body: bytes) -> str:
+    """根据响应体生成 ETag"""
+    return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """判断 If-None-Match 是否匹配（忽略弱校验前缀）"""
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or etag in [
+        value[2:] if value.startswith("W/") else value for value in candidates
+    ]
+
+
+def _create_backend() -> Optional[Any]:
+    """根据配置创建缓存后端"""
+    backend = settings.RESPONSE_CACHE_BACKEND.lower()
+    if backend == "memory":
+        return MemoryCacheBackend(
+            max_size=settings.RESPONSE_CACHE_MAX_SIZE,
+            ttl=settings.RESPONSE_CACHE_TTL_SECONDS
+        )
+    if backend == "redis":
+        return RedisCacheBackend.from_url(settings.REDIS_URL)
+    return None
+
+
+# 全局实例
+response_cache = ResponseCache(_create_backend(), settings.RESPONSE_CACHE_TTL_SECONDS)
+
+
+class CachePolicy:
+    """可缓存接口的规则"""
+
+    def __init__(
+        self,
+        path: str,
+        scope: str,
+        condition: Optional[Callable[[Dict[str, str]], bool]] = None
+    ):
+        """
+        Args:
+            path: 请求路径
+            scope: 资源范围
+            condition: 根据查询参数判断是否缓存（None表示总是缓存）
+        """
+        self.path = path
+        self.scope = scope
+        self.condition = condition
+
+    def matches(self, path: str, query_string: str) -> bool:
+        if path != self.path:
+            return False
+        if self.condition is None:
+            return True
+        return self.condition(dict(parse_qsl(query_string, keep_blank_values=True)))
+
+
+def _is_first_page(params: Dict[str, str]) -> bool:
+    """卡片列表只缓存第一页"""
+    return "cursor" not in params and params.get("page", "1") == "1"
+
+
+CACHE_POLICIES: List[CachePolicy] = [
+    CachePolicy(f"{settings.API_V1_PREFIX}/tags", SCOPE_TAGS),
+    CachePolicy(f"{settings.API_V1_PREFIX}/tags/tree", SCOPE_TAGS),
+    CachePolicy(f"{settings.API_V1_PREFIX}/kanban", SCOPE_KANBAN),
+    CachePolicy(f"{settings.API_V1_PREFIX}/cards", SCOPE_CARDS, _is_first_page),
+]
+
+
+class ResponseCacheMiddleware:
+    """
+    响应缓存中间件
+
+    只处理 CACHE_POLICIES 中的 GET 请求：命中时直接返回缓存的响应体
+    （If-None-Match 匹配时返回 304），未命中时执行接口并缓存 200 响应。
+    只有认证缓存中存在且处于启用状态的用户才会命中缓存，
+    其余请求照常经过接口的认证流程。
+    """
+
+    def __init__(self, app, cache: ResponseCache = response_cache, policies: List[CachePolicy] = CACHE_POLICIES):
+        self.app = app
+        self.cache = cache
+        self.policies = policies
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET" or not self.cache.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        query_string = scope.get("query_string", b"").decode("latin-1")
+        policy = next((p for p in self.policies if p.matches(path, query_string)), None)
+        headers = {key.decode("latin-1").lower(): value.decode("latin-1") for key, value in scope["headers"]}
+        user_id = _user_id_from(headers.get("authorization", ""))
+
+        if policy is None or user_id is None:
+            await self.app(scope, receive, send)
+            return
+
+        key = self.cache.build_key(user_id, policy.scope, path, query_string)
+        if_none_match = headers.get("if-none-match")
+
+        principal = get_cached_principal(user_id)
+        if principal is not None and principal.is_active:
+            cached = self.cache.get(key)
+            if cached is not None:
+                etag, body = cached
+                await _send(send, etag, body, if_none_match)
+                return
+
+        # 未命中：执行接口并缓冲响应
+        start: Dict[str, Any] = {}
+        chunks: List[bytes] = []
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                start.update(message)
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, capture)
+        body = b"".join(chunks)
+
+        if start.get("status") != 200:
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        etag = self.cache.set(key, body)
+        await _send(send, etag, body, if_none_match, start.get("headers"))
+
+
+def _user_id_from(authorization: str) -> Optional[int]:
+    """从 Authorization 头解析用户ID（签名和过期时间由 decode_token 校验）"""
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+
+    payload = decode_token(token)
+    if payload is None or payload.get("type") != "access":
+        return None
+
+    try:
+        return int(payload.get("sub"))
+    except (TypeError, ValueError):
+        return None
+
+
+async def _send(send, etag: str, body: bytes, if_none_match: Optional[str], headers: Optional[list] = None) -> None:
+    """发送缓存响应，If-None-Match 匹配时返回 304"""
+    extra = [
+        (b"etag", etag.encode()),
+        (b"cache-control", b"private, no-cache"),
+    ]
+
+    if if_none_match and _etag_matches(if_none_match, etag):
+        await send({"type": "http.response.start", "status": 304, "headers": extra})
+        await send({"type": "http.response.body", "body": b""})
+        return
+
+    if headers is None:
+        headers = [(b"content-type", b"application/json")]
+    headers = [
+        (key, value) for key, value in headers
+        if key.lower() not in (b"content-length", b"etag", b"cache-control")
+    ]
+    headers += extra + [(b"content-length", str(len(body)).encode())]
+
+    await send({"type": "http.response.start", "status": 200, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
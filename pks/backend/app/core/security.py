@@ -3,14 +3,60 @@
 
 包含密码哈希、JWT Token生成和验证等安全功能
 """
+import time
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.core.config import settings
+from app.core.cache import TTLCache
 
-# 密码哈希上下文（使用bcrypt）
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# 支持的密码哈希方案（非默认方案的旧哈希仍可验证，登录时重新哈希）
+PASSWORD_SCHEMES = ("bcrypt", "argon2")
+
+
+def build_password_context() -> CryptContext:
+    """
+    根据配置构建密码哈希上下文
+
+    默认方案以外的哈希，以及参数（如 BCRYPT_ROUNDS）与当前配置不同的哈希
+    都视为需要更新，由 verify_and_update_password 返回新哈希。
+
+    Returns:
+        CryptContext: 密码哈希上下文
+
+    Raises:
+        ValueError: 不支持的哈希方案
+    """
+    scheme = settings.PASSWORD_HASH_SCHEME
+    if scheme not in PASSWORD_SCHEMES:
+        raise ValueError(f"不支持的密码哈希方案: {scheme}")
+
+    return CryptContext(
+        schemes=[scheme] + [other for other in PASSWORD_SCHEMES if other != scheme],
+        default=scheme,
+        deprecated="auto",
+        bcrypt__rounds=settings.BCRYPT_ROUNDS,
+        argon2__time_cost=settings.ARGON2_TIME_COST,
+        argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+        argon2__parallelism=settings.ARGON2_PARALLELISM
+    )
+
+
+# 密码哈希上下文
+pwd_context = build_password_context()
+
+# 已解码Token缓存（key为Token字符串）
+token_cache = TTLCache(
+    max_size=settings.AUTH_CACHE_MAX_SIZE,
+    ttl=settings.AUTH_CACHE_TTL_SECONDS
+)
+
+# 用户身份缓存（key为用户ID，值为 id / is_active / is_superuser）
+principal_cache = TTLCache(
+    max_size=settings.AUTH_CACHE_MAX_SIZE,
+    ttl=settings.AUTH_CACHE_TTL_SECONDS
+)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -40,6 +86,28 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def verify_and_update_password(
+    plain_password: str,
+    hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    验证密码，哈希方案或参数与当前配置不同时同时生成新哈希
+
+    Args:
+        plain_password: 明文密码
+        hashed_password: 哈希后的密码
+
+    Returns:
+        Tuple[bool, Optional[str]]: 是否匹配，以及需要保存的新哈希（无需更新时为None）
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+def dummy_verify_password() -> None:
+    """执行一次空验证（耗时与真实验证相当，用于用户不存在的情况）"""
+    pwd_context.dummy_verify()
+
+
 def create_access_token(
     data: Dict[str, Any],
     expires_delta: Optional[timedelta] = None
@@ -108,22 +176,34 @@ def decode_token(token: str) -> Optional[Dict[str, Any]]:
     """
     解码Token
 
+    解码成功的结果会缓存，缓存时间不超过Token本身的剩余有效期。
+
     Args:
         token: JWT Token
 
     Returns:
         Optional[Dict[str, Any]]: 解码后的数据，如果Token无效则返回None
     """
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
+
     try:
         payload = jwt.decode(
             token,
             settings.SECRET_KEY,
             algorithms=[settings.ALGORITHM]
         )
-        return payload
     except JWTError:
         return None
 
+    exp = payload.get("exp")
+    if exp is not None:
+        remaining = exp - time.time()
+        token_cache.set(token, payload, ttl=min(settings.AUTH_CACHE_TTL_SECONDS, remaining))
+
+    return payload
+
 
 def verify_token(token: str, token_type: str = "access") -> Optional[Dict[str, Any]]:
     """
@@ -146,3 +226,51 @@ def verify_token(token: str, token_type: str = "access") -> Optional[Dict[str, A
         return None
 
     return payload
+
+
+def get_cached_principal(user_id: int) -> Optional[Any]:
+    """
+    获取缓存的用户身份
+
+    Args:
+        user_id: 用户ID
+
+    Returns:
+        Optional[Any]: 用户身份，未缓存返回None
+    """
+    return principal_cache.get(user_id)
+
+
+def cache_principal(principal: Any) -> None:
+    """
+    缓存用户身份
+
+    Args:
+        principal: 用户身份（需包含 id 属性）
+    """
+    principal_cache.set(principal.id, principal)
+
+
+def invalidate_principal(user_id: int) -> None:
+    """
+    使用户身份缓存失效
+
+    用户信息变更或被禁用时调用
+
+    Args:
+        user_id: 用户ID
+    """
+    principal_cache.delete(user_id)
+
+
+def auth_cache_stats() -> Dict[str, Dict[str, int]]:
+    """
+    获取认证缓存统计
+
+    Returns:
+        Dict[str, Dict[str, int]]: Token缓存和用户身份缓存的命中统计
+    """
+    return {
+        "token": token_cache.stats(),
+        "principal": principal_cache.stats()
+    }
@@ -2,21 +2,49 @@
 数据库基础配置
 
 定义SQLAlchemy的Base和引擎配置
+
+DATABASE_URL 使用异步驱动时额外创建异步引擎和 AsyncSession 工厂；
+同步引擎始终存在，用于启动检查、迁移和脚本。
 """
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.db.pool import engine_options, configure_sqlite
 
-# 创建数据库引擎
-# check_same_thread=False 仅在SQLite时需要，允许多线程访问
+# 创建数据库引擎（连接池参数和SQLite PRAGMA见 app.db.pool）
 engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False} if settings.DATABASE_URL.startswith("sqlite") else {}
+    settings.sync_database_url,
+    **engine_options(settings.sync_database_url, is_async=False)
 )
+configure_sqlite(engine)
 
 # 创建SessionLocal类
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False: 提交后对象属性保持可读，避免在事件循环中触发隐式刷新查询
+SessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False,
+    bind=engine
+)
+
+# 异步引擎（仅在使用异步驱动时创建）
+async_engine = None
+AsyncSessionLocal = None
+
+if settings.is_async_database:
+    async_engine = create_async_engine(
+        settings.DATABASE_URL,
+        **engine_options(settings.DATABASE_URL, is_async=True)
+    )
+    configure_sqlite(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine,
+        class_=AsyncSession,
+        autoflush=False,
+        expire_on_commit=False
+    )
 
 # 创建Base类
 Base = declarative_base()
@@ -0,0 +1,196 @@
+"""
+连接池配置与监控
+
+- 根据 Settings 构建连接池参数
+- SQLite 连接建立时设置 WAL 等 PRAGMA
+- 统计连接池取连接（checkout）的等待时间，用于确定 worker 和连接池大小
+"""
+import threading
+import time
+from typing import Any, Dict
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from app.core.config import settings
+
+# 等待时间直方图的桶上限（秒）
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+class PoolMetrics:
+    """连接池取连接等待时间统计"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """清空统计"""
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.buckets = [0] * (len(WAIT_BUCKETS) + 1)
+
+    def observe(self, seconds: float, timed_out: bool = False) -> None:
+        """
+        记录一次取连接
+
+        Args:
+            seconds: 等待时间（秒）
+            timed_out: 是否等待超时
+        """
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+
+            self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            for i, bound in enumerate(WAIT_BUCKETS):
+                if seconds <= bound:
+                    self.buckets[i] += 1
+                    break
+            else:
+                self.buckets[-1] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        获取统计快照
+
+        Returns:
+            Dict[str, Any]: 取连接次数、超时次数、等待时间汇总和直方图
+        """
+        with self._lock:
+            labels = [f"le_{bound}" for bound in WAIT_BUCKETS] + ["le_inf"]
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": round(self.wait_total, 6),
+                "wait_seconds_max": round(self.wait_max, 6),
+                "wait_seconds_avg": round(self.wait_total / self.checkouts, 6) if self.checkouts else 0.0,
+                "wait_histogram": dict(zip(labels, self.buckets))
+            }
+
+
+# 全局统计实例（同步和异步引擎共用）
+pool_metrics = PoolMetrics()
+
+
+class _InstrumentedPoolMixin:
+    """统计取连接等待时间的连接池"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            pool_metrics.observe(time.perf_counter() - start, timed_out=True)
+            raise
+        pool_metrics.observe(time.perf_counter() - start)
+        return conn
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    """带等待时间统计的 QueuePool"""
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    """带等待时间统计的 AsyncAdaptedQueuePool"""
+
+
+def is_memory_sqlite(url: str) -> bool:
+    """是否为内存 SQLite 数据库（只能使用单连接池）"""
+    return url.startswith("sqlite") and (
+        url.split("://", 1)[-1] in ("", "/", "/:memory:") or "mode=memory" in url
+    )
+
+
+def engine_options(url: str, is_async: bool) -> Dict[str, Any]:
+    """
+    构建 create_engine / create_async_engine 的连接池参数
+
+    Args:
+        url: 数据库URL
+        is_async: 是否为异步引擎
+
+    Returns:
+        Dict[str, Any]: 引擎参数
+    """
+    options: Dict[str, Any] = {}
+
+    if url.startswith("sqlite"):
+        # check_same_thread=False 仅在SQLite时需要，允许多线程访问
+        options["connect_args"] = {"check_same_thread": False}
+
+    if is_memory_sqlite(url):
+        return options
+
+    options.update(
+        poolclass=InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING
+    )
+    return options
+
+
+def configure_sqlite(engine: Engine) -> None:
+    """
+    为 SQLite 引擎注册连接初始化 PRAGMA
+
+    WAL 模式允许读写并发，busy_timeout 让写锁冲突时等待而不是立即报
+    "database is locked"。
+
+    Args:
+        engine: 同步引擎（异步引擎传入 async_engine.sync_engine）
+    """
+    if engine.dialect.name != "sqlite" or not settings.SQLITE_TUNED:
+        return
+
+    pragmas = [
+        f"PRAGMA busy_timeout = {int(settings.SQLITE_BUSY_TIMEOUT_MS)}",
+        f"PRAGMA synchronous = {settings.SQLITE_SYNCHRONOUS}",
+        f"PRAGMA cache_size = {int(settings.SQLITE_CACHE_SIZE)}",
+        f"PRAGMA mmap_size = {int(settings.SQLITE_MMAP_SIZE)}",
+        "PRAGMA temp_store = MEMORY",
+    ]
+    if not is_memory_sqlite(str(engine.url)):
+        pragmas.insert(0, "PRAGMA journal_mode = WAL")
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+def pool_status(engine: Engine) -> Dict[str, Any]:
+    """
+    获取连接池状态
+
+    Args:
+        engine: 同步引擎
+
+    Returns:
+        Dict[str, Any]: 连接池当前占用情况和取连接等待统计
+    """
+    pool = engine.pool
+    status = {"pool_class": type(pool).__name__}
+
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow()
+        )
+
+    status["checkout"] = pool_metrics.snapshot()
+    return status
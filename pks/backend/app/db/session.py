@@ -2,26 +2,77 @@
 数据库会话管理
 
 提供数据库会话的依赖注入
+
+get_db 根据 DATABASE_URL 自动选择同步 Session 或异步 AsyncSession，
+run_in_session 在两种会话上统一执行同步的ORM代码：
+异步会话通过 run_sync 在驱动的协程上执行，同步会话放到线程池执行，
+两种模式下都不会阻塞事件循环。
 """
-from typing import Generator
+from typing import Any, AsyncGenerator, Callable, Generator, TypeVar, Union
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.db.base import SessionLocal
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.db.base import SessionLocal, AsyncSessionLocal
+
+R = TypeVar("R")
+
+# 路由和服务层接受的会话类型
+DBSession = Union[Session, AsyncSession]
 
 
-def get_db() -> Generator[Session, None, None]:
+def get_sync_db() -> Generator[Session, None, None]:
     """
-    获取数据库会话
+    获取同步数据库会话
 
     Yields:
         Session: SQLAlchemy会话对象
-
-    Example:
-        @app.get("/cards")
-        def get_cards(db: Session = Depends(get_db)):
-            return db.query(Card).all()
     """
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    获取异步数据库会话
+
+    Yields:
+        AsyncSession: SQLAlchemy异步会话对象
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# 获取数据库会话（根据 DATABASE_URL 选择同步或异步）
+#
+# Example:
+#     @app.get("/cards")
+#     async def get_cards(db: DBSession = Depends(get_db)):
+#         return await AsyncCardService.get_cards(db, user_id)
+get_db = get_async_db if settings.is_async_database else get_sync_db
+
+
+async def run_in_session(
+    db: DBSession,
+    fn: Callable[..., R],
+    *args: Any,
+    **kwargs: Any
+) -> R:
+    """
+    在会话上执行同步ORM函数
+
+    Args:
+        db: 同步或异步会话
+        fn: 第一个参数为 Session 的同步函数
+        *args: 传给 fn 的其余位置参数
+        **kwargs: 传给 fn 的关键字参数
+
+    Returns:
+        fn 的返回值
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
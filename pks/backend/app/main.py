@@ -3,10 +3,13 @@ FastAPI应用入口
 
 个人知识管理系统（PKS）后端服务
 """
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from app.core.config import settings
-from app.api.v1 import auth, cards, tags, links, search, kanban
+from app.core.response_cache import ResponseCacheMiddleware
+from app.core.metrics import MetricsMiddleware, install_query_listeners, render_metrics
+from app.api.v1 import auth, cards, tags, links, search, kanban, blobs, backup
 import os
 from pathlib import Path
 
@@ -19,6 +22,9 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
+# 响应缓存（需在CORS之前注册，使缓存命中的响应同样带有CORS头）
+app.add_middleware(ResponseCacheMiddleware)
+
 # 配置CORS
 app.add_middleware(
     CORSMiddleware,
@@ -26,8 +32,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
+# 请求指标（最后注册即最外层，缓存命中和CORS预检请求同样计入）
+if settings.METRICS_ENABLED:
+    install_query_listeners()
+    app.add_middleware(MetricsMiddleware)
+
 # 注册路由
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["认证"])
 app.include_router(cards.router, prefix="/api/v1/cards", tags=["卡片"])
@@ -35,6 +47,8 @@ app.include_router(tags.router, prefix="/api/v1/tags", tags=["标签"])
 app.include_router(links.router, prefix="/api/v1/cards", tags=["卡片链接"])
 app.include_router(search.router, prefix="/api/v1/search", tags=["搜索"])
 app.include_router(kanban.router, prefix="/api/v1/kanban", tags=["看板"])
+app.include_router(blobs.router, prefix="/api/v1/blobs", tags=["文件"])
+app.include_router(backup.router, prefix="/api/v1/backup", tags=["备份"])
 
 
 @app.on_event("startup")
@@ -83,11 +97,35 @@ async def startup_event():
     else:
         print("✓ 数据库已初始化")
 
+    # 创建全文索引（幂等）
+    from app.services.search_index import SearchIndex
+    if SearchIndex.ensure_index(engine):
+        print("✓ 全文索引已就绪")
+
+    # 启动浏览次数批量写回任务
+    from app.services.view_counter import view_counter
+    view_counter.start(engine, settings.VIEW_COUNT_FLUSH_INTERVAL)
+
     print("=" * 40)
     print("PKS Backend 已启动!")
     print("=" * 40)
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """应用关闭时写回浏览计数、关闭密码哈希执行池并释放数据库连接"""
+    from app.db.base import engine, async_engine
+    from app.services.view_counter import view_counter
+    from app.core.password_pool import password_pool
+
+    await view_counter.stop(engine)
+    password_pool.shutdown()
+
+    if async_engine is not None:
+        await async_engine.dispose()
+    engine.dispose()
+
+
 @app.get("/")
 def root():
     """根路径"""
@@ -107,6 +145,41 @@ def health_check():
     }
 
 
+@app.get("/api/health/db")
+def database_health_check():
+    """数据库连接池状态（取连接等待时间统计，用于确定worker和连接池大小）"""
+    from app.db.base import engine, async_engine
+    from app.db.pool import pool_status
+
+    active_engine = async_engine.sync_engine if async_engine is not None else engine
+    return {
+        "status": "healthy",
+        "dialect": active_engine.dialect.name,
+        "pool": pool_status(active_engine)
+    }
+
+
+@app.get("/api/health/auth")
+def auth_health_check():
+    """认证状态（认证缓存命中统计，密码哈希执行池的排队和耗时统计）"""
+    from app.core.security import auth_cache_stats
+    from app.core.password_pool import password_pool
+
+    return {
+        "status": "healthy",
+        "cache": auth_cache_stats(),
+        "password_hash": password_pool.snapshot()
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    """请求、SQL、连接池、缓存和密码哈希指标（Prometheus 文本格式）"""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 @app.get("/api/v1")
 def api_info():
     """API版本信息"""
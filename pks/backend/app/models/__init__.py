@@ -4,9 +4,10 @@ PKS 数据模型
 """
 from app.models.card import Card, CardType
 from app.models.tag import Tag, CardTag
-from app.models.link import CardLink, LinkType
+from app.models.link import CardLink, LinkType, LinkDirection
 from app.models.kanban import KanbanColumn, KanbanCard
 from app.models.user import User
+from app.models.blob import Blob
 
 __all__ = [
     "User",
@@ -16,6 +17,8 @@ __all__ = [
     "CardTag",
     "CardLink",
     "LinkType",
+    "LinkDirection",
     "KanbanColumn",
     "KanbanCard",
+    "Blob",
 ]
@@ -0,0 +1,36 @@
+"""
+上传文件数据模型
+"""
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from app.db.base import Base
+
+
+class Blob(Base):
+    """上传文件模型（文件内容按 sha256 存放在文件存储中）"""
+
+    __tablename__ = "blobs"
+
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    user_id = Column(
+        Integer,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True
+    )
+    sha256 = Column(String(64), nullable=False, index=True)
+    size = Column(Integer, nullable=False)
+    content_type = Column(String(100), nullable=False, default="application/octet-stream")
+    filename = Column(String(255), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # 关系
+    user = relationship("User", back_populates="blobs")
+
+    __table_args__ = (
+        UniqueConstraint('user_id', 'sha256', name='uq_blob_user_sha256'),
+    )
+
+    def __repr__(self) -> str:
+        return f"<Blob(id={self.id}, sha256='{self.sha256[:12]}', size={self.size})>"
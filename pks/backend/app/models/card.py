@@ -4,7 +4,7 @@
 import enum
 from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Enum
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, query_expression
 from app.db.base import Base
 
 
@@ -32,6 +32,13 @@ class Card(Base):
     content = Column(Text, nullable=False)
     card_type = Column(Enum(CardType), nullable=False, default=CardType.NOTE)
     url = Column(String(500), nullable=True)  # 仅当 type=link 时使用
+    # 图片卡片的文件（content 为文件下载地址）
+    blob_id = Column(
+        Integer,
+        ForeignKey("blobs.id", ondelete="SET NULL"),
+        nullable=True,
+        index=True
+    )
     is_pinned = Column(Boolean, default=False)
     view_count = Column(Integer, default=0)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -41,6 +48,9 @@ class Card(Base):
         onupdate=func.now()
     )
 
+    # 列表摘要（仅在查询时通过 with_expression 填充）
+    snippet = query_expression()
+
     # 关系
     user = relationship("User", back_populates="cards")
     tags = relationship("CardTag", back_populates="card", cascade="all, delete-orphan")
@@ -5,6 +5,7 @@ from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueCons
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.db.base import Base
+from app.utils.rank import RANK_MAX_LENGTH
 
 
 class KanbanColumn(Base):
@@ -20,7 +21,7 @@ class KanbanColumn(Base):
         index=True
     )
     name = Column(String(50), nullable=False)
-    position = Column(Integer, nullable=False)  # 排序位置
+    rank = Column(String(RANK_MAX_LENGTH), nullable=False)  # 排序键，见 app.utils.rank
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(
         DateTime(timezone=True),
@@ -37,11 +38,11 @@ class KanbanColumn(Base):
     )
 
     __table_args__ = (
-        UniqueConstraint('user_id', 'position', name='uq_kanban_column_user_position'),
+        UniqueConstraint('user_id', 'rank', name='uq_kanban_column_user_rank'),
     )
 
     def __repr__(self) -> str:
-        return f"<KanbanColumn(id={self.id}, name='{self.name}', position={self.position})>"
+        return f"<KanbanColumn(id={self.id}, name='{self.name}', rank='{self.rank}')>"
 
 
 class KanbanCard(Base):
@@ -62,7 +63,7 @@ class KanbanCard(Base):
         nullable=False,
         index=True
     )
-    position = Column(Integer, nullable=False)  # 在列中的排序位置
+    rank = Column(String(RANK_MAX_LENGTH), nullable=False)  # 在列中的排序键
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(
         DateTime(timezone=True),
@@ -75,8 +76,8 @@ class KanbanCard(Base):
     column = relationship("KanbanColumn", back_populates="kanban_cards")
 
     __table_args__ = (
-        UniqueConstraint('column_id', 'position', name='uq_kanban_card_column_position'),
+        UniqueConstraint('column_id', 'rank', name='uq_kanban_card_column_rank'),
     )
 
     def __repr__(self) -> str:
-        return f"<KanbanCard(card_id={self.card_id}, column_id={self.column_id}, position={self.position})>"
+        return f"<KanbanCard(card_id={self.card_id}, column_id={self.column_id}, rank='{self.rank}')>"
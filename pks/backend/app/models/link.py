@@ -1,8 +1,14 @@
 """
 卡片链接数据模型
+
+每条链接只存一行：source_card_id 为两端中较小的卡片ID，target_card_id 为较大的，
+有方向的链接（父子关系）用 direction 记录实际方向。
 """
 import enum
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import (
+    Column, Integer, SmallInteger, String, DateTime, ForeignKey,
+    UniqueConstraint, CheckConstraint
+)
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.db.base import Base
@@ -15,6 +21,17 @@ class LinkType(str, enum.Enum):
     PARENT = "parent"        # 父子关系
 
 
+class LinkDirection(int, enum.Enum):
+    """链接方向（相对于 source_card_id -> target_card_id）"""
+    NONE = 0       # 无方向
+    FORWARD = 1    # source_card_id -> target_card_id
+    BACKWARD = -1  # target_card_id -> source_card_id
+
+
+# 有方向的链接类型
+DIRECTED_LINK_TYPES = {LinkType.PARENT.value}
+
+
 class CardLink(Base):
     """卡片链接模型"""
 
@@ -34,6 +51,7 @@ class CardLink(Base):
         index=True
     )
     link_type = Column(String(20), default=LinkType.REFERENCE)
+    direction = Column(SmallInteger, nullable=False, default=LinkDirection.NONE.value, server_default="0")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # 关系
@@ -50,6 +68,7 @@ class CardLink(Base):
 
     __table_args__ = (
         UniqueConstraint('source_card_id', 'target_card_id', name='uq_card_link'),
+        CheckConstraint('source_card_id < target_card_id', name='ck_card_link_order'),
     )
 
     def __repr__(self) -> str:
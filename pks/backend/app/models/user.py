@@ -33,6 +33,7 @@ class User(Base):
         back_populates="user",
         cascade="all, delete-orphan"
     )
+    blobs = relationship("Blob", back_populates="user", cascade="all, delete-orphan")
 
     def __repr__(self) -> str:
         return f"<User(id={self.id}, username='{self.username}')>"
@@ -0,0 +1,13 @@
+"""
+备份与恢复相关的Pydantic模式
+"""
+from typing import Dict
+from pydantic import BaseModel, Field
+
+
+class RestoreResponse(BaseModel):
+    """恢复结果"""
+
+    scope: str = Field(..., description="备份范围（user / instance）")
+    restored: Dict[str, int] = Field(..., description="各表恢复的行数")
+    skipped: int = Field(..., description="引用的记录缺失而跳过的行数")
@@ -0,0 +1,22 @@
+"""
+上传文件相关的Pydantic模式
+"""
+from typing import Optional
+from datetime import datetime
+from pydantic import BaseModel
+
+
+class BlobResponse(BaseModel):
+    """上传文件响应模式"""
+
+    id: int
+    sha256: str
+    size: int
+    content_type: str
+    filename: Optional[str] = None
+    url: str
+    created_at: datetime
+
+    class Config:
+        """Pydantic配置"""
+        from_attributes = True
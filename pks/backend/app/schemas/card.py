@@ -5,6 +5,7 @@ from typing import Optional, List
 from datetime import datetime
 from pydantic import BaseModel, Field, validator
 from app.models.card import CardType
+from app.models.link import LinkType
 
 
 class TagBase(BaseModel):
@@ -92,7 +93,8 @@ class CardListResponse(BaseModel):
 
     id: int
     title: str
-    content: str
+    snippet: Optional[str] = None  # 内容摘要（图片卡片为None）
+    content: Optional[str] = None  # 仅在 fields 包含 content 时返回
     card_type: CardType
     url: Optional[str]
     is_pinned: bool
@@ -109,7 +111,7 @@ class CardListResponse(BaseModel):
 class BatchDeleteRequest(BaseModel):
     """批量删除请求模式"""
 
-    card_ids: List[int] = Field(..., min_length=1, description="卡片ID列表")
+    card_ids: List[int] = Field(..., min_length=1, max_length=1000, description="卡片ID列表")
 
 
 class BatchDeleteResponse(BaseModel):
@@ -121,11 +123,68 @@ class BatchDeleteResponse(BaseModel):
 class BatchTagRequest(BaseModel):
     """批量打标签请求模式"""
 
-    card_ids: List[int] = Field(..., min_length=1, description="卡片ID列表")
-    tag_ids: List[int] = Field(..., min_length=1, description="标签ID列表")
+    card_ids: List[int] = Field(..., min_length=1, max_length=1000, description="卡片ID列表")
+    tag_ids: List[int] = Field(..., min_length=1, max_length=100, description="标签ID列表")
 
 
 class BatchTagResponse(BaseModel):
     """批量打标签响应模式"""
 
-    affected_count: int = Field(..., description="影响的卡片数量")
+    affected_count: int = Field(..., description="新建或移除的关联数量")
+
+
+class CardImportItem(CardBase):
+    """导入记录：卡片（type 为 card 或省略）"""
+
+    id: Optional[int] = Field(None, description="导入文件中的卡片ID（供链接记录引用）")
+    is_pinned: bool = Field(default=False, description="是否置顶")
+    tags: List[str] = Field(default=[], description="标签名称列表（不存在的标签自动创建）")
+    created_at: Optional[datetime] = Field(None, description="创建时间（省略时为导入时间）")
+
+    @validator('url')
+    def validate_url(cls, v, values):
+        """验证链接类型卡片必须提供URL"""
+        if values.get('card_type') == CardType.LINK and not v:
+            raise ValueError('链接类型卡片必须提供URL')
+        return v
+
+    @validator('tags', each_item=True)
+    def validate_tag_name(cls, v):
+        """验证标签名称长度"""
+        v = v.strip()
+        if not 1 <= len(v) <= 50:
+            raise ValueError('标签名称长度必须为1-50个字符')
+        return v
+
+
+class TagImportItem(BaseModel):
+    """导入记录：标签（type 为 tag）"""
+
+    name: str = Field(..., min_length=1, max_length=50, description="标签名称")
+    color: str = Field(default="#1976D2", pattern=r'^#[0-9A-Fa-f]{6}$', description="标签颜色")
+    parent: Optional[str] = Field(None, max_length=50, description="父标签名称")
+
+
+class LinkImportItem(BaseModel):
+    """导入记录：链接（type 为 link，source/target 为导入文件中的卡片ID）"""
+
+    source: int = Field(..., description="起点卡片ID（导入文件中的ID）")
+    target: int = Field(..., description="终点卡片ID（导入文件中的ID）")
+    link_type: LinkType = Field(default=LinkType.REFERENCE, description="链接类型")
+
+
+class ImportRowError(BaseModel):
+    """导入失败的记录"""
+
+    line: int = Field(..., description="记录序号（NDJSON 为行号，JSON 数组为元素序号，从1开始）")
+    error: str = Field(..., description="错误信息")
+
+
+class CardImportResponse(BaseModel):
+    """卡片导入结果"""
+
+    cards: int = Field(..., description="导入的卡片数量")
+    tags: int = Field(..., description="新建的标签数量")
+    links: int = Field(..., description="新建的链接数量")
+    failed: int = Field(..., description="失败的记录数量")
+    errors: List[ImportRowError] = Field(default=[], description="失败记录（最多返回 IMPORT_MAX_ERRORS 条）")
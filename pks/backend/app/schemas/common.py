@@ -30,10 +30,11 @@ class PaginatedResponse(BaseModel, Generic[T]):
     """分页响应格式"""
 
     items: List[T] = Field(description="数据列表")
-    total: int = Field(description="总记录数")
+    total: Optional[int] = Field(default=None, description="总记录数（未统计时为None）")
     page: int = Field(description="当前页码")
     page_size: int = Field(description="每页记录数")
-    total_pages: int = Field(description="总页数")
+    total_pages: Optional[int] = Field(default=None, description="总页数（未统计时为None）")
+    next_cursor: Optional[str] = Field(default=None, description="下一页游标，None表示没有更多")
 
     class Config:
         """Pydantic配置"""
@@ -43,7 +44,8 @@ class PaginatedResponse(BaseModel, Generic[T]):
                 "total": 100,
                 "page": 1,
                 "page_size": 20,
-                "total_pages": 5
+                "total_pages": 5,
+                "next_cursor": "eyJzIjoiY3JlYXRlZF9hdDpkZXNjIiwidiI6WyIyMDI1LTAxLTA4VDEwOjAwOjAwIiw0Ml19"
             }
         }
 
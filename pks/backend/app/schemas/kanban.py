@@ -10,7 +10,7 @@ class KanbanColumnBase(BaseModel):
     """看板列基础模式"""
 
     name: str = Field(..., min_length=1, max_length=50, description="列名称")
-    position: int = Field(..., ge=0, description="位置")
+    position: int = Field(..., ge=0, description="位置（超出列数时放到末尾）")
 
 
 class KanbanColumnCreate(KanbanColumnBase):
@@ -30,6 +30,7 @@ class KanbanColumnResponse(KanbanColumnBase):
     """看板列响应模式"""
 
     id: int
+    rank: str = Field(..., description="排序键")
     user_id: int
     created_at: datetime
     updated_at: datetime
@@ -44,7 +45,7 @@ class KanbanCardBase(BaseModel):
 
     card_id: int = Field(..., description="卡片ID")
     column_id: int = Field(..., description="列ID")
-    position: int = Field(..., ge=0, description="位置")
+    rank: str = Field(..., description="排序键")
 
 
 class KanbanCardResponse(KanbanCardBase):
@@ -64,6 +65,15 @@ class KanbanColumnWithCards(KanbanColumnResponse):
 
     cards_count: int = 0
     cards: List[dict] = []
+    next_cursor: Optional[str] = Field(None, description="加载更多卡片的游标，None表示已全部加载")
+
+
+class KanbanColumnCardsResponse(BaseModel):
+    """看板列卡片分页响应模式"""
+
+    column_id: int
+    cards: List[dict] = []
+    next_cursor: Optional[str] = Field(None, description="下一页游标，None表示没有更多")
 
 
 class MoveCardRequest(BaseModel):
@@ -80,6 +90,7 @@ class MoveCardResponse(BaseModel):
     card_id: int
     column_id: int
     position: int
+    rank: str
 
 
 class BatchMoveRequest(BaseModel):
@@ -93,6 +104,28 @@ class BatchMoveResponse(BaseModel):
     """批量移动卡片响应模式"""
 
     moved_count: int = Field(..., description="移动的卡片数量")
+    changes: List[MoveCardResponse] = Field([], description="位置发生变化的卡片")
+
+
+class BoardMove(BaseModel):
+    """单次移动操作"""
+
+    card_id: int = Field(..., description="卡片ID")
+    column_id: int = Field(..., description="目标列ID")
+    position: int = Field(..., ge=0, description="移动后在目标列中的位置")
+
+
+class BoardMovesRequest(BaseModel):
+    """拖拽会话批量移动请求模式（按操作顺序执行）"""
+
+    moves: List[BoardMove] = Field(..., min_length=1, max_length=500, description="移动操作列表")
+
+
+class BoardMovesResponse(BaseModel):
+    """拖拽会话批量移动响应模式"""
+
+    moved_count: int = Field(..., description="移动的卡片数量")
+    changes: List[MoveCardResponse] = Field([], description="位置发生变化的卡片")
 
 
 class KanbanBoardResponse(BaseModel):
@@ -33,9 +33,11 @@ class SearchResultCard(BaseModel):
 
     id: int
     title: str
-    content: str
+    snippet: Optional[str] = None
+    content: Optional[str] = None
     card_type: CardType
-    highlight: Optional[str] = None
+    highlights: List[List[int]] = []  # snippet 中匹配位置的 [起始, 结束) 字符偏移
+    title_highlights: List[List[int]] = []  # title 中匹配位置的字符偏移
     created_at: datetime
 
     class Config:
@@ -61,7 +63,7 @@ class SearchResponse(BaseModel):
 
     cards: Optional[dict] = None
     tags: Optional[dict] = None
-    total: int = 0
+    total: Optional[int] = 0
 
 
 class ExportRequest(BaseModel):
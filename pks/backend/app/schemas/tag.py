@@ -26,6 +26,7 @@ class TagUpdate(BaseModel):
 
     name: Optional[str] = Field(None, min_length=1, max_length=50)
     color: Optional[str] = Field(None, pattern=r'^#[0-9A-Fa-f]{6}$')
+    parent_id: Optional[int] = Field(None, description="父标签ID（显式传 null 表示移到根级）")
 
 
 class TagResponse(TagBase):
@@ -53,3 +54,9 @@ class TagWithCount(TagResponse):
 
     children_count: int = 0
     cards_count: int = 0
+
+
+class TagTreeNode(TagWithCount):
+    """标签树节点"""
+
+    children: List['TagTreeNode'] = []
@@ -43,6 +43,12 @@ class UserUpdate(BaseModel):
     password: Optional[str] = Field(None, min_length=8)
 
 
+class UserActiveUpdate(BaseModel):
+    """启用或禁用用户"""
+
+    is_active: bool = Field(..., description="是否启用")
+
+
 class UserInDB(UserBase):
     """数据库中的用户模式"""
 
@@ -63,6 +69,19 @@ class UserResponse(UserInDB):
     pass
 
 
+class UserPrincipal(BaseModel):
+    """当前请求的用户身份（认证缓存中保存的最小信息）"""
+
+    id: int
+    is_active: bool
+    is_superuser: bool
+
+    class Config:
+        """Pydantic配置"""
+        from_attributes = True
+        frozen = True
+
+
 class Token(BaseModel):
     """Token响应模式"""
 
@@ -5,12 +5,17 @@ from typing import Optional
 from sqlalchemy.orm import Session
 from app.models.user import User
 from app.core.security import (
-    verify_password,
+    verify_and_update_password,
+    dummy_verify_password,
     get_password_hash,
     create_access_token,
-    create_refresh_token
+    create_refresh_token,
+    invalidate_principal
 )
 from app.schemas.user import UserCreate, UserUpdate
+from app.core.password_pool import password_pool
+from app.db.session import DBSession
+from app.services.base import AsyncService
 
 
 class AuthService:
@@ -59,13 +64,41 @@ class AuthService:
         return db.query(User).filter(User.id == user_id).first()
 
     @staticmethod
-    def create_user(db: Session, user_in: UserCreate) -> User:
+    def get_user_by_login(
+        db: Session,
+        username: Optional[str] = None,
+        email: Optional[str] = None
+    ) -> Optional[User]:
+        """
+        根据登录名获取用户（优先使用用户名，其次使用邮箱）
+
+        Args:
+            db: 数据库会话
+            username: 用户名（可选）
+            email: 邮箱（可选）
+
+        Returns:
+            Optional[User]: 用户对象，不存在则返回None
+        """
+        if username:
+            return AuthService.get_user_by_username(db, username)
+        if email:
+            return AuthService.get_user_by_email(db, email)
+        return None
+
+    @staticmethod
+    def create_user(
+        db: Session,
+        user_in: UserCreate,
+        password_hash: Optional[str] = None
+    ) -> User:
         """
         创建新用户
 
         Args:
             db: 数据库会话
             user_in: 用户创建数据
+            password_hash: 已计算的密码哈希（为None时在当前线程计算）
 
         Returns:
             User: 创建的用户对象
@@ -85,7 +118,7 @@ class AuthService:
         db_user = User(
             username=user_in.username,
             email=user_in.email,
-            password_hash=get_password_hash(user_in.password)
+            password_hash=password_hash or get_password_hash(user_in.password)
         )
         db.add(db_user)
         db.commit()
@@ -100,7 +133,7 @@ class AuthService:
         password: str = ""
     ) -> Optional[User]:
         """
-        验证用户凭据
+        验证用户凭据（在当前线程计算哈希，路由中使用 authenticate_user_async）
 
         Args:
             db: 数据库会话
@@ -111,22 +144,36 @@ class AuthService:
         Returns:
             Optional[User]: 验证成功返回用户对象，失败返回None
         """
-        # 优先使用用户名查找，其次使用邮箱
-        user = None
-        if username:
-            user = AuthService.get_user_by_username(db, username)
-        elif email:
-            user = AuthService.get_user_by_email(db, email)
+        user = AuthService.get_user_by_login(db, username, email)
 
         if not user:
+            dummy_verify_password()
             return None
 
-        # 验证密码
-        if not verify_password(password, user.password_hash):
+        # 验证密码，哈希参数已变更时保存新哈希
+        valid, new_hash = verify_and_update_password(password, user.password_hash)
+        if not valid:
             return None
 
+        if new_hash:
+            AuthService.update_password_hash(db, user, new_hash)
+
         return user
 
+    @staticmethod
+    def update_password_hash(db: Session, user: User, password_hash: str) -> None:
+        """
+        保存重新计算的密码哈希
+
+        Args:
+            db: 数据库会话
+            user: 用户对象
+            password_hash: 新哈希
+        """
+        user.password_hash = password_hash
+        db.commit()
+        db.refresh(user)
+
     @staticmethod
     def create_user_tokens(user: User) -> dict:
         """
@@ -172,4 +219,67 @@ class AuthService:
 
         db.commit()
         db.refresh(user)
+        invalidate_principal(user.id)
         return user
+
+    @staticmethod
+    def set_user_active(db: Session, user: User, is_active: bool) -> User:
+        """
+        启用或禁用用户
+
+        Args:
+            db: 数据库会话
+            user: 用户对象
+            is_active: 是否启用
+
+        Returns:
+            User: 更新后的用户对象
+        """
+        user.is_active = is_active
+        db.commit()
+        db.refresh(user)
+        invalidate_principal(user.id)
+        return user
+
+
+# 异步变体（在 AsyncSession 或线程池中执行，不阻塞事件循环）
+AsyncAuthService = AsyncService(AuthService)
+
+
+async def authenticate_user_async(
+    db: DBSession,
+    username: Optional[str] = None,
+    email: Optional[str] = None,
+    password: str = ""
+) -> Optional[User]:
+    """
+    验证用户凭据（密码哈希在独立的执行池中计算，不占用请求线程）
+
+    用户不存在时同样执行一次空验证，响应时间不泄露用户名是否存在。
+
+    Args:
+        db: 同步或异步会话
+        username: 用户名（可选）
+        email: 邮箱（可选）
+        password: 密码
+
+    Returns:
+        Optional[User]: 验证成功返回用户对象，失败返回None
+
+    Raises:
+        PasswordHashBusy: 密码哈希排队已满
+    """
+    user = await AsyncAuthService.get_user_by_login(db, username, email)
+
+    if not user:
+        await password_pool.dummy_verify()
+        return None
+
+    valid, new_hash = await password_pool.verify_and_update(password, user.password_hash)
+    if not valid:
+        return None
+
+    if new_hash:
+        await AsyncAuthService.update_password_hash(db, user, new_hash)
+
+    return user
@@ -0,0 +1,743 @@
+"""
+备份与恢复服务
+
+备份文件为 gzip 压缩的 NDJSON：第一行为文件头，之后每行一条表记录，表按外键依赖顺序排列：
+    {"format": "pks-backup", "version": 1, "scope": "user", "created_at": "..."}
+    {"table": "tags", "row": {"id": 1, "user_id": 1, "name": "Python", ...}}
+    {"table": "blobs", "row": {...}, "data": "<Base64 文件内容>"}
+    ...
+
+- 备份：各表以 yield_per 分块读取（PostgreSQL 上为服务端游标），边读边压缩输出，
+  内存占用与数据量无关；scope 为 user（单个用户）或 instance（全部用户）
+- 恢复：按表分批 executemany 写入，每批一个事务；旧ID到新ID的映射按批记录，
+  外键列（user_id、card_id、tag_id 等）在写入前替换为新ID；中途失败时删除已提交的批次
+- SQLite 整库快照：使用在线备份 API 复制数据库文件，写入过程中也能得到一致的副本
+"""
+import base64
+import io
+import json
+import os
+import sqlite3
+import tempfile
+import zlib
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from sqlalchemy import DateTime, Enum, Table, bindparam, select, update
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.response_cache import response_cache, SCOPE_CARDS, SCOPE_TAGS, SCOPE_KANBAN
+from app.db.base import SessionLocal, engine
+from app.db.session import DBSession
+from app.models.blob import Blob
+from app.models.card import Card
+from app.models.kanban import KanbanCard, KanbanColumn
+from app.models.link import CardLink, LinkDirection
+from app.models.tag import CardTag, Tag
+from app.models.user import User
+from app.services.base import AsyncService
+from app.services.blob_service import blob_url
+from app.services.blob_store import blob_store
+from app.services.graph_service import GraphService
+from app.utils.bulk import insert_ignore, insert_returning_ids
+from app.utils.ndjson import dumps_line
+
+BACKUP_FORMAT = "pks-backup"
+BACKUP_VERSION = 1
+
+SCOPE_USER = "user"
+SCOPE_INSTANCE = "instance"
+
+# gzip 格式的 zlib 窗口参数
+GZIP_WBITS = 31
+
+# 恢复时每次解压输出的最大字节数
+DECOMPRESS_CHUNK_SIZE = 1024 * 1024
+
+# 按外键依赖顺序排列的表
+BACKUP_TABLES: List[Table] = [
+    User.__table__,
+    Tag.__table__,
+    Blob.__table__,
+    Card.__table__,
+    CardTag.__table__,
+    CardLink.__table__,
+    KanbanColumn.__table__,
+    KanbanCard.__table__,
+]
+
+
+def _user_filter(table: Table, user_id: int):
+    """单个用户范围的筛选条件（没有 user_id 列的表通过所属卡片或看板列筛选）"""
+    if table is User.__table__:
+        return User.id == user_id
+    if "user_id" in table.c:
+        return table.c.user_id == user_id
+    if table is CardTag.__table__:
+        return CardTag.card_id.in_(select(Card.id).where(Card.user_id == user_id))
+    if table is CardLink.__table__:
+        return CardLink.source_card_id.in_(select(Card.id).where(Card.user_id == user_id))
+    if table is KanbanCard.__table__:
+        return KanbanCard.column_id.in_(
+            select(KanbanColumn.id).where(KanbanColumn.user_id == user_id)
+        )
+    raise ValueError(f"无法按用户筛选表 {table.name}")
+
+
+class _GzipWriter:
+    """流式 gzip 压缩"""
+
+    def __init__(self):
+        self._compressor = zlib.compressobj(settings.BACKUP_COMPRESS_LEVEL, zlib.DEFLATED, GZIP_WBITS)
+
+    def write(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def close(self) -> bytes:
+        return self._compressor.flush()
+
+
+def iter_backup(user_id: Optional[int] = None) -> Iterator[bytes]:
+    """
+    生成逻辑备份（gzip 压缩的 NDJSON）
+
+    使用独立的会话（响应流式发送期间请求的会话已关闭）。
+    单用户备份不包含 users 表（恢复到当前用户）；文件内容随 blobs 记录以 Base64 写入。
+
+    Args:
+        user_id: 用户ID，None表示全部用户
+
+    Yields:
+        bytes: 压缩后的数据块
+    """
+    scope = SCOPE_INSTANCE if user_id is None else SCOPE_USER
+    writer = _GzipWriter()
+    db = SessionLocal()
+    try:
+        yield writer.write(dumps_line({
+            "format": BACKUP_FORMAT,
+            "version": BACKUP_VERSION,
+            "scope": scope,
+            "created_at": datetime.now(timezone.utc)
+        }))
+
+        for table in BACKUP_TABLES:
+            if table is User.__table__ and user_id is not None:
+                continue
+
+            query = select(table).order_by(table.c.id)
+            if user_id is not None:
+                query = query.where(_user_filter(table, user_id))
+
+            result = db.execute(query.execution_options(yield_per=settings.BACKUP_CHUNK_SIZE))
+            keys = list(result.keys())
+            for rows in result.partitions():
+                lines = []
+                for row in rows:
+                    record = {"table": table.name, "row": dict(zip(keys, row))}
+                    if table is Blob.__table__:
+                        record["data"] = _read_blob(row.sha256)
+                    lines.append(dumps_line(record))
+                data = writer.write(b"".join(lines))
+                if data:
+                    yield data
+
+        yield writer.close()
+    finally:
+        db.close()
+
+
+def _read_blob(sha256: str) -> Optional[str]:
+    """读取文件内容（Base64），文件缺失时返回None"""
+    try:
+        with blob_store.open(sha256) as f:
+            return base64.b64encode(f.read()).decode("ascii")
+    except FileNotFoundError:
+        return None
+
+
+def sqlite_database_path() -> Optional[str]:
+    """SQLite 数据库文件路径（非 SQLite 或内存数据库返回None）"""
+    if engine.dialect.name != "sqlite":
+        return None
+    database = engine.url.database
+    if not database or database == ":memory:":
+        return None
+    return database
+
+
+def iter_sqlite_snapshot() -> Iterator[bytes]:
+    """
+    生成 SQLite 整库快照（gzip 压缩的数据库文件）
+
+    使用 SQLite 在线备份 API 按页复制到临时文件，复制期间其他连接可以继续读写，
+    得到的是某一时刻的一致副本；解压后即可作为 DATABASE_URL 指向的数据库文件使用。
+
+    Yields:
+        bytes: 压缩后的数据块
+
+    Raises:
+        ValueError: 当前数据库不是 SQLite 文件数据库
+    """
+    if sqlite_database_path() is None:
+        raise ValueError("整库快照仅支持 SQLite 文件数据库")
+
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    try:
+        source = engine.raw_connection()
+        target = sqlite3.connect(path)
+        try:
+            source.driver_connection.backup(target, pages=settings.SQLITE_BACKUP_PAGES)
+        finally:
+            target.close()
+            source.close()
+
+        writer = _GzipWriter()
+        with open(path, "rb") as f:
+            while chunk := f.read(1024 * 1024):
+                data = writer.write(chunk)
+                if data:
+                    yield data
+        yield writer.close()
+    finally:
+        os.unlink(path)
+
+
+class IdMap:
+    """
+    旧ID到新ID的映射
+
+    备份中各表按ID升序排列，映射以两个有序的整数数组保存并二分查找，
+    百万级记录只占十几MB；乱序写入的少量记录存入字典。
+    """
+
+    def __init__(self):
+        self._old = array("q")
+        self._new = array("q")
+        self._extra: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._old) + len(self._extra)
+
+    def add(self, old_id: int, new_id: int) -> None:
+        if not self._old or old_id > self._old[-1]:
+            self._old.append(old_id)
+            self._new.append(new_id)
+        else:
+            self._extra[old_id] = new_id
+
+    def get(self, old_id: Optional[int]) -> Optional[int]:
+        if old_id is None:
+            return None
+        i = bisect_left(self._old, old_id)
+        if i < len(self._old) and self._old[i] == old_id:
+            return self._new[i]
+        return self._extra.get(old_id)
+
+
+class RestoreState:
+    """一次恢复的累计状态"""
+
+    def __init__(self, scope: str, user_id: Optional[int] = None):
+        """
+        Args:
+            scope: 备份范围（user / instance）
+            user_id: 恢复到的用户ID（scope 为 user 时必填）
+        """
+        self.scope = scope
+        self.user_id = user_id
+        self.maps: Dict[str, IdMap] = {table.name: IdMap() for table in BACKUP_TABLES}
+        self.counts: Dict[str, int] = {table.name: 0 for table in BACKUP_TABLES}
+        self.skipped = 0
+        self.tag_parents: List[Tuple[int, int]] = []  # (新标签ID, 旧父标签ID)
+        self.user_ids: set = {user_id} if user_id is not None else set()  # 写入过数据的用户（恢复后使其缓存失效）
+        # 本次恢复新建的行（恢复失败时据此删除已提交的批次）
+        self.created: Dict[str, array] = {table.name: array("q") for table in BACKUP_TABLES}
+
+    def map_user(self, old_id: int) -> Optional[int]:
+        """映射用户ID（单用户恢复时全部映射为目标用户）"""
+        if self.scope == SCOPE_USER:
+            return self.user_id
+        return self.maps[User.__table__.name].get(old_id)
+
+    def summary(self) -> Dict[str, Any]:
+        """恢复结果"""
+        return {"scope": self.scope, "restored": self.counts, "skipped": self.skipped}
+
+
+class ArchiveReader:
+    """
+    备份文件的增量解析器
+
+    调用方按块送入压缩数据，取回按表分组、达到批大小的记录：
+        reader = ArchiveReader(batch_size, max_record_size)
+        for chunk in chunks:
+            for table, records in reader.feed(chunk): ...
+        for table, records in reader.close(): ...
+
+    每次解压的输出不超过 DECOMPRESS_CHUNK_SIZE 字节，单行超过 max_record_size 时报错，
+    一批记录的总字节数超过 max_record_size 时提前结束该批（文件记录含 Base64 内容），
+    内存占用与压缩比和文件大小无关。
+    """
+
+    def __init__(self, batch_size: int, max_record_size: int):
+        self.batch_size = batch_size
+        self.max_record_size = max_record_size
+        self.header: Optional[Dict[str, Any]] = None
+        self._decompressor = zlib.decompressobj(GZIP_WBITS)
+        self._partial: List[bytes] = []  # 尚未遇到换行符的当前行
+        self._partial_size = 0
+        self._table: Optional[str] = None
+        self._records: List[Dict[str, Any]] = []
+        self._records_size = 0
+
+    def feed(self, data: bytes) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+        """
+        送入一块压缩数据
+
+        Yields:
+            Tuple[str, List[Dict[str, Any]]]: 已凑满的批次（表名, 记录）
+
+        Raises:
+            ValueError: 文件格式错误或记录过大
+        """
+        while data:
+            try:
+                output = self._decompressor.decompress(data, DECOMPRESS_CHUNK_SIZE)
+            except zlib.error:
+                raise ValueError("备份文件不是有效的 gzip 文件")
+            data = self._decompressor.unconsumed_tail
+            yield from self._split(output)
+            if self._decompressor.eof:
+                break
+
+    def close(self) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+        """
+        结束输入，返回剩余记录
+
+        Raises:
+            ValueError: 文件不完整或格式错误
+        """
+        if not self._decompressor.eof:
+            raise ValueError("备份文件不完整")
+        line = b"".join(self._partial)
+        self._partial, self._partial_size = [], 0
+        if line.strip():
+            yield from self._parse(line)
+        if self.header is None:
+            raise ValueError("备份文件为空")
+        if self._records:
+            yield self._table, self._records
+            self._records, self._records_size = [], 0
+
+    def _split(self, output: bytes) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+        """按换行符切分解压输出（只扫描新输出，不重复扫描未完成的行）"""
+        *lines, rest = output.split(b"\n")
+        for line in lines:
+            if self._partial:
+                self._partial.append(line)
+                line = b"".join(self._partial)
+                self._partial, self._partial_size = [], 0
+            if len(line) > self.max_record_size:
+                raise ValueError(f"备份文件中的记录超过 {self.max_record_size} 字节")
+            if line.strip():
+                yield from self._parse(line)
+
+        if rest:
+            self._partial.append(rest)
+            self._partial_size += len(rest)
+            if self._partial_size > self.max_record_size:
+                raise ValueError(f"备份文件中的记录超过 {self.max_record_size} 字节")
+
+    def _parse(self, line: bytes) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            raise ValueError("备份文件内容损坏")
+        if not isinstance(record, dict):
+            raise ValueError("备份文件内容损坏")
+
+        if self.header is None:
+            if record.get("format") != BACKUP_FORMAT:
+                raise ValueError("不是 PKS 备份文件")
+            if record.get("version") != BACKUP_VERSION:
+                raise ValueError(f"不支持的备份版本: {record.get('version')}")
+            self.header = record
+            return
+
+        table = record.get("table")
+        if self._records and (
+            table != self._table
+            or len(self._records) >= self.batch_size
+            or self._records_size >= self.max_record_size
+        ):
+            yield self._table, self._records
+            self._records, self._records_size = [], 0
+        self._table = table
+        self._records.append(record)
+        self._records_size += len(line)
+
+
+def _column_decoders(table: Table) -> Dict[str, Callable[[Any], Any]]:
+    """JSON 值还原为列类型（日期时间、枚举）"""
+    decoders = {}
+    for column in table.columns:
+        if isinstance(column.type, DateTime):
+            decoders[column.name] = datetime.fromisoformat
+        elif isinstance(column.type, Enum) and column.type.enum_class is not None:
+            decoders[column.name] = column.type.enum_class
+    return decoders
+
+
+_DECODERS = {table.name: _column_decoders(table) for table in BACKUP_TABLES}
+_COLUMNS = {table.name: set(table.c.keys()) for table in BACKUP_TABLES}
+_TABLES = {table.name: table for table in BACKUP_TABLES}
+
+
+def _decode_row(table: Table, row: Dict[str, Any]) -> Dict[str, Any]:
+    """只保留表中存在的列，并还原列类型"""
+    columns = _COLUMNS[table.name]
+    decoded = {name: value for name, value in row.items() if name in columns}
+    for name, decode in _DECODERS[table.name].items():
+        value = decoded.get(name)
+        if value is not None:
+            decoded[name] = decode(value)
+    return decoded
+
+
+class BackupService:
+    """备份与恢复服务类"""
+
+    @staticmethod
+    def check_restore_target(db: Session, user_id: int) -> None:
+        """
+        检查恢复目标用户没有数据（恢复不与现有卡片、标签和看板合并）
+
+        Args:
+            db: 数据库会话
+            user_id: 用户ID
+
+        Raises:
+            ValueError: 用户已有数据
+        """
+        for model in (Card, Tag, KanbanColumn):
+            if db.query(model.id).filter(model.user_id == user_id).first() is not None:
+                raise ValueError("当前用户已有卡片、标签或看板列，只能恢复到没有数据的用户")
+
+    @staticmethod
+    def restore_batch(
+        db: Session,
+        table_name: str,
+        records: List[Dict[str, Any]],
+        state: RestoreState
+    ) -> None:
+        """
+        恢复一批记录并提交
+
+        Args:
+            db: 数据库会话
+            table_name: 表名
+            records: 备份记录（{"table", "row"[, "data"]}）
+            state: 恢复状态（ID映射在提交后更新）
+
+        Raises:
+            ValueError: 未知的表，或实例恢复时用户已存在
+        """
+        table = _TABLES.get(table_name)
+        if table is None:
+            raise ValueError(f"备份文件包含未知的表: {table_name}")
+        if table is User.__table__ and state.scope == SCOPE_USER:
+            raise ValueError("单用户备份不应包含用户表")
+
+        old_ids = []
+        parents = []
+        rows = []
+        for record in records:
+            row = BackupService._remap_row(table, _decode_row(table, record["row"]), record, state)
+            if row is None:
+                state.skipped += 1
+                continue
+            old_ids.append(record["row"].get("id"))
+            parents.append(record["row"].get("parent_id"))
+            rows.append(row)
+
+        if not rows:
+            return
+
+        if table is User.__table__:
+            BackupService._check_users(db, rows)
+
+        if table is Blob.__table__:
+            new_ids, created_ids = BackupService._insert_blobs(db, rows)
+        else:
+            new_ids = created_ids = insert_returning_ids(db, table, rows)
+
+        db.commit()
+        state.created[table.name].extend(created_ids)
+
+        id_map = state.maps[table.name]
+        for old_id, new_id in zip(old_ids, new_ids):
+            if old_id is not None:
+                id_map.add(old_id, new_id)
+        state.counts[table.name] += len(rows)
+
+        if table is Tag.__table__:
+            state.tag_parents.extend(
+                (new_id, parent_id)
+                for new_id, parent_id in zip(new_ids, parents)
+                if parent_id is not None
+            )
+
+    @staticmethod
+    def finish_restore(db: Session, state: RestoreState) -> Dict[str, Any]:
+        """
+        恢复标签层级
+
+        Args:
+            db: 数据库会话
+            state: 恢复状态
+
+        Returns:
+            Dict[str, Any]: 恢复结果
+        """
+        tag_map = state.maps[Tag.__table__.name]
+        parents = [
+            {"tag_id": tag_id, "parent_id": tag_map.get(old_parent_id)}
+            for tag_id, old_parent_id in state.tag_parents
+            if tag_map.get(old_parent_id) is not None
+        ]
+        for start in range(0, len(parents), settings.RESTORE_BATCH_SIZE):
+            db.execute(
+                update(Tag.__table__)
+                .where(Tag.__table__.c.id == bindparam("tag_id"))
+                .values(parent_id=bindparam("parent_id")),
+                parents[start:start + settings.RESTORE_BATCH_SIZE]
+            )
+        db.commit()
+        return state.summary()
+
+    @staticmethod
+    def abort_restore(db: Session, state: RestoreState) -> None:
+        """
+        恢复失败时删除已提交的批次（按外键依赖的逆序），使目标用户回到恢复前的状态
+
+        只删除本次恢复新建的行；恢复前已存在、被沿用的文件记录保留。
+        写入存储的文件内容不在此删除（可能已被并发上传的相同内容重新登记），
+        不再被引用的文件由 scripts/sweep_blobs.py 离线清理。
+
+        Args:
+            db: 数据库会话
+            state: 恢复状态
+        """
+        db.rollback()
+        for table in reversed(BACKUP_TABLES):
+            ids = state.created[table.name]
+            for start in range(0, len(ids), settings.RESTORE_BATCH_SIZE):
+                chunk = list(ids[start:start + settings.RESTORE_BATCH_SIZE])
+                db.execute(table.delete().where(table.c.id.in_(chunk)))
+            del ids[:]
+        db.commit()
+
+    @staticmethod
+    def invalidate_caches(state: RestoreState) -> None:
+        """使恢复涉及的用户的响应缓存和链接图缓存失效（恢复成功或失败后都需调用）"""
+        for user_id in state.user_ids:
+            GraphService.invalidate(user_id)
+            response_cache.invalidate(user_id, SCOPE_CARDS, SCOPE_TAGS, SCOPE_KANBAN)
+
+    @staticmethod
+    def _check_users(db: Session, rows: List[Dict[str, Any]]) -> None:
+        """实例恢复：用户名或邮箱已存在时拒绝（不与现有用户合并）"""
+        usernames = [row["username"] for row in rows]
+        emails = [row["email"] for row in rows]
+        existing = db.query(User.username).filter(
+            (User.username.in_(usernames)) | (User.email.in_(emails))
+        ).first()
+        if existing is not None:
+            raise ValueError(f"用户已存在: {existing.username}")
+
+    @staticmethod
+    def _insert_blobs(db: Session, rows: List[Dict[str, Any]]) -> Tuple[List[int], List[int]]:
+        """
+        写入文件记录（同一用户的相同内容已存在时沿用已有记录）
+
+        Returns:
+            Tuple[List[int], List[int]]: 与 rows 对应的文件ID，以及其中新建的文件ID
+        """
+        def lookup() -> Dict[Tuple[int, str], int]:
+            return {
+                (user_id, sha256): blob_id
+                for blob_id, user_id, sha256 in db.query(Blob.id, Blob.user_id, Blob.sha256).filter(
+                    Blob.user_id.in_({row["user_id"] for row in rows}),
+                    Blob.sha256.in_({row["sha256"] for row in rows})
+                )
+            }
+
+        before = set(lookup().values())
+        insert_ignore(db, Blob.__table__, rows)
+        existing = lookup()
+        new_ids = [existing[(row["user_id"], row["sha256"])] for row in rows]
+        return new_ids, sorted(set(new_ids) - before)
+
+    @staticmethod
+    def _remap_row(
+        table: Table,
+        row: Dict[str, Any],
+        record: Dict[str, Any],
+        state: RestoreState
+    ) -> Optional[Dict[str, Any]]:
+        """将行中的外键替换为新ID，引用的记录不存在时返回None"""
+        maps = state.maps
+        row.pop("id", None)
+
+        if "user_id" in row:
+            row["user_id"] = state.map_user(row["user_id"])
+            if row["user_id"] is None:
+                return None
+            state.user_ids.add(row["user_id"])
+
+        if table is Tag.__table__:
+            # 父标签可能排在后面，全部标签写入后再设置
+            row["parent_id"] = None
+        elif table is Blob.__table__:
+            data = record.get("data")
+            if data is not None:
+                sha256, size = blob_store.put(io.BytesIO(base64.b64decode(data)))
+                row["sha256"], row["size"] = sha256, size
+        elif table is Card.__table__:
+            old_blob_id = row.get("blob_id")
+            row["blob_id"] = maps[Blob.__table__.name].get(old_blob_id)
+            if old_blob_id is not None and row["blob_id"] is not None:
+                # 图片卡片内容为文件下载地址，随文件ID更新
+                old_url = blob_url(Blob(id=old_blob_id))
+                if row.get("content") == old_url:
+                    row["content"] = blob_url(Blob(id=row["blob_id"]))
+        elif table is CardTag.__table__:
+            row["card_id"] = maps[Card.__table__.name].get(row["card_id"])
+            row["tag_id"] = maps[Tag.__table__.name].get(row["tag_id"])
+            if row["card_id"] is None or row["tag_id"] is None:
+                return None
+        elif table is CardLink.__table__:
+            source = maps[Card.__table__.name].get(row["source_card_id"])
+            target = maps[Card.__table__.name].get(row["target_card_id"])
+            if source is None or target is None:
+                return None
+            if source > target:
+                # 新ID顺序与旧ID相反时重新规范化
+                source, target = target, source
+                row["direction"] = -row.get("direction", LinkDirection.NONE.value)
+            row["source_card_id"], row["target_card_id"] = source, target
+        elif table is KanbanCard.__table__:
+            row["card_id"] = maps[Card.__table__.name].get(row["card_id"])
+            row["column_id"] = maps[KanbanColumn.__table__.name].get(row["column_id"])
+            if row["card_id"] is None or row["column_id"] is None:
+                return None
+
+        return row
+
+
+def _start_restore(header: Dict[str, Any], user_id: Optional[int]) -> RestoreState:
+    """根据文件头创建恢复状态"""
+    scope = header.get("scope")
+    if user_id is not None and scope != SCOPE_USER:
+        raise ValueError("实例备份只能通过 scripts/restore.py 恢复")
+    if user_id is None and scope not in (SCOPE_USER, SCOPE_INSTANCE):
+        raise ValueError(f"未知的备份范围: {scope}")
+    return RestoreState(scope, user_id)
+
+
+async def restore_archive(db: DBSession, chunks: AsyncIterator[bytes], user_id: int) -> Dict[str, Any]:
+    """
+    将单用户备份恢复到指定用户（边接收边解压、按批写入）
+
+    Args:
+        db: 同步或异步会话
+        chunks: 备份文件字节块（如 Request.stream()）
+        user_id: 目标用户ID（需没有卡片、标签和看板列）
+
+    Returns:
+        Dict[str, Any]: 恢复结果
+
+    Raises:
+        ValueError: 文件格式错误或目标用户已有数据
+    """
+    await AsyncBackupService.check_restore_target(db, user_id)
+
+    reader = ArchiveReader(settings.RESTORE_BATCH_SIZE, settings.RESTORE_MAX_RECORD_SIZE)
+    state = None
+    try:
+        async for chunk in chunks:
+            for table_name, records in reader.feed(chunk):
+                if state is None:
+                    state = _start_restore(reader.header, user_id)
+                await AsyncBackupService.restore_batch(db, table_name, records, state)
+
+        for table_name, records in reader.close():
+            if state is None:
+                state = _start_restore(reader.header, user_id)
+            await AsyncBackupService.restore_batch(db, table_name, records, state)
+
+        if state is None:
+            state = _start_restore(reader.header, user_id)
+        return await AsyncBackupService.finish_restore(db, state)
+    except BaseException:
+        # 包括客户端中途断开：删除已提交的批次，用户可以重新恢复
+        if state is not None:
+            await AsyncBackupService.abort_restore(db, state)
+        raise
+    finally:
+        if state is not None:
+            BackupService.invalidate_caches(state)
+
+
+def restore_archive_sync(db: Session, chunks: Iterable[bytes], user_id: Optional[int] = None) -> Dict[str, Any]:
+    """
+    恢复备份（同步版本，供脚本使用）
+
+    Args:
+        db: 数据库会话
+        chunks: 备份文件字节块
+        user_id: 单用户备份的目标用户ID；None表示按备份中的用户恢复
+            （单用户备份没有用户表，此时必须指定）
+
+    Returns:
+        Dict[str, Any]: 恢复结果
+
+    Raises:
+        ValueError: 文件格式错误、目标用户已有数据或用户已存在
+    """
+    if user_id is not None:
+        BackupService.check_restore_target(db, user_id)
+
+    reader = ArchiveReader(settings.RESTORE_BATCH_SIZE, settings.RESTORE_MAX_RECORD_SIZE)
+    state = None
+
+    def batches():
+        for chunk in chunks:
+            yield from reader.feed(chunk)
+        yield from reader.close()
+
+    try:
+        for table_name, records in batches():
+            if state is None:
+                state = _start_restore(reader.header, user_id)
+                if state.scope == SCOPE_USER and user_id is None:
+                    raise ValueError("单用户备份需要指定恢复到的用户")
+            BackupService.restore_batch(db, table_name, records, state)
+
+        if state is None:
+            state = _start_restore(reader.header, user_id)
+        return BackupService.finish_restore(db, state)
+    except BaseException:
+        if state is not None:
+            BackupService.abort_restore(db, state)
+        raise
+    finally:
+        if state is not None:
+            BackupService.invalidate_caches(state)
+
+
+# 异步变体
+AsyncBackupService = AsyncService(BackupService)
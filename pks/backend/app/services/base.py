@@ -0,0 +1,50 @@
+"""
+服务层基础工具
+"""
+import functools
+import inspect
+from typing import Any
+from app.db.session import run_in_session
+
+
+class AsyncService:
+    """
+    服务类的异步变体
+
+    将服务类中第一个参数为 db 的静态方法包装为协程：
+    异步会话通过 AsyncSession.run_sync 执行，同步会话放到线程池执行。
+    其余属性（如不访问数据库的方法）原样返回。
+
+    Example:
+        AsyncCardService = AsyncService(CardService)
+        card = await AsyncCardService.get_card_by_id(db, card_id, user_id)
+    """
+
+    def __init__(self, service: type):
+        self._service = service
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._service, name)
+
+        if not callable(attr) or not _takes_session(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def method(db, *args, **kwargs):
+            return await run_in_session(db, attr, *args, **kwargs)
+
+        # 缓存包装结果，避免重复构建
+        setattr(self, name, method)
+        return method
+
+    def __repr__(self) -> str:
+        return f"<AsyncService({self._service.__name__})>"
+
+
+def _takes_session(fn: Any) -> bool:
+    """判断函数的第一个参数是否为数据库会话"""
+    try:
+        params = list(inspect.signature(fn).parameters)
+    except (TypeError, ValueError):
+        return False
+    return bool(params) and params[0] == "db"
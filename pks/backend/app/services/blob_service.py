@@ -0,0 +1,273 @@
+"""
+上传文件服务
+"""
+import base64
+import binascii
+import io
+import re
+import time
+from typing import Any, Dict, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.blob import Blob
+from app.models.card import Card
+from app.services.base import AsyncService
+from app.services.blob_store import blob_store
+
+# 清理孤立文件时每批查询的哈希数
+SWEEP_BATCH_SIZE = 500
+
+# data URI: data:[<媒体类型>][;参数];base64,<数据>
+_DATA_URI = re.compile(r"^data:([\w.+-]+/[\w.+-]+)?((?:;[\w.+-]+=[\w.+-]+)*);base64,", re.IGNORECASE)
+
+# 常见图片格式的文件头
+_SIGNATURES = [
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"BM", "image/bmp"),
+]
+
+
+def sniff_content_type(data: bytes, default: str = "application/octet-stream") -> str:
+    """
+    根据文件头识别图片类型
+
+    Args:
+        data: 文件开头的字节
+        default: 无法识别时的类型
+
+    Returns:
+        str: 媒体类型
+    """
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    for signature, content_type in _SIGNATURES:
+        if data.startswith(signature):
+            return content_type
+    return default
+
+
+def decode_data_uri(content: str) -> Optional[Tuple[bytes, str]]:
+    """
+    解码 Base64 data URI
+
+    Args:
+        content: 卡片内容
+
+    Returns:
+        Optional[Tuple[bytes, str]]: 文件内容和媒体类型，不是 data URI 或解码失败时返回None
+    """
+    match = _DATA_URI.match(content)
+    if match is None:
+        return None
+
+    try:
+        data = base64.b64decode("".join(content[match.end():].split()), validate=True)
+    except (binascii.Error, ValueError):
+        return None
+
+    return data, match.group(1) or sniff_content_type(data)
+
+
+def blob_url(blob: Blob) -> str:
+    """文件下载地址"""
+    return f"{settings.API_V1_PREFIX}/blobs/{blob.id}"
+
+
+def parse_blob_url(content: str) -> Optional[int]:
+    """
+    解析文件下载地址
+
+    Args:
+        content: 卡片内容
+
+    Returns:
+        Optional[int]: 文件ID，不是下载地址时返回None
+    """
+    prefix = f"{settings.API_V1_PREFIX}/blobs/"
+    if not content.startswith(prefix):
+        return None
+    blob_id = content[len(prefix):]
+    return int(blob_id) if blob_id.isdigit() else None
+
+
+def encode_data_uri(sha256: str, content_type: str) -> Optional[str]:
+    """
+    读取文件内容并编码为 Base64 data URI
+
+    Args:
+        sha256: 文件哈希
+        content_type: 媒体类型
+
+    Returns:
+        Optional[str]: data URI，文件不在存储中时返回None
+    """
+    try:
+        with blob_store.open(sha256) as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    return f"data:{content_type};base64,{base64.b64encode(data).decode('ascii')}"
+
+
+def blob_data(blob: Blob) -> Dict[str, Any]:
+    """文件信息字典"""
+    return {
+        "id": blob.id,
+        "sha256": blob.sha256,
+        "size": blob.size,
+        "content_type": blob.content_type,
+        "filename": blob.filename,
+        "url": blob_url(blob),
+        "created_at": blob.created_at
+    }
+
+
+class BlobService:
+    """上传文件服务类"""
+
+    @staticmethod
+    def get_blob(db: Session, blob_id: int, user_id: int) -> Optional[Blob]:
+        """
+        获取文件记录
+
+        Args:
+            db: 数据库会话
+            blob_id: 文件ID
+            user_id: 用户ID
+
+        Returns:
+            Optional[Blob]: 文件记录
+        """
+        return db.query(Blob).filter(
+            Blob.id == blob_id,
+            Blob.user_id == user_id
+        ).first()
+
+    @staticmethod
+    def register_blob(
+        db: Session,
+        user_id: int,
+        sha256: str,
+        size: int,
+        content_type: str,
+        filename: Optional[str] = None,
+        commit: bool = True
+    ) -> Blob:
+        """
+        登记已写入文件存储的文件（同一用户重复上传相同内容时返回已有记录）
+
+        Args:
+            db: 数据库会话
+            user_id: 用户ID
+            sha256: 文件哈希
+            size: 字节数
+            content_type: 媒体类型
+            filename: 原始文件名
+            commit: 是否提交事务（为False时只flush，由调用方提交）
+
+        Returns:
+            Blob: 文件记录
+        """
+        blob = db.query(Blob).filter(
+            Blob.user_id == user_id,
+            Blob.sha256 == sha256
+        ).first()
+
+        if blob is None:
+            blob = Blob(
+                user_id=user_id,
+                sha256=sha256,
+                size=size,
+                content_type=content_type,
+                filename=filename
+            )
+            db.add(blob)
+
+        if commit:
+            db.commit()
+            db.refresh(blob)
+        else:
+            db.flush()
+        return blob
+
+    @staticmethod
+    def store_data_uri(db: Session, user_id: int, content: str) -> Optional[Blob]:
+        """
+        将 Base64 data URI 写入文件存储并登记（不提交事务）
+
+        Args:
+            db: 数据库会话
+            user_id: 用户ID
+            content: 卡片内容
+
+        Returns:
+            Optional[Blob]: 文件记录，内容不是 data URI 时返回None
+        """
+        decoded = decode_data_uri(content)
+        if decoded is None:
+            return None
+
+        data, content_type = decoded
+        sha256, size = blob_store.put(io.BytesIO(data))
+        return BlobService.register_blob(
+            db, user_id, sha256, size, content_type, commit=False
+        )
+
+    @staticmethod
+    def delete_blob(db: Session, blob: Blob) -> None:
+        """
+        删除文件记录
+
+        引用该文件的卡片 blob_id 置空，卡片内容中的下载地址将返回 404。
+        文件内容保留在存储中：检查引用与删除文件之间，并发上传的相同内容可能已重新登记，
+        不再被引用的文件由 sweep_orphans 离线清理。
+
+        Args:
+            db: 数据库会话
+            blob: 文件记录
+        """
+        db.query(Card).filter(Card.blob_id == blob.id).update(
+            {Card.blob_id: None}, synchronize_session=False
+        )
+        db.delete(blob)
+        db.commit()
+
+    @staticmethod
+    def sweep_orphans(db: Session, min_age_seconds: float, dry_run: bool = False) -> int:
+        """
+        删除存储中没有任何文件记录引用的文件
+
+        只处理最后写入时间早于 min_age_seconds 的文件：文件先写入存储再登记记录，
+        刚写入（或重新上传相同内容）的文件可能尚未提交记录。
+
+        Args:
+            db: 数据库会话
+            min_age_seconds: 文件最短存在时间（秒）
+            dry_run: 只统计不删除
+
+        Returns:
+            int: 删除（或 dry_run 时将删除）的文件数
+        """
+        deadline = time.time() - min_age_seconds
+        candidates = [sha256 for sha256, modified in blob_store.iter_blobs() if modified < deadline]
+
+        removed = 0
+        for start in range(0, len(candidates), SWEEP_BATCH_SIZE):
+            chunk = candidates[start:start + SWEEP_BATCH_SIZE]
+            referenced = {
+                sha256 for (sha256,) in db.query(Blob.sha256).filter(Blob.sha256.in_(chunk)).distinct()
+            }
+            for sha256 in chunk:
+                if sha256 in referenced:
+                    continue
+                if not dry_run:
+                    blob_store.delete(sha256)
+                removed += 1
+        return removed
+
+
+# 异步变体
+AsyncBlobService = AsyncService(BlobService)
@@ -0,0 +1,172 @@
+"""
+内容寻址的二进制存储
+
+文件按 SHA-256 存放，相同内容只存一份。BlobStore 定义了存储接口，
+LocalBlobStore 为本地文件系统实现（UPLOAD_DIR），对象存储（如 S3 兼容服务）
+实现相同接口即可替换；本地文件路径不可用时，下载接口改为流式读取。
+
+删除文件记录时不删除文件内容（同一内容可能正在被并发上传重新登记），
+不再被引用的文件由 scripts/sweep_blobs.py 离线清理。
+"""
+import hashlib
+import os
+from abc import ABC, abstractmethod
+import tempfile
+from typing import BinaryIO, Iterator, Optional, Tuple
+from app.core.config import settings
+
+# 读写块大小
+CHUNK_SIZE = 64 * 1024
+
+
+def _is_sha256(value: str) -> bool:
+    """是否为小写十六进制的 SHA-256"""
+    return len(value) == 64 and all(c in "0123456789abcdef" for c in value)
+
+
+class BlobTooLargeError(ValueError):
+    """文件超过大小限制"""
+
+
+class BlobStore(ABC):
+    """二进制存储接口"""
+
+    @abstractmethod
+    def put(self, source: BinaryIO, max_size: Optional[int] = None) -> Tuple[str, int]:
+        """
+        流式写入文件，按内容哈希去重
+
+        Args:
+            source: 可读的文件对象
+            max_size: 最大字节数（None表示不限制）
+
+        Returns:
+            Tuple[str, int]: SHA-256 和字节数
+
+        Raises:
+            BlobTooLargeError: 超过 max_size
+        """
+
+    @abstractmethod
+    def open(self, sha256: str) -> BinaryIO:
+        """
+        打开文件用于读取
+
+        Args:
+            sha256: 文件哈希
+
+        Returns:
+            BinaryIO: 文件对象
+
+        Raises:
+            FileNotFoundError: 文件不存在
+        """
+
+    def local_path(self, sha256: str) -> Optional[str]:
+        """本地文件路径（可直接由 FileResponse 发送），非本地存储返回None"""
+        return None
+
+    @abstractmethod
+    def exists(self, sha256: str) -> bool:
+        """文件是否存在"""
+
+    @abstractmethod
+    def delete(self, sha256: str) -> None:
+        """删除文件（不存在时忽略）"""
+
+    @abstractmethod
+    def iter_blobs(self) -> Iterator[Tuple[str, float]]:
+        """
+        遍历已存储的文件
+
+        Returns:
+            Iterator[Tuple[str, float]]: (SHA-256, 最后写入时间戳)，重复写入相同内容时时间戳会更新
+        """
+
+
+class LocalBlobStore(BlobStore):
+    """本地文件系统存储（<root>/<前2位>/<3-4位>/<哈希>）"""
+
+    def __init__(self, root: str):
+        """
+        Args:
+            root: 存储根目录
+        """
+        self.root = os.path.abspath(root)
+
+    def _path(self, sha256: str) -> str:
+        if not _is_sha256(sha256):
+            raise ValueError("无效的文件哈希")
+        return os.path.join(self.root, sha256[:2], sha256[2:4], sha256)
+
+    def put(self, source: BinaryIO, max_size: Optional[int] = None) -> Tuple[str, int]:
+        os.makedirs(self.root, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+
+        # 先写入临时文件并计算哈希，完成后原子地移动到最终位置
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                while True:
+                    chunk = source.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if max_size is not None and size > max_size:
+                        raise BlobTooLargeError(f"文件大小超过限制（{max_size} 字节）")
+                    digest.update(chunk)
+                    tmp.write(chunk)
+
+            sha256 = digest.hexdigest()
+            path = self._path(sha256)
+            if os.path.exists(path):
+                os.remove(tmp_path)
+                # 刷新写入时间，清理任务不会删除刚被重新上传的内容
+                os.utime(path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(tmp_path, path)
+            return sha256, size
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def open(self, sha256: str) -> BinaryIO:
+        return open(self._path(sha256), "rb")
+
+    def local_path(self, sha256: str) -> Optional[str]:
+        return self._path(sha256)
+
+    def exists(self, sha256: str) -> bool:
+        return os.path.exists(self._path(sha256))
+
+    def delete(self, sha256: str) -> None:
+        try:
+            os.remove(self._path(sha256))
+        except FileNotFoundError:
+            pass
+
+    def iter_blobs(self) -> Iterator[Tuple[str, float]]:
+        for directory, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                # 跳过上传中的临时文件和存储目录中的其他文件
+                if not _is_sha256(filename):
+                    continue
+                try:
+                    yield filename, os.stat(os.path.join(directory, filename)).st_mtime
+                except FileNotFoundError:
+                    continue
+
+
+def _create_store() -> BlobStore:
+    """根据配置创建存储"""
+    backend = settings.BLOB_BACKEND.lower()
+    if backend == "local":
+        return LocalBlobStore(settings.UPLOAD_DIR)
+    raise RuntimeError(f"不支持的文件存储后端: {settings.BLOB_BACKEND}")
+
+
+# 全局实例
+blob_store = _create_store()
@@ -1,13 +1,33 @@
 """
 卡片服务
 """
-from typing import List, Optional, Dict, Any
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_, and_, desc, func
+from typing import List, Optional, Dict, Any, Set
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import or_, and_, desc, func, true
 from app.models.card import Card, CardType
 from app.models.tag import CardTag, Tag
 from app.models.link import CardLink, LinkType
 from app.schemas.card import CardCreate, CardUpdate
+from app.core.response_cache import response_cache, SCOPE_CARDS, SCOPE_TAGS, SCOPE_KANBAN
+from app.services.base import AsyncService
+from app.services.view_counter import view_counter
+from app.services.search_index import SearchIndex
+from app.services.tag_service import TagService
+from app.services.graph_service import GraphService
+from app.services.blob_service import BlobService, blob_url
+from app.utils.pagination import encode_cursor, decode_cursor, keyset_filter
+from app.utils.bulk import insert_ignore
+from app.utils.projection import list_options
+from app.utils.links import canonical_link, link_between, card_links_query, is_outgoing, is_incoming
+
+# 卡片列表允许的排序字段
+SORTABLE_COLUMNS = {
+    "created_at": Card.created_at,
+    "updated_at": Card.updated_at,
+    "title": Card.title,
+    "view_count": Card.view_count,
+    "id": Card.id,
+}
 
 
 class CardService:
@@ -30,6 +50,25 @@ class CardService:
             and_(Card.id == card_id, Card.user_id == user_id)
         ).first()
 
+    @staticmethod
+    def get_card_with_tags(db: Session, card_id: int) -> Card:
+        """
+        重新加载卡片及其标签
+
+        刷新所有列（包括数据库生成的时间戳），并预加载标签，
+        以便在会话之外构建响应时不再触发延迟加载。
+
+        Args:
+            db: 数据库会话
+            card_id: 卡片ID
+
+        Returns:
+            Card: 卡片对象
+        """
+        return db.query(Card).options(
+            selectinload(Card.tags).joinedload(CardTag.tag)
+        ).populate_existing().filter(Card.id == card_id).one()
+
     @staticmethod
     def get_cards(
         db: Session,
@@ -38,14 +77,22 @@ class CardService:
         limit: int = 20,
         card_type: Optional[CardType] = None,
         tag_id: Optional[int] = None,
+        include_descendants: bool = False,
         is_pinned: Optional[bool] = None,
         search: Optional[str] = None,
         sort_by: str = "created_at",
-        order: str = "desc"
-    ) -> tuple[List[Card], int]:
+        order: str = "desc",
+        cursor: Optional[str] = None,
+        with_total: bool = True,
+        fields: Optional[Set[str]] = None
+    ) -> tuple[List[Card], Optional[int], Optional[str]]:
         """
         获取卡片列表
 
+        按 (排序字段, id) 排序；传入 cursor 时使用 keyset 分页并忽略 skip，
+        翻页代价与页码深度无关。
+        只加载列表所需的列和内容摘要（Card.snippet），完整内容需通过 fields 请求。
+
         Args:
             db: 数据库会话
             user_id: 用户ID
@@ -53,13 +100,21 @@ class CardService:
             limit: 返回记录数
             card_type: 卡片类型筛选
             tag_id: 标签筛选
+            include_descendants: 标签筛选是否包含子孙标签
             is_pinned: 是否置顶
             search: 搜索关键词
             sort_by: 排序字段
             order: 排序方向
+            cursor: 上一页返回的游标
+            with_total: 是否统计总数
+            fields: 额外加载的字段（如 content）
 
         Returns:
-            tuple[List[Card], int]: 卡片列表和总数
+            tuple[List[Card], Optional[int], Optional[str]]:
+            卡片列表、总数（未统计时为None）和下一页游标（没有更多时为None）
+
+        Raises:
+            ValueError: 游标无效或与排序方式不一致
         """
         # 构建查询
         query = db.query(Card).filter(Card.user_id == user_id)
@@ -69,41 +124,75 @@ class CardService:
             query = query.filter(Card.card_type == card_type)
 
         # 标签筛选
-        if tag_id:
+        if tag_id and include_descendants:
+            subtree = TagService.subtree_query(tag_id, user_id)
+            query = query.filter(Card.id.in_(
+                db.query(CardTag.card_id).filter(CardTag.tag_id.in_(subtree))
+            ))
+        elif tag_id:
             query = query.join(CardTag).filter(CardTag.tag_id == tag_id)
 
         # 置顶筛选
         if is_pinned is not None:
             query = query.filter(Card.is_pinned == is_pinned)
 
-        # 搜索
+        # 搜索（优先使用全文索引，不可用时回退到LIKE）
         if search:
-            search_pattern = f"%{search}%"
-            query = query.filter(
-                or_(
-                    Card.title.like(search_pattern),
-                    Card.content.like(search_pattern)
+            indexed = SearchIndex.apply(db, query, search)
+            if indexed is not None:
+                query = indexed[0]
+            else:
+                search_pattern = f"%{search}%"
+                query = query.filter(
+                    or_(
+                        Card.title.like(search_pattern),
+                        Card.content.like(search_pattern)
+                    )
                 )
-            )
 
-        # 获取总数
-        total = query.count()
+        # 获取总数（可选）
+        total = query.count() if with_total else None
 
-        # 排序
-        sort_column = getattr(Card, sort_by, Card.created_at)
-        if order == "desc":
-            query = query.order_by(desc(sort_column))
-        else:
-            query = query.order_by(sort_column)
+        # 排序（id 作为唯一的次级排序键）
+        sort_column = SORTABLE_COLUMNS.get(sort_by, Card.created_at)
+        sort_keys = [sort_column] if sort_column is Card.id else [sort_column, Card.id]
+        descending = order == "desc"
+        cursor_key = f"{sort_column.key}:{'desc' if descending else 'asc'}"
+
+        query = query.order_by(
+            *[desc(key) if descending else key for key in sort_keys]
+        )
 
         # 分页
-        cards = query.offset(skip).limit(limit).all()
+        if cursor:
+            query = query.filter(
+                keyset_filter(
+                    sort_keys,
+                    decode_cursor(cursor, cursor_key),
+                    descending,
+                    dialect_name=db.get_bind().dialect.name
+                )
+            )
+        else:
+            query = query.offset(skip)
+
+        # 标签及其名称、颜色随列表一次性预加载，避免逐行查询
+        query = query.options(
+            *list_options(fields or set()),
+            selectinload(Card.tags).joinedload(CardTag.tag)
+        )
 
-        # 加载标签关系
-        for card in cards:
-            db.refresh(card, attribute_names=['tags'])
+        # 多取一条用于判断是否还有下一页
+        cards = query.limit(limit + 1).all()
+        next_cursor = None
+        if len(cards) > limit:
+            cards = cards[:limit]
+            next_cursor = encode_cursor(
+                [getattr(cards[-1], key.key) for key in sort_keys],
+                cursor_key
+            )
 
-        return cards, total
+        return cards, total, next_cursor
 
     @staticmethod
     def create_card(db: Session, user_id: int, card_in: CardCreate) -> Card:
@@ -126,44 +215,30 @@ class CardService:
             card_type=card_in.card_type,
             url=card_in.url
         )
+        CardService._store_inline_image(db, user_id, db_card)
         db.add(db_card)
         db.flush()  # 获取card_id
 
-        # 添加标签关联
+        # 添加标签关联（忽略不存在或不属于当前用户的标签）
         if card_in.tag_ids:
-            for tag_id in card_in.tag_ids:
-                # 验证标签是否存在且属于当前用户
-                tag = db.query(Tag).filter(
-                    and_(Tag.id == tag_id, Tag.user_id == user_id)
-                ).first()
-                if tag:
-                    card_tag = CardTag(card_id=db_card.id, tag_id=tag_id)
-                    db.add(card_tag)
-
-        # 创建双向链接
+            CardService._add_tags(db, db_card, card_in.tag_ids)
+
+        # 创建链接（每条链接一行，忽略不存在或不属于当前用户的卡片）
         if card_in.link_ids:
-            for target_id in card_in.link_ids:
-                # 验证目标卡片是否存在且属于当前用户
-                target_card = CardService.get_card_by_id(db, target_id, user_id)
-                if target_card and target_id != db_card.id:
-                    # 创建正向链接
-                    link1 = CardLink(
-                        source_card_id=db_card.id,
-                        target_card_id=target_id,
-                        link_type=LinkType.REFERENCE
-                    )
-                    # 创建反向链接
-                    link2 = CardLink(
-                        source_card_id=target_id,
-                        target_card_id=db_card.id,
-                        link_type=LinkType.REFERENCE
-                    )
-                    db.add(link1)
-                    db.add(link2)
+            owned_card_ids = CardService._owned_ids(db, Card, card_in.link_ids, user_id)
+            insert_ignore(db, CardLink.__table__, [
+                canonical_link(db_card.id, target_id)
+                for target_id in dict.fromkeys(card_in.link_ids)
+                if target_id in owned_card_ids and target_id != db_card.id
+            ])
 
         db.commit()
-        db.refresh(db_card)
-        return db_card
+        if card_in.link_ids:
+            GraphService.invalidate(user_id)
+        response_cache.invalidate(
+            user_id, SCOPE_CARDS, *([SCOPE_TAGS] if card_in.tag_ids else [])
+        )
+        return CardService.get_card_with_tags(db, db_card.id)
 
     @staticmethod
     def update_card(
@@ -191,24 +266,72 @@ class CardService:
         for field, value in update_data.items():
             setattr(card, field, value)
 
+        if "content" in update_data or "card_type" in update_data:
+            CardService._store_inline_image(db, card.user_id, card)
+
         # 更新标签关联
         if tag_ids is not None:
             # 删除旧的标签关联
             db.query(CardTag).filter(CardTag.card_id == card.id).delete()
 
             # 添加新的标签关联
-            for tag_id in tag_ids:
-                # 验证标签是否存在且属于当前用户
-                tag = db.query(Tag).filter(
-                    and_(Tag.id == tag_id, Tag.user_id == card.user_id)
-                ).first()
-                if tag:
-                    card_tag = CardTag(card_id=card.id, tag_id=tag_id)
-                    db.add(card_tag)
+            CardService._add_tags(db, card, tag_ids)
 
         db.commit()
-        db.refresh(card)
-        return card
+        # 看板中显示卡片标题
+        scopes = [SCOPE_CARDS, SCOPE_KANBAN]
+        if tag_ids is not None:
+            scopes.append(SCOPE_TAGS)
+        response_cache.invalidate(card.user_id, *scopes)
+        return CardService.get_card_with_tags(db, card.id)
+
+    @staticmethod
+    def _owned_ids(db: Session, model, ids: List[int], user_id: int) -> Set[int]:
+        """
+        一次查询筛选出属于当前用户的记录ID
+
+        Args:
+            db: 数据库会话
+            model: 带 id 和 user_id 列的模型（Card / Tag）
+            ids: 待校验的ID列表
+            user_id: 用户ID
+
+        Returns:
+            Set[int]: 存在且属于当前用户的ID
+        """
+        if not ids:
+            return set()
+        return {row[0] for row in db.query(model.id).filter(
+            and_(model.id.in_(set(ids)), model.user_id == user_id)
+        )}
+
+    @staticmethod
+    def _add_tags(db: Session, card: Card, tag_ids: List[int]) -> None:
+        """
+        为卡片添加标签关联（一条多值 INSERT，忽略重复、不存在或不属于卡片所有者的标签）
+
+        Args:
+            db: 数据库会话
+            card: 卡片对象（已分配ID）
+            tag_ids: 标签ID列表
+        """
+        owned_tag_ids = CardService._owned_ids(db, Tag, tag_ids, card.user_id)
+        insert_ignore(db, CardTag.__table__, [
+            {"card_id": card.id, "tag_id": tag_id}
+            for tag_id in dict.fromkeys(tag_ids)
+            if tag_id in owned_tag_ids
+        ])
+
+    @staticmethod
+    def _store_inline_image(db: Session, user_id: int, card: Card) -> None:
+        """图片卡片的 Base64 内容转存到文件存储，内容替换为文件下载地址"""
+        if card.card_type != CardType.IMAGE or not card.content.startswith("data:"):
+            return
+
+        blob = BlobService.store_data_uri(db, user_id, card.content)
+        if blob is not None:
+            card.content = blob_url(blob)
+            card.blob_id = blob.id
 
     @staticmethod
     def delete_card(db: Session, card: Card) -> None:
@@ -221,6 +344,8 @@ class CardService:
         """
         db.delete(card)
         db.commit()
+        GraphService.invalidate(card.user_id)
+        response_cache.invalidate(card.user_id, SCOPE_CARDS, SCOPE_TAGS, SCOPE_KANBAN)
 
     @staticmethod
     def batch_delete_cards(db: Session, card_ids: List[int], user_id: int) -> int:
@@ -243,64 +368,59 @@ class CardService:
             )
         ).delete(synchronize_session=False)
         db.commit()
+        GraphService.invalidate(user_id)
+        response_cache.invalidate(user_id, SCOPE_CARDS, SCOPE_TAGS, SCOPE_KANBAN)
         return count
 
     @staticmethod
-    def increment_view_count(db: Session, card: Card) -> None:
+    def increment_view_count(card: Card) -> int:
         """
         增加卡片浏览次数
 
+        计数先缓存在进程内，由 view_counter 后台任务批量写回数据库。
+
         Args:
-            db: 数据库会话
             card: 卡片对象
+
+        Returns:
+            int: 包含未写回部分的当前浏览次数
         """
-        card.view_count += 1
-        db.commit()
+        return card.view_count + view_counter.record(card.id)
 
     @staticmethod
-    def get_card_links(db: Session, card: Card) -> Dict[str, List[Dict]]:
+    def get_card_links(
+        db: Session,
+        card: Card,
+        link_type: Optional[LinkType] = None
+    ) -> Dict[str, List[Dict]]:
         """
         获取卡片的所有链接
 
+        出链和入链用一条 UNION ALL 查询取回，链接类型筛选在SQL中完成。
+        无方向的链接同时出现在出链和入链中。
+
         Args:
             db: 数据库会话
             card: 卡片对象
+            link_type: 链接类型筛选（None表示全部）
 
         Returns:
             Dict: 包含出链和入链的字典
         """
-        # 正向链接（我链接到的卡片）
-        outgoing_links = db.query(CardLink).filter(
-            CardLink.source_card_id == card.id
-        ).all()
-
-        # 反向链接（链接到我的卡片）
-        incoming_links = db.query(CardLink).filter(
-            CardLink.target_card_id == card.id
-        ).all()
-
-        # 构建响应数据
-        outgoing = []
-        for link in outgoing_links:
-            target_card = db.query(Card).filter(Card.id == link.target_card_id).first()
-            if target_card:
-                outgoing.append({
-                    "id": target_card.id,
-                    "title": target_card.title,
-                    "link_type": link.link_type,
-                    "created_at": link.created_at
-                })
-
-        incoming = []
-        for link in incoming_links:
-            source_card = db.query(Card).filter(Card.id == link.source_card_id).first()
-            if source_card:
-                incoming.append({
-                    "id": source_card.id,
-                    "title": source_card.title,
-                    "link_type": link.link_type,
-                    "created_at": link.created_at
-                })
+        outgoing = []  # 我链接到的卡片
+        incoming = []  # 链接到我的卡片
+
+        for row in db.execute(card_links_query(card.id, link_type)).all():
+            item = {
+                "id": row.id,
+                "title": row.title,
+                "link_type": row.link_type,
+                "created_at": row.created_at
+            }
+            if is_outgoing(row.is_source, row.direction):
+                outgoing.append(item)
+            if is_incoming(row.is_source, row.direction):
+                incoming.append(item)
 
         return {
             "outgoing": outgoing,
@@ -341,31 +461,17 @@ class CardService:
         if target_card_id == source_card.id:
             raise ValueError("不能链接到自己")
 
-        # 检查链接是否已存在
-        existing = db.query(CardLink).filter(
-            and_(
-                CardLink.source_card_id == source_card.id,
-                CardLink.target_card_id == target_card_id
-            )
+        # 检查链接是否已存在（任一方向）
+        existing = db.query(CardLink.id).filter(
+            link_between(source_card.id, target_card_id)
         ).first()
 
         if existing:
             raise ValueError("链接已存在")
 
-        # 创建双向链接
-        link1 = CardLink(
-            source_card_id=source_card.id,
-            target_card_id=target_card_id,
-            link_type=link_type
-        )
-        link2 = CardLink(
-            source_card_id=target_card_id,
-            target_card_id=source_card.id,
-            link_type=link_type
-        )
-        db.add(link1)
-        db.add(link2)
+        db.add(CardLink(**canonical_link(source_card.id, target_card_id, link_type)))
         db.commit()
+        GraphService.add_edge(source_card.user_id, source_card.id, target_card_id, LinkType(link_type).value)
 
         return {
             "source_card": {"id": source_card.id, "title": source_card.title},
@@ -383,23 +489,12 @@ class CardService:
             source_card: 源卡片
             target_card_id: 目标卡片ID
         """
-        # 删除正向链接
         db.query(CardLink).filter(
-            and_(
-                CardLink.source_card_id == source_card.id,
-                CardLink.target_card_id == target_card_id
-            )
-        ).delete()
-
-        # 删除反向链接
-        db.query(CardLink).filter(
-            and_(
-                CardLink.source_card_id == target_card_id,
-                CardLink.target_card_id == source_card.id
-            )
-        ).delete()
+            link_between(source_card.id, target_card_id)
+        ).delete(synchronize_session=False)
 
         db.commit()
+        GraphService.remove_edge(source_card.user_id, source_card.id, target_card_id)
 
     @staticmethod
     def batch_tag_cards(
@@ -411,6 +506,8 @@ class CardService:
         """
         批量为卡片打标签
 
+        不属于当前用户的卡片和标签会被忽略，已存在的关联不会重复创建。
+
         Args:
             db: 数据库会话
             card_ids: 卡片ID列表
@@ -418,35 +515,70 @@ class CardService:
             user_id: 用户ID
 
         Returns:
-            int: 影响的卡片数量
+            int: 新建的关联数量
         """
-        affected_count = 0
-
-        for card_id in card_ids:
-            # 验证卡片是否存在
-            card = CardService.get_card_by_id(db, card_id, user_id)
-            if not card:
-                continue
-
-            # 为每个标签创建关联
-            for tag_id in tag_ids:
-                # 检查关联是否已存在
-                existing = db.query(CardTag).filter(
-                    and_(
-                        CardTag.card_id == card_id,
-                        CardTag.tag_id == tag_id
-                    )
-                ).first()
-
-                if not existing:
-                    # 验证标签是否存在且属于当前用户
-                    tag = db.query(Tag).filter(
-                        and_(Tag.id == tag_id, Tag.user_id == user_id)
-                    ).first()
-                    if tag:
-                        card_tag = CardTag(card_id=card_id, tag_id=tag_id)
-                        db.add(card_tag)
-                        affected_count += 1
+        # 校验归属
+        owned_card_ids = list(CardService._owned_ids(db, Card, card_ids, user_id))
+        owned_tag_ids = list(CardService._owned_ids(db, Tag, tag_ids, user_id))
+        if not owned_card_ids or not owned_tag_ids:
+            return 0
+
+        # 计算尚不存在的 (卡片, 标签) 组合
+        missing = db.query(Card.id, Tag.id).select_from(Card).join(Tag, true()).filter(
+            Card.id.in_(owned_card_ids),
+            Tag.id.in_(owned_tag_ids),
+            ~db.query(CardTag.id).filter(
+                and_(CardTag.card_id == Card.id, CardTag.tag_id == Tag.id)
+            ).exists()
+        ).all()
+
+        # 并发请求可能已插入相同组合，由唯一约束兜底
+        affected_count = insert_ignore(db, CardTag.__table__, [
+            {"card_id": card_id, "tag_id": tag_id} for card_id, tag_id in missing
+        ])
 
         db.commit()
+        if affected_count:
+            response_cache.invalidate(user_id, SCOPE_CARDS, SCOPE_TAGS)
         return affected_count
+
+    @staticmethod
+    def batch_untag_cards(
+        db: Session,
+        card_ids: List[int],
+        tag_ids: List[int],
+        user_id: int
+    ) -> int:
+        """
+        批量移除卡片标签
+
+        Args:
+            db: 数据库会话
+            card_ids: 卡片ID列表
+            tag_ids: 标签ID列表
+            user_id: 用户ID
+
+        Returns:
+            int: 移除的关联数量
+        """
+        owned_cards = db.query(Card.id).filter(
+            and_(Card.id.in_(set(card_ids)), Card.user_id == user_id)
+        )
+        owned_tags = db.query(Tag.id).filter(
+            and_(Tag.id.in_(set(tag_ids)), Tag.user_id == user_id)
+        )
+
+        count = db.query(CardTag).filter(
+            and_(
+                CardTag.card_id.in_(owned_cards.scalar_subquery()),
+                CardTag.tag_id.in_(owned_tags.scalar_subquery())
+            )
+        ).delete(synchronize_session=False)
+        db.commit()
+        if count:
+            response_cache.invalidate(user_id, SCOPE_CARDS, SCOPE_TAGS)
+        return count
+
+
+# 异步变体（在 AsyncSession 或线程池中执行，不阻塞事件循环）
+AsyncCardService = AsyncService(CardService)
@@ -0,0 +1,363 @@
+"""
+卡片链接图服务
+
+每个用户的链接图以邻接表形式缓存在进程内（一次查询构建），
+k 跳邻域、最短路径和连通分量都在邻接表上计算，不再逐跳查询数据库。
+
+创建/删除链接时增量更新邻接表；删除卡片时整体失效，下次访问重新构建。
+多进程部署时各 worker 独立缓存，其他 worker 的写操作最多延迟
+GRAPH_INDEX_TTL_SECONDS 可见。
+"""
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional
+from sqlalchemy.orm import Session
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.card import Card
+from app.models.link import CardLink
+from app.services.base import AsyncService
+
+# 邻接表：卡片ID -> {相邻卡片ID: 链接类型}
+Adjacency = Dict[int, Dict[int, str]]
+
+_index = TTLCache(max_size=settings.GRAPH_INDEX_MAX_USERS, ttl=settings.GRAPH_INDEX_TTL_SECONDS)
+
+# 写操作串行化；版本号用于丢弃构建期间被修改过的邻接表
+_lock = threading.Lock()
+_versions: Dict[int, int] = {}
+
+
+def _bump(user_id: int) -> None:
+    """递增用户邻接表版本号（需持有 _lock）"""
+    _versions[user_id] = _versions.get(user_id, 0) + 1
+
+
+class GraphService:
+    """卡片链接图服务类"""
+
+    @staticmethod
+    def get_adjacency(db: Session, user_id: int) -> Adjacency:
+        """
+        获取用户链接图的邻接表
+
+        邻接表只读，修改时整体替换（写时复制），并发读取无需加锁。
+
+        Args:
+            db: 数据库会话
+            user_id: 用户ID
+
+        Returns:
+            Adjacency: 邻接表（无向）
+        """
+        adjacency = _index.get(user_id)
+        if adjacency is not None:
+            return adjacency
+
+        with _lock:
+            version = _versions.get(user_id, 0)
+
+        rows = db.query(
+            CardLink.source_card_id,
+            CardLink.target_card_id,
+            CardLink.link_type
+        ).join(
+            Card, Card.id == CardLink.source_card_id
+        ).filter(Card.user_id == user_id).all()
+
+        adjacency = {}
+        for source_id, target_id, link_type in rows:
+            adjacency.setdefault(source_id, {})[target_id] = link_type
+            adjacency.setdefault(target_id, {})[source_id] = link_type
+
+        with _lock:
+            if _versions.get(user_id, 0) == version:
+                _index.set(user_id, adjacency)
+        return adjacency
+
+    @staticmethod
+    def add_edge(user_id: int, card_id: int, other_id: int, link_type: str) -> None:
+        """
+        在已缓存的邻接表中加入一条链接（链接提交后调用）
+
+        Args:
+            user_id: 用户ID
+            card_id: 卡片ID
+            other_id: 相邻卡片ID
+            link_type: 链接类型
+        """
+        with _lock:
+            _bump(user_id)
+            adjacency = _index.get(user_id)
+            if adjacency is None:
+                return
+            adjacency = dict(adjacency)
+            adjacency[card_id] = {**adjacency.get(card_id, {}), other_id: link_type}
+            adjacency[other_id] = {**adjacency.get(other_id, {}), card_id: link_type}
+            _index.set(user_id, adjacency)
+
+    @staticmethod
+    def remove_edge(user_id: int, card_id: int, other_id: int) -> None:
+        """
+        从已缓存的邻接表中移除一条链接（链接删除提交后调用）
+
+        Args:
+            user_id: 用户ID
+            card_id: 卡片ID
+            other_id: 相邻卡片ID
+        """
+        with _lock:
+            _bump(user_id)
+            adjacency = _index.get(user_id)
+            if adjacency is None:
+                return
+            adjacency = dict(adjacency)
+            for a, b in ((card_id, other_id), (other_id, card_id)):
+                neighbours = {k: v for k, v in adjacency.get(a, {}).items() if k != b}
+                if neighbours:
+                    adjacency[a] = neighbours
+                else:
+                    adjacency.pop(a, None)
+            _index.set(user_id, adjacency)
+
+    @staticmethod
+    def invalidate(user_id: int) -> None:
+        """
+        使用户的邻接表失效（删除卡片等批量变化后调用）
+
+        Args:
+            user_id: 用户ID
+        """
+        with _lock:
+            _bump(user_id)
+            _index.delete(user_id)
+
+    @staticmethod
+    def get_neighbourhood(
+        db: Session,
+        user_id: int,
+        card_id: int,
+        depth: int = 2,
+        max_nodes: int = 100
+    ) -> Dict[str, Any]:
+        """
+        获取卡片的 k 跳邻域
+
+        按广度优先逐层展开，节点数达到 max_nodes 时停止。
+
+        Args:
+            db: 数据库会话
+            user_id: 用户ID
+            card_id: 中心卡片ID
+            depth: 最大跳数
+            max_nodes: 最多返回的节点数（含中心卡片）
+
+        Returns:
+            Dict: nodes（含与中心的距离 depth）、edges 和是否被截断 truncated
+        """
+        adjacency = GraphService.get_adjacency(db, user_id)
+        distances = {card_id: 0}
+        frontier = [card_id]
+        truncated = False
+
+        for level in range(1, depth + 1):
+            next_frontier = []
+            for node in frontier:
+                for neighbour in adjacency.get(node, {}):
+                    if neighbour in distances:
+                        continue
+                    if len(distances) >= max_nodes:
+                        truncated = True
+                        break
+                    distances[neighbour] = level
+                    next_frontier.append(neighbour)
+                if truncated:
+                    break
+            if truncated or not next_frontier:
+                break
+            frontier = next_frontier
+
+        edges = [
+            {"source": node, "target": neighbour, "link_type": link_type}
+            for node in distances
+            for neighbour, link_type in adjacency.get(node, {}).items()
+            if node < neighbour and neighbour in distances
+        ]
+
+        cards = GraphService._card_nodes(db, user_id, list(distances))
+        nodes = [
+            {**cards[node], "depth": distances[node]}
+            for node in distances if node in cards
+        ]
+        nodes.sort(key=lambda item: (item["depth"], item["id"]))
+
+        return {"nodes": nodes, "edges": edges, "truncated": truncated}
+
+    @staticmethod
+    def shortest_path(
+        db: Session,
+        user_id: int,
+        source_id: int,
+        target_id: int,
+        max_depth: int = 6
+    ) -> Dict[str, Any]:
+        """
+        获取两张卡片之间的最短路径（双向广度优先搜索）
+
+        Args:
+            db: 数据库会话
+            user_id: 用户ID
+            source_id: 起点卡片ID
+            target_id: 终点卡片ID
+            max_depth: 最大路径长度（跳数）
+
+        Returns:
+            Dict: path（路径上的卡片，不可达时为空列表）和 length（不可达时为None）
+
+        Raises:
+            ValueError: 终点卡片不存在
+        """
+        if not GraphService._card_nodes(db, user_id, [target_id]):
+            raise ValueError("目标卡片不存在")
+
+        adjacency = GraphService.get_adjacency(db, user_id)
+        path = _bidirectional_search(adjacency, source_id, target_id, max_depth)
+        if path is None:
+            return {"path": [], "length": None}
+
+        cards = GraphService._card_nodes(db, user_id, path)
+        return {
+            "path": [cards[node] for node in path if node in cards],
+            "length": len(path) - 1
+        }
+
+    @staticmethod
+    def get_components(
+        db: Session,
+        user_id: int,
+        min_size: int = 2,
+        limit: int = 20
+    ) -> Dict[str, Any]:
+        """
+        获取链接图的连通分量
+
+        没有任何链接的卡片不属于任何分量。
+
+        Args:
+            db: 数据库会话
+            user_id: 用户ID
+            min_size: 最小分量大小
+            limit: 最多返回的分量数（按大小降序）
+
+        Returns:
+            Dict: components（每个分量的 size 和 card_ids）和分量总数 total
+        """
+        adjacency = GraphService.get_adjacency(db, user_id)
+        seen = set()
+        components = []
+
+        for start in adjacency:
+            if start in seen:
+                continue
+            seen.add(start)
+            members = [start]
+            queue = deque([start])
+            while queue:
+                for neighbour in adjacency.get(queue.popleft(), {}):
+                    if neighbour not in seen:
+                        seen.add(neighbour)
+                        members.append(neighbour)
+                        queue.append(neighbour)
+            if len(members) >= min_size:
+                components.append(sorted(members))
+
+        components.sort(key=lambda members: (-len(members), members[0]))
+        return {
+            "components": [
+                {"size": len(members), "card_ids": members}
+                for members in components[:limit]
+            ],
+            "total": len(components)
+        }
+
+    @staticmethod
+    def _card_nodes(db: Session, user_id: int, card_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """批量查询卡片的展示信息"""
+        if not card_ids:
+            return {}
+
+        rows = db.query(Card.id, Card.title, Card.card_type).filter(
+            Card.id.in_(card_ids),
+            Card.user_id == user_id
+        ).all()
+        return {
+            row.id: {"id": row.id, "title": row.title, "card_type": row.card_type}
+            for row in rows
+        }
+
+
+def _bidirectional_search(
+    adjacency: Adjacency,
+    source_id: int,
+    target_id: int,
+    max_depth: int
+) -> Optional[List[int]]:
+    """
+    双向广度优先搜索
+
+    每次展开较小的一侧，两侧相遇即得到最短路径。
+
+    Returns:
+        Optional[List[int]]: 路径上的卡片ID（含两端），不可达或超过 max_depth 时为None
+    """
+    if source_id == target_id:
+        return [source_id]
+
+    parents = {source_id: None}
+    children = {target_id: None}
+    forward, backward = [source_id], [target_id]
+
+    for _ in range(max_depth):
+        expand_forward = len(forward) <= len(backward)
+        frontier = forward if expand_forward else backward
+        visited, other = (parents, children) if expand_forward else (children, parents)
+
+        next_frontier = []
+        meeting = None
+        for node in frontier:
+            for neighbour in adjacency.get(node, {}):
+                if neighbour in visited:
+                    continue
+                visited[neighbour] = node
+                if neighbour in other:
+                    meeting = neighbour
+                    break
+                next_frontier.append(neighbour)
+            if meeting is not None:
+                break
+
+        if meeting is not None:
+            path = []
+            node = meeting
+            while node is not None:
+                path.append(node)
+                node = parents[node]
+            path.reverse()
+            node = children[meeting]
+            while node is not None:
+                path.append(node)
+                node = children[node]
+            return path
+
+        if not next_frontier:
+            return None
+        if expand_forward:
+            forward = next_frontier
+        else:
+            backward = next_frontier
+
+    return None
+
+
+# 异步变体
+AsyncGraphService = AsyncService(GraphService)
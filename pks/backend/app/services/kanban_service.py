@@ -1,17 +1,51 @@
 """
 看板服务
+
+列和卡片按排序键（rank）排序，插入或移动只修改被移动的一行，
+对外接口中的 position 为在列表中的下标。
 """
-from typing import List, Optional
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
+from sqlalchemy import and_, or_, case, cast, func, insert, literal, update, String
+from app.db.base import SessionLocal
 from app.models.kanban import KanbanColumn, KanbanCard
 from app.models.card import Card
 from app.schemas.kanban import KanbanColumnCreate, KanbanColumnUpdate
+from app.core.response_cache import response_cache, SCOPE_KANBAN
+from app.services.base import AsyncService
+from app.utils.rank import rank_between, initial_ranks, needs_rebalance
+
+# 追加到列尾时使用的位置（大于任何列的长度）
+APPEND_POSITION = 2 ** 31 - 1
+
+# 并发写入同一间隙导致排序键重复时的最大尝试次数
+RANK_CONFLICT_ATTEMPTS = 3
+
+T = TypeVar("T")
 
 
 class KanbanService:
     """看板服务类"""
 
+    @staticmethod
+    def get_column_by_id(db: Session, column_id: int, user_id: int) -> Optional[KanbanColumn]:
+        """
+        获取看板列
+
+        Args:
+            db: 数据库会话
+            column_id: 列ID
+            user_id: 用户ID
+
+        Returns:
+            Optional[KanbanColumn]: 列对象
+        """
+        return db.query(KanbanColumn).filter(
+            and_(KanbanColumn.id == column_id, KanbanColumn.user_id == user_id)
+        ).first()
+
     @staticmethod
     def init_default_columns(db: Session, user_id: int) -> None:
         """
@@ -30,30 +64,36 @@ class KanbanService:
             return
 
         # 创建默认三列
-        default_columns = [
-            {"name": "待处理", "position": 0},
-            {"name": "进行中", "position": 1},
-            {"name": "已完成", "position": 2}
-        ]
+        default_columns = ["待处理", "进行中", "已完成"]
 
-        for col in default_columns:
+        for name, rank in zip(default_columns, initial_ranks(len(default_columns))):
             db_col = KanbanColumn(
                 user_id=user_id,
-                name=col["name"],
-                position=col["position"]
+                name=name,
+                rank=rank
             )
             db.add(db_col)
 
         db.commit()
+        response_cache.invalidate(user_id, SCOPE_KANBAN)
 
     @staticmethod
-    def get_kanban_board(db: Session, user_id: int) -> List[dict]:
+    def get_kanban_board(
+        db: Session,
+        user_id: int,
+        cards_limit: Optional[int] = None
+    ) -> List[dict]:
         """
         获取看板配置（包含所有列和卡片）
 
+        所有列的卡片通过一条窗口查询一次取回，再按列分组；
+        指定 cards_limit 时每列只返回前 N 张卡片，其余通过
+        get_column_cards 按游标继续加载。
+
         Args:
             db: 数据库会话
             user_id: 用户ID
+            cards_limit: 每列最多返回的卡片数（None表示不限制）
 
         Returns:
             List[dict]: 看板列列表（包含卡片）
@@ -61,114 +101,197 @@ class KanbanService:
         # 获取所有列
         columns = db.query(KanbanColumn).filter(
             KanbanColumn.user_id == user_id
-        ).order_by(KanbanColumn.position).all()
+        ).order_by(KanbanColumn.rank).all()
+
+        if not columns:
+            return []
+
+        # 一次查询取回所有列的卡片，并用窗口函数计算列内序号和列内总数
+        ranked = db.query(
+            KanbanCard.column_id,
+            KanbanCard.rank,
+            Card.id.label("card_id"),
+            Card.title,
+            func.row_number().over(
+                partition_by=KanbanCard.column_id,
+                order_by=KanbanCard.rank
+            ).label("row_number"),
+            func.count().over(
+                partition_by=KanbanCard.column_id
+            ).label("column_total")
+        ).join(
+            Card, Card.id == KanbanCard.card_id
+        ).filter(
+            KanbanCard.column_id.in_([column.id for column in columns])
+        ).subquery()
+
+        query = db.query(ranked)
+        if cards_limit is not None:
+            query = query.filter(ranked.c.row_number <= cards_limit)
+
+        cards_by_column = defaultdict(list)
+        totals = {}
+        for row in query.order_by(ranked.c.column_id, ranked.c.rank).all():
+            cards_by_column[row.column_id].append({
+                "id": row.card_id,
+                "title": row.title,
+                "position": row.row_number - 1,
+                "rank": row.rank
+            })
+            totals[row.column_id] = row.column_total
 
         result = []
-        for column in columns:
-            # 获取列中的卡片
-            kanban_cards = db.query(KanbanCard).filter(
-                KanbanCard.column_id == column.id
-            ).order_by(KanbanCard.position).all()
-
-            cards_data = []
-            for kc in kanban_cards:
-                card = db.query(Card).filter(Card.id == kc.card_id).first()
-                if card:
-                    cards_data.append({
-                        "id": card.id,
-                        "title": card.title,
-                        "position": kc.position
-                    })
+        for position, column in enumerate(columns):
+            cards_data = cards_by_column.get(column.id, [])
+            cards_count = totals.get(column.id, 0)
+            next_cursor = None
+            if cards_data and cards_count > len(cards_data):
+                next_cursor = cards_data[-1]["rank"]
 
             result.append({
-                "id": column.id,
-                "name": column.name,
-                "position": column.position,
-                "user_id": column.user_id,
-                "created_at": column.created_at,
-                "updated_at": column.updated_at,
-                "cards_count": len(cards_data),
-                "cards": cards_data
+                **_column_data(column, position),
+                "cards_count": cards_count,
+                "cards": cards_data,
+                "next_cursor": next_cursor
             })
 
         return result
 
+    @staticmethod
+    def get_column_cards(
+        db: Session,
+        user_id: int,
+        column_id: int,
+        cursor: Optional[str] = None,
+        limit: int = 50
+    ) -> dict:
+        """
+        按游标加载看板列中的更多卡片
+
+        Args:
+            db: 数据库会话
+            user_id: 用户ID
+            column_id: 列ID
+            cursor: 上一页最后一张卡片的排序键（None表示从头开始）
+            limit: 返回卡片数
+
+        Returns:
+            dict: 卡片列表和下一页游标
+
+        Raises:
+            ValueError: 列不存在
+        """
+        column = db.query(KanbanColumn.id).filter(
+            and_(KanbanColumn.id == column_id, KanbanColumn.user_id == user_id)
+        ).first()
+
+        if not column:
+            raise ValueError("列不存在")
+
+        query = db.query(
+            Card.id,
+            Card.title,
+            KanbanCard.rank
+        ).join(
+            Card, Card.id == KanbanCard.card_id
+        ).filter(KanbanCard.column_id == column_id)
+
+        if cursor is not None:
+            query = query.filter(KanbanCard.rank > cursor)
+
+        # 多取一条用于判断是否还有下一页
+        rows = query.order_by(KanbanCard.rank).limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        return {
+            "column_id": column_id,
+            "cards": [
+                {"id": row.id, "title": row.title, "rank": row.rank}
+                for row in rows
+            ],
+            "next_cursor": rows[-1].rank if has_more else None
+        }
+
     @staticmethod
     def create_column(
         db: Session,
         user_id: int,
         column_in: KanbanColumnCreate
-    ) -> KanbanColumn:
+    ) -> dict:
         """
         创建看板列
 
         Args:
             db: 数据库会话
             user_id: 用户ID
-            column_in: 列创建数据
+            column_in: 列创建数据（position 为插入位置，超出列数时放到末尾）
 
         Returns:
-            KanbanColumn: 创建的列对象
+            dict: 创建的列
+
+        Raises:
+            ValueError: 并发插入导致排序键冲突且重试失败
         """
-        # 检查位置是否已被占用
-        existing = db.query(KanbanColumn).filter(
-            and_(
-                KanbanColumn.user_id == user_id,
-                KanbanColumn.position == column_in.position
+        filters = [KanbanColumn.user_id == user_id]
+
+        def write() -> KanbanColumn:
+            db_column = KanbanColumn(
+                user_id=user_id,
+                name=column_in.name,
+                rank=_rank_at(db, KanbanColumn.rank, filters, column_in.position)
             )
-        ).first()
+            db.add(db_column)
+            return db_column
 
-        if existing:
-            raise ValueError("该位置已被占用")
+        db_column = _commit_ranked(db, write)
+        response_cache.invalidate(user_id, SCOPE_KANBAN)
+
+        if needs_rebalance(db_column.rank):
+            KanbanService.rebalance_columns(db, user_id)
 
-        db_column = KanbanColumn(
-            user_id=user_id,
-            name=column_in.name,
-            position=column_in.position
-        )
-        db.add(db_column)
-        db.commit()
         db.refresh(db_column)
-        return db_column
+        return _column_data(db_column, _column_position(db, db_column))
 
     @staticmethod
     def update_column(
         db: Session,
         column: KanbanColumn,
         column_in: KanbanColumnUpdate
-    ) -> KanbanColumn:
+    ) -> dict:
         """
         更新看板列
 
         Args:
             db: 数据库会话
             column: 列对象
-            column_in: 更新数据
+            column_in: 更新数据（position 为移动后的位置）
 
         Returns:
-            KanbanColumn: 更新后的列对象
+            dict: 更新后的列
+
+        Raises:
+            ValueError: 并发移动导致排序键冲突且重试失败
         """
-        if column_in.name is not None:
-            column.name = column_in.name
+        def write() -> None:
+            if column_in.name is not None:
+                column.name = column_in.name
 
-        if column_in.position is not None:
-            # 检查位置是否已被其他列占用
-            existing = db.query(KanbanColumn).filter(
-                and_(
+            if column_in.position is not None:
+                filters = [
                     KanbanColumn.user_id == column.user_id,
-                    KanbanColumn.position == column_in.position,
                     KanbanColumn.id != column.id
-                )
-            ).first()
+                ]
+                column.rank = _rank_at(db, KanbanColumn.rank, filters, column_in.position)
 
-            if existing:
-                raise ValueError("该位置已被占用")
+        _commit_ranked(db, write)
+        response_cache.invalidate(column.user_id, SCOPE_KANBAN)
 
-            column.position = column_in.position
+        if needs_rebalance(column.rank):
+            KanbanService.rebalance_columns(db, column.user_id)
 
-        db.commit()
         db.refresh(column)
-        return column
+        return _column_data(column, _column_position(db, column))
 
     @staticmethod
     def delete_column(db: Session, column: KanbanColumn) -> None:
@@ -181,6 +304,7 @@ class KanbanService:
         """
         db.delete(column)
         db.commit()
+        response_cache.invalidate(column.user_id, SCOPE_KANBAN)
 
     @staticmethod
     def move_card(
@@ -198,75 +322,54 @@ class KanbanService:
             user_id: 用户ID
             card_id: 卡片ID
             column_id: 目标列ID
-            position: 位置
+            position: 移动后在目标列中的位置（超出列长度时放到末尾）
 
         Returns:
             dict: 移动结果
-        """
-        # 验证卡片是否存在
-        card = db.query(Card).filter(
-            and_(Card.id == card_id, Card.user_id == user_id)
-        ).first()
-
-        if not card:
-            raise ValueError("卡片不存在")
-
-        # 验证列是否存在
-        column = db.query(KanbanColumn).filter(
-            and_(KanbanColumn.id == column_id, KanbanColumn.user_id == user_id)
-        ).first()
 
-        if not column:
-            raise ValueError("列不存在")
+        Raises:
+            ValueError: 卡片或列不存在，或并发移动导致排序键冲突且重试失败
+        """
+        changes = _commit_ranked(db, lambda: _apply_moves(db, user_id, [(card_id, column_id, position)]))
+        response_cache.invalidate(user_id, SCOPE_KANBAN)
 
-        # 检查位置是否已被占用
-        existing = db.query(KanbanCard).filter(
-            and_(
-                KanbanCard.column_id == column_id,
-                KanbanCard.position == position
-            )
-        ).first()
+        if changes:
+            return changes[0]
 
-        # 如果卡片已在看板中，删除旧位置
-        old_kanban_card = db.query(KanbanCard).filter(
-            KanbanCard.card_id == card_id
-        ).first()
+        # 位置未变化
+        column_id, position, rank = _card_position(db, card_id)
+        return {
+            "card_id": card_id,
+            "column_id": column_id,
+            "position": position,
+            "rank": rank
+        }
 
-        if old_kanban_card:
-            # 删除旧位置
-            db.delete(old_kanban_card)
+    @staticmethod
+    def apply_moves(db: Session, user_id: int, moves: List[Tuple[int, int, int]]) -> dict:
+        """
+        按顺序执行一次拖拽会话中的多个移动操作
 
-            # 如果移动到同一列且位置更大，需要调整位置
-            if old_kanban_card.column_id == column_id:
-                if old_kanban_card.position < position:
-                    position -= 1
+        所有移动在一个事务中完成，查询次数与移动数量无关，
+        只有被移动的卡片会被修改。
 
-        # 如果目标位置已被占用，需要移动其他卡片
-        if existing:
-            # 将该位置及之后的卡片后移
-            db.query(KanbanCard).filter(
-                and_(
-                    KanbanCard.column_id == column_id,
-                    KanbanCard.position >= position
-                )
-            ).update({
-                "position": KanbanCard.position + 1
-            })
+        Args:
+            db: 数据库会话
+            user_id: 用户ID
+            moves: (卡片ID, 目标列ID, 移动后位置) 列表，按操作顺序排列
 
-        # 创建新的看板卡片关联
-        kanban_card = KanbanCard(
-            card_id=card_id,
-            column_id=column_id,
-            position=position
-        )
-        db.add(kanban_card)
+        Returns:
+            dict: 移动的卡片数量和位置发生变化的卡片
 
-        db.commit()
+        Raises:
+            ValueError: 卡片或列不存在，或并发移动导致排序键冲突且重试失败
+        """
+        changes = _commit_ranked(db, lambda: _apply_moves(db, user_id, moves))
+        response_cache.invalidate(user_id, SCOPE_KANBAN)
 
         return {
-            "card_id": card_id,
-            "column_id": column_id,
-            "position": position
+            "moved_count": len({card_id for card_id, _, _ in moves}),
+            "changes": changes
         }
 
     @staticmethod
@@ -275,9 +378,9 @@ class KanbanService:
         user_id: int,
         card_ids: List[int],
         target_column_id: int
-    ) -> int:
+    ) -> dict:
         """
-        批量移动卡片到指定列
+        批量移动卡片到指定列（按顺序追加到列尾）
 
         Args:
             db: 数据库会话
@@ -286,57 +389,418 @@ class KanbanService:
             target_column_id: 目标列ID
 
         Returns:
-            int: 移动的卡片数量
+            dict: 移动的卡片数量和位置发生变化的卡片
+
+        Raises:
+            ValueError: 目标列不存在，或并发移动导致排序键冲突且重试失败
         """
         # 验证目标列是否存在
-        target_column = db.query(KanbanColumn).filter(
-            and_(
-                KanbanColumn.id == target_column_id,
-                KanbanColumn.user_id == user_id
-            )
-        ).first()
-
-        if not target_column:
+        if not KanbanService.get_column_by_id(db, target_column_id, user_id):
             raise ValueError("目标列不存在")
 
-        # 获取目标列的下一个位置（初始）
-        max_position = db.query(func.max(KanbanCard.position)).filter(
-            KanbanCard.column_id == target_column_id
-        ).scalar() or -1
-
-        moved_count = 0
-
-        for card_id in card_ids:
-            # 验证卡片是否存在
-            card = db.query(Card).filter(
-                and_(Card.id == card_id, Card.user_id == user_id)
-            ).first()
-
-            if not card:
-                continue
-
-            # 递增位置
-            max_position += 1
-
-            # 检查卡片是否已在看板中
-            existing = db.query(KanbanCard).filter(
-                KanbanCard.card_id == card_id
-            ).first()
-
-            if existing:
-                # 更新到新列
-                existing.column_id = target_column_id
-                existing.position = max_position
-            else:
-                # 创建新关联
-                kanban_card = KanbanCard(
-                    card_id=card_id,
-                    column_id=target_column_id,
-                    position=max_position
-                )
-                db.add(kanban_card)
-
-            moved_count += 1
+        # 不属于当前用户的卡片直接跳过
+        owned_ids = {row[0] for row in db.query(Card.id).filter(
+            and_(Card.id.in_(set(card_ids)), Card.user_id == user_id)
+        )}
+        card_ids = [card_id for card_id in dict.fromkeys(card_ids) if card_id in owned_ids]
+
+        changes = _commit_ranked(db, lambda: _apply_moves(db, user_id, [
+            (card_id, target_column_id, APPEND_POSITION) for card_id in card_ids
+        ]))
+        response_cache.invalidate(user_id, SCOPE_KANBAN)
+
+        return {
+            "moved_count": len(card_ids),
+            "changes": changes
+        }
+
+    @staticmethod
+    def rebalance_column(db: Session, column_id: int) -> None:
+        """
+        重新均匀分配列中卡片的排序键
+
+        Args:
+            db: 数据库会话
+            column_id: 列ID
+        """
+        card_ids = [row[0] for row in db.query(KanbanCard.card_id).filter(
+            KanbanCard.column_id == column_id
+        ).order_by(KanbanCard.rank)]
+
+        _write_ranks(db, KanbanCard.__table__, "card_id", {
+            card_id: (column_id, rank)
+            for card_id, rank in zip(card_ids, initial_ranks(len(card_ids)))
+        }, conflicting=True)
+        db.commit()
+
+        user_id = db.query(KanbanColumn.user_id).filter(KanbanColumn.id == column_id).scalar()
+        if user_id is not None:
+            response_cache.invalidate(user_id, SCOPE_KANBAN)
 
+    @staticmethod
+    def rebalance_columns(db: Session, user_id: int) -> None:
+        """
+        重新均匀分配用户看板列的排序键
+
+        Args:
+            db: 数据库会话
+            user_id: 用户ID
+        """
+        column_ids = [row[0] for row in db.query(KanbanColumn.id).filter(
+            KanbanColumn.user_id == user_id
+        ).order_by(KanbanColumn.rank)]
+
+        _write_ranks(db, KanbanColumn.__table__, "id", {
+            column_id: (user_id, rank)
+            for column_id, rank in zip(column_ids, initial_ranks(len(column_ids)))
+        }, conflicting=True, group_column="user_id")
         db.commit()
-        return moved_count
+        response_cache.invalidate(user_id, SCOPE_KANBAN)
+
+    @staticmethod
+    def rebalance_if_needed(changes: List[dict]) -> None:
+        """
+        排序键过长时重新分配所在列（在后台任务中执行，使用独立会话）
+
+        Args:
+            changes: 移动结果中的位置变化列表
+        """
+        column_ids = {
+            change["column_id"] for change in changes
+            if needs_rebalance(change["rank"])
+        }
+        if not column_ids:
+            return
+
+        db = SessionLocal()
+        try:
+            for column_id in column_ids:
+                KanbanService.rebalance_column(db, column_id)
+        finally:
+            db.close()
+
+
+def _column_data(column: KanbanColumn, position: int) -> dict:
+    """将列对象转换为响应数据"""
+    return {
+        "id": column.id,
+        "name": column.name,
+        "position": position,
+        "rank": column.rank,
+        "user_id": column.user_id,
+        "created_at": column.created_at,
+        "updated_at": column.updated_at
+    }
+
+
+def _column_position(db: Session, column: KanbanColumn) -> int:
+    """计算列在看板中的下标"""
+    return db.query(func.count(KanbanColumn.id)).filter(
+        and_(
+            KanbanColumn.user_id == column.user_id,
+            KanbanColumn.rank < column.rank
+        )
+    ).scalar()
+
+
+def _card_position(db: Session, card_id: int) -> Tuple[int, int, str]:
+    """计算卡片在所在列中的下标，返回 (列ID, 下标, 排序键)"""
+    column_id, rank = db.query(KanbanCard.column_id, KanbanCard.rank).filter(
+        KanbanCard.card_id == card_id
+    ).one()
+    position = db.query(func.count(KanbanCard.id)).filter(
+        and_(KanbanCard.column_id == column_id, KanbanCard.rank < rank)
+    ).scalar()
+    return column_id, position, rank
+
+
+def _neighbours(
+    db: Session,
+    rank_column,
+    filters: list,
+    position: int
+) -> Tuple[Optional[str], Optional[str], int]:
+    """
+    取插入到指定下标时的相邻排序键
+
+    只按排序键索引读取目标下标前后的两行，不加载整组元素。
+
+    Args:
+        db: 数据库会话
+        rank_column: 排序键列
+        filters: 限定同组元素的过滤条件（应排除被移动的元素本身）
+        position: 目标下标
+
+    Returns:
+        Tuple[Optional[str], Optional[str], int]: (前一个排序键, 后一个排序键, 实际下标)，
+            没有相邻元素的一侧为None，下标超出组长度时放到末尾
+    """
+    query = db.query(rank_column).filter(*filters)
+
+    if position == 0:
+        return None, query.order_by(rank_column).limit(1).scalar(), 0
+
+    neighbours = [row[0] for row in query.order_by(rank_column).offset(position - 1).limit(2)]
+    if not neighbours:
+        # 超出长度，追加到末尾
+        last, count = query.with_entities(func.max(rank_column), func.count()).one()
+        return last, None, count
+
+    return neighbours[0], neighbours[1] if len(neighbours) > 1 else None, position
+
+
+def _rank_at(db: Session, rank_column, filters: list, position: int) -> str:
+    """
+    计算插入到指定下标时的排序键
+
+    Args:
+        db: 数据库会话
+        rank_column: 排序键列
+        filters: 限定同组元素的过滤条件（应排除被移动的元素本身）
+        position: 目标下标
+
+    Returns:
+        str: 新排序键
+    """
+    lower, upper, _ = _neighbours(db, rank_column, filters, position)
+    return rank_between(lower, upper)
+
+
+def _commit_ranked(db: Session, write: Callable[[], T]) -> T:
+    """
+    执行排序键写入并提交，违反唯一约束时回滚后重新计算
+
+    并发请求在同一间隙插入会生成相同的排序键，后提交的一方违反
+    (分组列, rank) 唯一约束；回滚后重新读取相邻行即可基于对方已提交的键生成新键。
+
+    Args:
+        db: 数据库会话
+        write: 计算并写入排序键的函数（每次尝试重新执行）
+
+    Returns:
+        T: write 的返回值
+
+    Raises:
+        ValueError: 多次尝试后仍然冲突
+    """
+    for _ in range(RANK_CONFLICT_ATTEMPTS):
+        try:
+            result = write()
+            db.commit()
+            return result
+        except IntegrityError:
+            db.rollback()
+    raise ValueError("排序冲突，请重试")
+
+
+def _write_ranks(
+    db: Session,
+    table,
+    key: str,
+    targets: Dict[int, Tuple[int, str]],
+    conflicting: bool,
+    group_column: str = "column_id"
+) -> None:
+    """
+    用 CASE 语句批量写入 (分组列, 排序键)
+
+    conflicting 为 True 时先把这些行的排序键改为临时值再写入最终值，
+    避免更新过程中违反 (分组列, rank) 唯一约束。
+
+    Args:
+        db: 数据库会话
+        table: 目标表
+        key: 行标识列名
+        targets: 行标识 -> (分组列取值, 排序键)
+        conflicting: 新键是否可能与待更新行的旧键重复
+        group_column: 分组列名
+    """
+    if not targets:
+        return
+
+    key_column = table.c[key]
+    where = key_column.in_(list(targets))
+
+    if conflicting:
+        db.execute(
+            update(table).where(where).values(
+                rank=literal("~") + cast(key_column, String)
+            )
+        )
+
+    db.execute(
+        update(table).where(where).values({
+            group_column: case(
+                {row_key: group for row_key, (group, _) in targets.items()},
+                value=key_column
+            ),
+            "rank": case(
+                {row_key: rank for row_key, (_, rank) in targets.items()},
+                value=key_column
+            )
+        })
+    )
+
+
+def _apply_moves(db: Session, user_id: int, moves: List[Tuple[int, int, int]]) -> List[dict]:
+    """
+    在当前事务中执行移动操作（不提交）
+
+    单个移动只读取目标位置的相邻行；多个移动在内存中按顺序重排受影响的列，
+    为每张被移动的卡片生成相邻卡片之间的排序键，再用集合语句只写回被移动的行。
+
+    Args:
+        db: 数据库会话
+        user_id: 用户ID
+        moves: (卡片ID, 目标列ID, 移动后位置) 列表
+
+    Returns:
+        List[dict]: 位置发生变化的卡片
+
+    Raises:
+        ValueError: 卡片或列不存在
+    """
+    if not moves:
+        return []
+
+    card_ids = {card_id for card_id, _, _ in moves}
+    column_ids = {column_id for _, column_id, _ in moves}
+
+    # 校验归属
+    owned_cards = db.query(func.count(Card.id)).filter(
+        and_(Card.id.in_(card_ids), Card.user_id == user_id)
+    ).scalar()
+    if owned_cards != len(card_ids):
+        raise ValueError("卡片不存在")
+
+    owned_columns = db.query(func.count(KanbanColumn.id)).filter(
+        and_(KanbanColumn.id.in_(column_ids), KanbanColumn.user_id == user_id)
+    ).scalar()
+    if owned_columns != len(column_ids):
+        raise ValueError("列不存在")
+
+    if len(moves) == 1:
+        return _move_one(db, *moves[0])
+
+    # 一次取回目标列和来源列的当前排列
+    source_columns = db.query(KanbanCard.column_id).filter(
+        KanbanCard.card_id.in_(card_ids)
+    )
+    rows = db.query(
+        KanbanCard.card_id,
+        KanbanCard.column_id,
+        KanbanCard.rank
+    ).filter(
+        or_(
+            KanbanCard.column_id.in_(column_ids),
+            KanbanCard.column_id.in_(source_columns.scalar_subquery())
+        )
+    ).order_by(KanbanCard.column_id, KanbanCard.rank).all()
+
+    layout: Dict[int, List[Tuple[int, str]]] = defaultdict(list)
+    before: Dict[int, Tuple[int, str]] = {}
+    for row in rows:
+        layout[row.column_id].append((row.card_id, row.rank))
+        before[row.card_id] = (row.column_id, row.rank)
+
+    location = {card_id: column_id for card_id, (column_id, _) in before.items()}
+
+    # 按顺序在内存中执行移动
+    for card_id, column_id, position in moves:
+        old_index = None
+        if card_id in location:
+            cards = layout[location[card_id]]
+            old_index = next(i for i, (other, _) in enumerate(cards) if other == card_id)
+            _, old_rank = cards.pop(old_index)
+
+        cards = layout[column_id]
+        index = min(position, len(cards))
+        if location.get(card_id) == column_id and index == old_index:
+            # 放回原位，保留原排序键
+            rank = old_rank
+        else:
+            rank = rank_between(
+                cards[index - 1][1] if index > 0 else None,
+                cards[index][1] if index < len(cards) else None
+            )
+        cards.insert(index, (card_id, rank))
+        location[card_id] = column_id
+
+    changes = [
+        {"card_id": card_id, "column_id": column_id, "position": position, "rank": rank}
+        for column_id, cards in layout.items()
+        for position, (card_id, rank) in enumerate(cards)
+        if card_id in card_ids and before.get(card_id) != (column_id, rank)
+    ]
+    if not changes:
+        return []
+
+    table = KanbanCard.__table__
+    existing = {
+        change["card_id"]: (change["column_id"], change["rank"])
+        for change in changes if change["card_id"] in before
+    }
+    # 新键与被移走卡片的旧键重复时（如拖出后再拖入同一位置）需要两步更新
+    old_keys = {before[card_id] for card_id in existing}
+    _write_ranks(
+        db, table, "card_id", existing,
+        conflicting=any(target in old_keys for target in existing.values())
+    )
+
+    new_rows = [
+        {"card_id": change["card_id"], "column_id": change["column_id"], "rank": change["rank"]}
+        for change in changes if change["card_id"] not in before
+    ]
+    if new_rows:
+        db.execute(insert(table).values(new_rows))
+
+    return changes
+
+
+def _move_one(db: Session, card_id: int, column_id: int, position: int) -> List[dict]:
+    """
+    执行单个移动操作（不提交，调用方已校验归属）
+
+    只读取目标位置前后的两行计算排序键，查询量与列长度无关。
+
+    Args:
+        db: 数据库会话
+        card_id: 卡片ID
+        column_id: 目标列ID
+        position: 移动后位置
+
+    Returns:
+        List[dict]: 位置发生变化的卡片（放回原位时为空列表）
+    """
+    table = KanbanCard.__table__
+    current = db.query(KanbanCard.column_id, KanbanCard.rank).filter(
+        KanbanCard.card_id == card_id
+    ).first()
+
+    lower, upper, index = _neighbours(db, KanbanCard.rank, [
+        KanbanCard.column_id == column_id,
+        KanbanCard.card_id != card_id
+    ], position)
+
+    if (
+        current is not None
+        and current.column_id == column_id
+        and (lower is None or lower < current.rank)
+        and (upper is None or current.rank < upper)
+    ):
+        # 放回原位，保留原排序键
+        return []
+
+    rank = rank_between(lower, upper)
+    if current is not None:
+        db.execute(
+            update(table).where(table.c.card_id == card_id).values(column_id=column_id, rank=rank)
+        )
+    else:
+        db.execute(insert(table).values(card_id=card_id, column_id=column_id, rank=rank))
+
+    return [{"card_id": card_id, "column_id": column_id, "position": index, "rank": rank}]
+
+
+# 异步变体（在 AsyncSession 或线程池中执行，不阻塞事件循环）
+AsyncKanbanService = AsyncService(KanbanService)
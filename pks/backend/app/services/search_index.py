@@ -0,0 +1,309 @@
+"""
+全文索引服务
+
+SQLite 使用 FTS5 虚拟表（trigram 分词，兼容中文子串匹配），
+PostgreSQL 使用 pg_trgm 表达式 GIN 索引加速 ILIKE 子串匹配（与 LIKE 回退的
+匹配语义一致，部分单词和中文子串同样能命中），相关度由 ts_rank_cd 计算。
+两者都由数据库自身保持同步：SQLite 通过触发器，PostgreSQL 通过表达式索引，
+因此卡片的创建、更新、删除（包括批量删除）都无需服务层额外处理。
+"""
+import logging
+from typing import Optional, Dict, Tuple, Any, List
+from sqlalchemy import text, func, literal_column, table, column, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, Query
+from app.core.config import settings
+from app.models.card import Card
+from app.utils.highlight import MARK_START, MARK_END, ELLIPSIS
+
+logger = logging.getLogger("pks.search_index")
+
+# FTS5 虚拟表名称
+FTS_TABLE = "cards_fts"
+
+# PostgreSQL trigram 索引名称
+PG_INDEX = "ix_cards_trgm"
+
+# PostgreSQL 文本搜索配置（simple 不做词干处理，对中英文混排更稳妥）
+PG_TS_CONFIG = "simple"
+
+# trigram 分词器要求每个词至少3个字符
+MIN_TOKEN_LENGTH = 3
+
+# BM25 列权重（标题、内容）
+TITLE_WEIGHT = 10.0
+CONTENT_WEIGHT = 1.0
+
+# FTS5 snippet() 的最大词数（trigram 分词下约等于字符数，FTS5 上限为64）
+SNIPPET_TOKENS = 64
+
+_SQLITE_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, content,
+        content='cards', content_rowid='id',
+        tokenize='trigram'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS cards_fts_ai AFTER INSERT ON cards BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, content)
+        VALUES (new.id, new.title, new.content);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS cards_fts_ad AFTER DELETE ON cards BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS cards_fts_au AFTER UPDATE OF title, content ON cards BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO {FTS_TABLE}(rowid, title, content)
+        VALUES (new.id, new.title, new.content);
+    END
+    """,
+]
+
+# 各数据库连接的索引可用状态缓存（key 为数据库URL）
+_availability: Dict[str, bool] = {}
+
+
+def _pg_text():
+    """PostgreSQL 中被索引的文本表达式（需与索引定义保持一致）"""
+    return (
+        func.coalesce(Card.title, literal_column("''"))
+        .op("||")(literal_column("' '"))
+        .op("||")(func.coalesce(Card.content, literal_column("''")))
+    )
+
+
+def _like_pattern(term: str) -> str:
+    """将关键词转换为子串匹配模式（转义通配符，转义字符为反斜杠）"""
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+class SearchIndex:
+    """全文索引服务类"""
+
+    @staticmethod
+    def ensure_index(engine: Engine) -> bool:
+        """
+        创建全文索引（幂等），首次创建时为已有卡片建立索引
+
+        Args:
+            engine: 数据库引擎
+
+        Returns:
+            bool: 索引是否可用
+        """
+        key = str(engine.url)
+        dialect = engine.dialect.name
+
+        try:
+            if dialect == "sqlite":
+                with engine.begin() as conn:
+                    existed = conn.execute(
+                        text("SELECT 1 FROM sqlite_master WHERE name = :name"),
+                        {"name": FTS_TABLE}
+                    ).first() is not None
+
+                    for ddl in _SQLITE_DDL:
+                        conn.execute(text(ddl))
+
+                    if not existed:
+                        conn.execute(text(
+                            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+                        ))
+            elif dialect == "postgresql":
+                with engine.begin() as conn:
+                    conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+                    conn.execute(text(
+                        f"CREATE INDEX IF NOT EXISTS {PG_INDEX} ON cards USING GIN ("
+                        f"(coalesce(title, '') || ' ' || coalesce(content, '')) gin_trgm_ops)"
+                    ))
+            else:
+                logger.warning("数据库 %s 不支持全文索引，搜索将回退到LIKE全表扫描", dialect)
+                _availability[key] = False
+                return False
+        except Exception as e:
+            logger.warning("全文索引不可用，搜索将回退到LIKE全表扫描: %s", e)
+            _availability[key] = False
+            return False
+
+        _availability[key] = True
+        return True
+
+    @staticmethod
+    def is_available(db: Session) -> bool:
+        """
+        判断当前数据库是否已启用全文索引
+
+        Args:
+            db: 数据库会话
+
+        Returns:
+            bool: 索引是否可用
+        """
+        bind = db.get_bind()
+        key = str(bind.url)
+
+        if key not in _availability:
+            if bind.dialect.name == "sqlite":
+                _availability[key] = db.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE name = :name"),
+                    {"name": FTS_TABLE}
+                ).first() is not None
+            elif bind.dialect.name == "postgresql":
+                _availability[key] = db.execute(
+                    text("SELECT 1 FROM pg_indexes WHERE indexname = :name"),
+                    {"name": PG_INDEX}
+                ).first() is not None
+            else:
+                _availability[key] = False
+
+            if not _availability[key]:
+                logger.warning("未找到全文索引，搜索将回退到LIKE全表扫描")
+
+        return _availability[key]
+
+    @staticmethod
+    def build_match_query(keyword: str) -> Optional[str]:
+        """
+        将用户输入转换为 FTS5 MATCH 表达式
+
+        每个空白分隔的词作为短语处理，多个词之间为 AND 关系。
+
+        Args:
+            keyword: 搜索关键词
+
+        Returns:
+            Optional[str]: MATCH 表达式，无法使用索引时返回None
+        """
+        terms = keyword.split()
+        if not terms or any(len(term) < MIN_TOKEN_LENGTH for term in terms):
+            return None
+
+        return " AND ".join(
+            '"' + term.replace('"', '""') + '"' for term in terms
+        )
+
+    @staticmethod
+    def apply(db: Session, query: Query, keyword: str) -> Optional[Tuple[Query, Any]]:
+        """
+        为卡片查询添加全文匹配条件
+
+        Args:
+            db: 数据库会话
+            query: 以 Card 为主体的查询
+            keyword: 搜索关键词
+
+        Returns:
+            Optional[tuple]: (过滤后的查询, 相关度表达式)，按相关度表达式升序
+            即相关度从高到低；索引不可用或关键词无法走索引时返回None，
+            调用方应回退到LIKE
+        """
+        if not SearchIndex.is_available(db):
+            return None
+
+        dialect = db.get_bind().dialect.name
+
+        if dialect == "sqlite":
+            match_query = SearchIndex.build_match_query(keyword)
+            if match_query is None:
+                return None
+
+            fts = table(FTS_TABLE, column("rowid"))
+            fts_ref = literal_column(FTS_TABLE)
+            ranked = select(
+                fts.c.rowid.label("card_id"),
+                func.bm25(fts_ref, TITLE_WEIGHT, CONTENT_WEIGHT).label("rank")
+            ).where(fts_ref.op("MATCH")(match_query)).subquery()
+
+            return query.join(ranked, ranked.c.card_id == Card.id), ranked.c.rank
+
+        if dialect == "postgresql":
+            terms = keyword.split()
+            if not terms:
+                return None
+
+            # 每个词按子串匹配（AND），只有整词匹配参与相关度计算
+            ts_config = literal_column(f"'{PG_TS_CONFIG}'")
+            document = _pg_text()
+            return (
+                query.filter(*[
+                    document.ilike(_like_pattern(term), escape="\\") for term in terms
+                ]),
+                -func.ts_rank_cd(
+                    func.to_tsvector(ts_config, document),
+                    func.plainto_tsquery(ts_config, keyword)
+                )
+            )
+
+        return None
+
+    @staticmethod
+    def snippets(db: Session, keyword: str, card_ids: List[int]) -> Optional[Dict[int, str]]:
+        """
+        由全文索引生成匹配位置附近的内容片段
+
+        只为当前页的卡片生成：SQLite 使用 FTS5 snippet()，PostgreSQL 使用
+        ts_headline()（只处理内容的前 SEARCH_SNIPPET_SCAN_CHARS 个字符）。
+        匹配位置用 MARK_START / MARK_END 标记。ts_headline() 只标记整词，
+        只有子串匹配的卡片不在结果中，由调用方在内容前缀中查找。
+
+        Args:
+            db: 数据库会话
+            keyword: 搜索关键词
+            card_ids: 卡片ID列表
+
+        Returns:
+            Optional[Dict[int, str]]: 卡片ID到片段的映射，
+            索引不可用或关键词无法走索引时返回None
+        """
+        if not card_ids or not SearchIndex.is_available(db):
+            return None
+
+        dialect = db.get_bind().dialect.name
+
+        if dialect == "sqlite":
+            match_query = SearchIndex.build_match_query(keyword)
+            if match_query is None:
+                return None
+
+            fts = table(FTS_TABLE, column("rowid"))
+            fts_ref = literal_column(FTS_TABLE)
+            rows = db.execute(
+                select(
+                    fts.c.rowid,
+                    func.snippet(fts_ref, 1, MARK_START, MARK_END, ELLIPSIS, SNIPPET_TOKENS)
+                ).where(
+                    fts_ref.op("MATCH")(match_query),
+                    fts.c.rowid.in_(card_ids)
+                )
+            ).all()
+            return {row[0]: row[1] for row in rows if row[1]}
+
+        if dialect == "postgresql":
+            ts_config = literal_column(f"'{PG_TS_CONFIG}'")
+            options = (
+                f'StartSel="{MARK_START}", StopSel="{MARK_END}", '
+                f'MaxWords=35, MinWords=15, MaxFragments=2, FragmentDelimiter=" {ELLIPSIS} "'
+            )
+            rows = db.execute(
+                select(
+                    Card.id,
+                    func.ts_headline(
+                        ts_config,
+                        func.left(Card.content, settings.SEARCH_SNIPPET_SCAN_CHARS),
+                        func.plainto_tsquery(ts_config, keyword),
+                        options
+                    )
+                ).where(Card.id.in_(card_ids))
+            ).all()
+            return {row[0]: row[1] for row in rows if row[1] and MARK_START in row[1]}
+
+        return None
@@ -1,11 +1,17 @@
 """
 搜索服务
 """
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional, Set
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
-from app.models.card import Card
+from sqlalchemy import and_, or_, func, desc
+from app.core.config import settings
+from app.models.card import Card, CardType
 from app.models.tag import Tag
+from app.services.base import AsyncService
+from app.services.search_index import SearchIndex
+from app.utils.pagination import encode_cursor, decode_cursor, keyset_filter
+from app.utils.projection import list_options, card_list_item
+from app.utils.highlight import search_terms, parse_marked, find_highlights, make_snippet
 
 
 class SearchService:
@@ -17,56 +23,124 @@ class SearchService:
         user_id: int,
         keyword: str,
         skip: int = 0,
-        limit: int = 20
-    ) -> tuple[List[Dict], int]:
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        with_total: bool = True,
+        fields: Optional[Set[str]] = None
+    ) -> tuple[List[Dict], Optional[int], Optional[str]]:
         """
         搜索卡片
 
+        使用全文索引时按 (相关度, id) 排序，回退到LIKE时按 id 倒序；
+        传入 cursor 时使用 keyset 分页并忽略 skip。
+        结果只包含匹配位置附近的内容片段（snippet）和高亮区间（highlights /
+        title_highlights），响应大小与卡片内容长度无关；完整内容需通过 fields 请求。
+
         Args:
             db: 数据库会话
             user_id: 用户ID
             keyword: 搜索关键词
             skip: 跳过记录数
             limit: 返回记录数
+            cursor: 上一页返回的游标
+            with_total: 是否统计总数
+            fields: 额外返回的字段（如 content）
 
         Returns:
-            tuple[List[Dict], int]: 卡片列表和总数
-        """
-        search_pattern = f"%{keyword}%"
+            tuple[List[Dict], Optional[int], Optional[str]]:
+            卡片列表、总数（未统计时为None）和下一页游标
 
-        # 构建搜索查询
-        query = db.query(Card).filter(
-            and_(
-                Card.user_id == user_id,
+        Raises:
+            ValueError: 游标无效或与排序方式不一致
+        """
+        query = db.query(Card).filter(Card.user_id == user_id)
+
+        # 优先使用全文索引（按相关度排序），不可用时回退到LIKE
+        indexed = SearchIndex.apply(db, query, keyword)
+        if indexed is not None:
+            query, rank = indexed
+            sort_keys, descending = [rank, Card.id], False
+            cursor_key = "relevance"
+        else:
+            search_pattern = f"%{keyword}%"
+            query = query.filter(
                 or_(
                     Card.title.like(search_pattern),
                     Card.content.like(search_pattern)
                 )
             )
-        )
+            sort_keys, descending = [Card.id], True
+            cursor_key = "id:desc"
 
-        # 获取总数
-        total = query.count()
+        # 获取总数（可选）
+        total = query.count() if with_total else None
+
+        query = query.add_columns(*sort_keys).order_by(
+            *[desc(key) if descending else key for key in sort_keys]
+        )
 
         # 分页
-        cards = query.offset(skip).limit(limit).all()
+        if cursor:
+            query = query.filter(
+                keyset_filter(
+                    sort_keys,
+                    decode_cursor(cursor, cursor_key),
+                    descending,
+                    dialect_name=db.get_bind().dialect.name
+                )
+            )
+        else:
+            query = query.offset(skip)
 
-        # 转换为字典
-        items = []
-        for card in cards:
-            items.append({
-                "id": card.id,
-                "title": card.title,
-                "content": card.content,
-                "card_type": card.card_type,
-                "url": card.url,
-                "is_pinned": card.is_pinned,
-                "view_count": card.view_count,
-                "created_at": card.created_at,
-                "updated_at": card.updated_at
-            })
+        fields = fields or set()
+        rows = query.options(*list_options(fields)).limit(limit + 1).all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(list(rows[-1][1:]), cursor_key)
 
-        return items, total
+        items = [card_list_item(row[0], fields) for row in rows]
+        SearchService._add_highlights(db, keyword, items)
+
+        return items, total, next_cursor
+
+    @staticmethod
+    def _add_highlights(db: Session, keyword: str, items: List[Dict[str, Any]]) -> None:
+        """
+        为搜索结果生成匹配位置附近的片段和高亮区间
+
+        优先由全文索引生成；索引不可用时在内容前 SEARCH_SNIPPET_SCAN_CHARS 个字符中查找，
+        仍未找到匹配（如只有标题匹配）时保留列表摘要。
+        """
+        terms = search_terms(keyword)
+        card_ids = [item["id"] for item in items if item["card_type"] != CardType.IMAGE]
+
+        marked = SearchIndex.snippets(db, keyword, card_ids) or {}
+
+        missing = [card_id for card_id in card_ids if card_id not in marked]
+        prefixes = {}
+        if missing:
+            prefixes = dict(db.query(
+                Card.id,
+                func.substr(Card.content, 1, settings.SEARCH_SNIPPET_SCAN_CHARS)
+            ).filter(Card.id.in_(missing)).all())
+
+        for item in items:
+            item["title_highlights"] = find_highlights(item["title"], terms)
+            item["highlights"] = []
+
+            if item["id"] in marked:
+                snippet, highlights = parse_marked(marked[item["id"]])
+            elif item["id"] in prefixes:
+                found = make_snippet(prefixes[item["id"]] or "", terms, settings.LIST_SNIPPET_LENGTH)
+                snippet, highlights = found if found else (None, [])
+            else:
+                continue
+
+            if highlights:
+                item["snippet"] = snippet
+                item["highlights"] = highlights
 
     @staticmethod
     def search_tags(
@@ -113,7 +187,10 @@ class SearchService:
         keyword: str,
         search_type: str = "all",
         skip: int = 0,
-        limit: int = 20
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        with_total: bool = True,
+        fields: Optional[Set[str]] = None
     ) -> Dict:
         """
         全局搜索
@@ -125,6 +202,9 @@ class SearchService:
             search_type: 搜索类型（all/cards/tags）
             skip: 跳过记录数
             limit: 返回记录数
+            cursor: 卡片结果的分页游标
+            with_total: 是否统计卡片总数
+            fields: 卡片结果额外返回的字段
 
         Returns:
             Dict: 搜索结果
@@ -133,12 +213,16 @@ class SearchService:
 
         # 搜索卡片
         if search_type in ["all", "cards"]:
-            cards, total = SearchService.search_cards(
-                db, user_id, keyword, skip, limit
+            cards, total, next_cursor = SearchService.search_cards(
+                db, user_id, keyword, skip, limit,
+                cursor=cursor,
+                with_total=with_total,
+                fields=fields
             )
             result["cards"] = {
                 "items": cards,
-                "total": total
+                "total": total,
+                "next_cursor": next_cursor
             }
 
         # 搜索标签
@@ -149,12 +233,19 @@ class SearchService:
                 "total": len(tags)
             }
 
-        # 计算总数
+        # 计算总数（卡片总数未统计时为None）
         total = 0
         if "cards" in result:
-            total += result["cards"]["total"]
-        if "tags" in result:
+            if result["cards"]["total"] is None:
+                total = None
+            else:
+                total += result["cards"]["total"]
+        if "tags" in result and total is not None:
             total += result["tags"]["total"]
         result["total"] = total
 
         return result
+
+
+# 异步变体（在 AsyncSession 或线程池中执行，不阻塞事件循环）
+AsyncSearchService = AsyncService(SearchService)
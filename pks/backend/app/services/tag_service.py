@@ -2,11 +2,13 @@
 标签服务
 """
 from typing import List, Optional
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, func, desc
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import and_, func, desc, select, Select
 from app.models.tag import Tag, CardTag
 from app.models.card import Card
 from app.schemas.tag import TagCreate, TagUpdate
+from app.core.response_cache import response_cache, SCOPE_CARDS, SCOPE_TAGS
+from app.services.base import AsyncService
 
 
 class TagService:
@@ -56,6 +58,101 @@ class TagService:
 
         return query.order_by(Tag.name).all()
 
+    @staticmethod
+    def get_tags_with_counts(
+        db: Session,
+        user_id: int,
+        parent_id: Optional[int] = None
+    ) -> List[dict]:
+        """
+        获取标签列表（包含子标签数和卡片数）
+
+        Args:
+            db: 数据库会话
+            user_id: 用户ID
+            parent_id: 父标签ID（None表示获取根标签）
+
+        Returns:
+            List[dict]: 标签列表
+        """
+        query = db.query(Tag, _cards_count(), _children_count()).filter(Tag.user_id == user_id)
+
+        # 处理parent_id
+        if parent_id is None:
+            query = query.filter(Tag.parent_id.is_(None))
+        else:
+            query = query.filter(Tag.parent_id == parent_id)
+
+        return [
+            {
+                **_tag_data(tag),
+                "children_count": children_count,
+                "cards_count": cards_count
+            }
+            for tag, cards_count, children_count in query.order_by(Tag.name).all()
+        ]
+
+    @staticmethod
+    def get_tag_tree(db: Session, user_id: int) -> List[dict]:
+        """
+        获取完整标签树（一次查询取回所有标签及统计，再在内存中组装）
+
+        Args:
+            db: 数据库会话
+            user_id: 用户ID
+
+        Returns:
+            List[dict]: 根标签列表，每个节点的 children 为子标签列表
+        """
+        rows = db.query(Tag, _cards_count(), _children_count()).filter(
+            Tag.user_id == user_id
+        ).order_by(Tag.name).all()
+
+        nodes = {
+            tag.id: {
+                **_tag_data(tag),
+                "children_count": children_count,
+                "cards_count": cards_count,
+                "children": []
+            }
+            for tag, cards_count, children_count in rows
+        }
+
+        roots = []
+        for node in nodes.values():
+            parent = nodes.get(node["parent_id"])
+            if parent is None:
+                roots.append(node)
+            else:
+                parent["children"].append(node)
+
+        return roots
+
+    @staticmethod
+    def subtree_query(tag_id: int, user_id: int) -> Select:
+        """
+        构建标签子树查询（递归CTE，包含标签自身）
+
+        使用 UNION 而不是 UNION ALL，即使数据中存在环也能终止。
+
+        Args:
+            tag_id: 标签ID
+            user_id: 用户ID
+
+        Returns:
+            Select: 返回子树中所有标签ID的查询
+        """
+        subtree = select(Tag.id).where(
+            and_(Tag.id == tag_id, Tag.user_id == user_id)
+        ).cte("tag_subtree", recursive=True)
+
+        child = aliased(Tag)
+        subtree = subtree.union(
+            select(child.id).where(child.parent_id == subtree.c.id)
+        )
+
+        return select(subtree.c.id)
+
     @staticmethod
     def create_tag(db: Session, user_id: int, tag_in: TagCreate) -> Tag:
         """
@@ -98,6 +195,7 @@ class TagService:
         )
         db.add(db_tag)
         db.commit()
+        response_cache.invalidate(user_id, SCOPE_TAGS)
         db.refresh(db_tag)
         return db_tag
 
@@ -115,7 +213,7 @@ class TagService:
             Tag: 更新后的标签对象
 
         Raises:
-            ValueError: 如果标签名称已存在
+            ValueError: 标签名称已存在、父标签不存在或移动后形成环
         """
         # 更新名称
         if tag_in.name is not None:
@@ -137,7 +235,22 @@ class TagService:
         if tag_in.color is not None:
             tag.color = tag_in.color
 
+        # 移动到新的父标签（显式传入 null 表示移到根级）
+        if "parent_id" in tag_in.model_fields_set and tag_in.parent_id != tag.parent_id:
+            if tag_in.parent_id is not None:
+                if not TagService.get_tag_by_id(db, tag_in.parent_id, tag.user_id):
+                    raise ValueError("父标签不存在")
+
+                # 新父标签不能是自身或子孙标签，否则会形成环
+                subtree = TagService.subtree_query(tag.id, tag.user_id).subquery()
+                if db.query(subtree.c.id).filter(subtree.c.id == tag_in.parent_id).first():
+                    raise ValueError("不能将标签移动到自身或其子标签下")
+
+            tag.parent_id = tag_in.parent_id
+
         db.commit()
+        # 卡片列表中包含标签名称和颜色
+        response_cache.invalidate(tag.user_id, SCOPE_TAGS, SCOPE_CARDS)
         db.refresh(tag)
         return tag
 
@@ -152,6 +265,7 @@ class TagService:
         """
         db.delete(tag)
         db.commit()
+        response_cache.invalidate(tag.user_id, SCOPE_TAGS, SCOPE_CARDS)
 
     @staticmethod
     def get_tag_with_children(db: Session, tag_id: int, user_id: int) -> Optional[dict]:
@@ -166,36 +280,20 @@ class TagService:
         Returns:
             Optional[dict]: 标签详情字典
         """
-        tag = TagService.get_tag_by_id(db, tag_id, user_id)
-        if not tag:
+        row = db.query(Tag, _cards_count()).filter(
+            and_(Tag.id == tag_id, Tag.user_id == user_id)
+        ).first()
+        if not row:
             return None
 
-        # 获取子标签
-        children = db.query(Tag).filter(Tag.parent_id == tag_id).all()
+        tag, cards_count = row
 
-        # 获取关联的卡片数量
-        cards_count = len(tag.card_tags)
+        # 获取子标签
+        children = db.query(Tag).filter(Tag.parent_id == tag_id).order_by(Tag.name).all()
 
         return {
-            "id": tag.id,
-            "name": tag.name,
-            "color": tag.color,
-            "parent_id": tag.parent_id,
-            "user_id": tag.user_id,
-            "created_at": tag.created_at,
-            "updated_at": tag.updated_at,
-            "children": [
-                {
-                    "id": child.id,
-                    "name": child.name,
-                    "color": child.color,
-                    "parent_id": child.parent_id,
-                    "user_id": child.user_id,
-                    "created_at": child.created_at,
-                    "updated_at": child.updated_at
-                }
-                for child in children
-            ],
+            **_tag_data(tag),
+            "children": [_tag_data(child) for child in children],
             "cards_count": cards_count
         }
 
@@ -211,20 +309,16 @@ class TagService:
         Returns:
             List[dict]: 标签统计列表
         """
-        # 统计每个标签的卡片数量
+        cards_count = _cards_count()
         stats = db.query(
             Tag.id,
             Tag.name,
             Tag.color,
-            func.count(CardTag.id).label('cards_count')
-        ).outerjoin(
-            CardTag, Tag.id == CardTag.tag_id
+            cards_count
         ).filter(
             Tag.user_id == user_id
-        ).group_by(
-            Tag.id, Tag.name, Tag.color
         ).order_by(
-            desc('cards_count')
+            desc(cards_count), Tag.name
         ).all()
 
         return [
@@ -236,3 +330,35 @@ class TagService:
             }
             for stat in stats
         ]
+
+
+def _cards_count():
+    """标签关联的卡片数（相关子查询，走 card_tags.tag_id 索引，不加载关联对象）"""
+    return select(func.count(CardTag.id)).where(
+        CardTag.tag_id == Tag.id
+    ).correlate(Tag).scalar_subquery().label("cards_count")
+
+
+def _children_count():
+    """直接子标签数（相关子查询，走 tags.parent_id 索引）"""
+    child = aliased(Tag)
+    return select(func.count(child.id)).where(
+        child.parent_id == Tag.id
+    ).correlate(Tag).scalar_subquery().label("children_count")
+
+
+def _tag_data(tag: Tag) -> dict:
+    """将标签对象转换为响应数据"""
+    return {
+        "id": tag.id,
+        "name": tag.name,
+        "color": tag.color,
+        "parent_id": tag.parent_id,
+        "user_id": tag.user_id,
+        "created_at": tag.created_at,
+        "updated_at": tag.updated_at
+    }
+
+
+# 异步变体（在 AsyncSession 或线程池中执行，不阻塞事件循环）
+AsyncTagService = AsyncService(TagService)
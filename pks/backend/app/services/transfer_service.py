@@ -0,0 +1,494 @@
+"""
+卡片批量导入导出服务
+
+记录格式（NDJSON 每行一条，导出和导入通用）：
+    {"type": "tag", "name": "Python", "color": "#1976D2", "parent": null}
+    {"type": "card", "id": 1, "title": "...", "content": "...", "card_type": "note", "tags": ["Python"]}
+    {"type": "link", "source": 1, "target": 2, "link_type": "reference"}
+
+导入时卡片记录的 id 只用于链接记录引用，新卡片使用数据库分配的ID。
+导入按 IMPORT_BATCH_SIZE 条分批，每批一个事务：卡片用一条 executemany INSERT 写入，
+标签名称每批一次查询解析；某一批写入失败时逐条重试，只有出错的记录计为失败。
+导出使用服务端游标按块读取，内存占用与数据总量无关。
+
+图片卡片导出为 Base64 data URI（导入时重新写入文件存储），可导入到其他用户或实例；
+导入内容为文件下载地址（/api/v1/blobs/<id>）时，只接受属于导入用户的文件。
+"""
+from datetime import timezone
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Set, Tuple
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import bindparam, insert, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, aliased
+from app.core.config import settings
+from app.core.response_cache import response_cache, SCOPE_CARDS, SCOPE_TAGS
+from app.db.base import SessionLocal
+from app.db.session import DBSession
+from app.models.card import Card, CardType
+from app.models.link import CardLink, LinkDirection
+from app.models.tag import CardTag, Tag
+from app.schemas.card import CardImportItem, TagImportItem, LinkImportItem
+from app.services.base import AsyncService
+from app.models.blob import Blob
+from app.services.blob_service import BlobService, blob_url, encode_data_uri, parse_blob_url
+from app.services.graph_service import GraphService
+from app.utils.bulk import insert_ignore, insert_returning_ids
+from app.utils.links import canonical_link
+from app.utils.ndjson import Record, dumps_line
+
+# 导入记录类型
+IMPORT_SCHEMAS = {
+    "card": CardImportItem,
+    "tag": TagImportItem,
+    "link": LinkImportItem,
+}
+
+# 一批待导入的记录：(记录序号, 记录)
+ImportBatch = List[Tuple[int, BaseModel]]
+
+
+class ImportState:
+    """一次导入请求的累计结果（跨批次）"""
+
+    def __init__(self, max_errors: int):
+        self.id_map: Dict[int, int] = {}  # 导入文件中的卡片ID -> 新卡片ID
+        self.cards = 0
+        self.tags = 0
+        self.links = 0
+        self.failed = 0
+        self.errors: List[Dict[str, Any]] = []
+        self.max_errors = max_errors
+
+    def fail(self, line: int, error: str) -> None:
+        """记录一条失败的记录（只保留前 max_errors 条详情）"""
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"line": line, "error": error})
+
+    def summary(self) -> Dict[str, Any]:
+        """导入结果"""
+        return {
+            "cards": self.cards,
+            "tags": self.tags,
+            "links": self.links,
+            "failed": self.failed,
+            "errors": sorted(self.errors, key=lambda error: error["line"])
+        }
+
+
+class _BatchResult:
+    """一批记录的写入结果（事务提交后才合并到 ImportState）"""
+
+    def __init__(self):
+        self.id_map: Dict[int, int] = {}
+        self.cards = 0
+        self.tags = 0
+        self.links = 0
+        self.errors: List[Tuple[int, str]] = []
+
+
+def parse_import_record(record: Any) -> BaseModel:
+    """
+    校验一条导入记录
+
+    Args:
+        record: 解析后的 JSON 值
+
+    Returns:
+        BaseModel: CardImportItem / TagImportItem / LinkImportItem
+
+    Raises:
+        ValueError: 记录无效
+    """
+    if not isinstance(record, dict):
+        raise ValueError("记录必须是 JSON 对象")
+
+    record_type = record.get("type", "card")
+    schema = IMPORT_SCHEMAS.get(record_type)
+    if schema is None:
+        raise ValueError(f"未知的记录类型: {record_type}")
+
+    try:
+        return schema.model_validate({k: v for k, v in record.items() if k != "type"})
+    except ValidationError as e:
+        raise ValueError("; ".join(
+            f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+            for error in e.errors()
+        ))
+
+
+class TransferService:
+    """卡片批量导入导出服务类"""
+
+    @staticmethod
+    def import_batch(db: Session, user_id: int, batch: ImportBatch, state: ImportState) -> None:
+        """
+        导入一批记录并提交
+
+        Args:
+            db: 数据库会话
+            user_id: 用户ID
+            batch: 已校验的记录
+            state: 导入累计结果（写入成功后更新）
+        """
+        try:
+            result = TransferService._write_batch(db, user_id, batch, state.id_map)
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            if len(batch) == 1:
+                state.fail(batch[0][0], f"写入失败: {e.__class__.__name__}")
+                return
+            # 逐条重试，定位出错的记录
+            for row in batch:
+                TransferService.import_batch(db, user_id, [row], state)
+            return
+
+        state.id_map.update(result.id_map)
+        state.cards += result.cards
+        state.tags += result.tags
+        state.links += result.links
+        for line, error in result.errors:
+            state.fail(line, error)
+
+        if result.links:
+            GraphService.invalidate(user_id)
+        if result.cards or result.tags:
+            response_cache.invalidate(user_id, SCOPE_CARDS, SCOPE_TAGS)
+
+    @staticmethod
+    def _write_batch(
+        db: Session,
+        user_id: int,
+        batch: ImportBatch,
+        id_map: Dict[int, int]
+    ) -> _BatchResult:
+        """写入一批记录（不提交）"""
+        result = _BatchResult()
+        tags = [(line, item) for line, item in batch if isinstance(item, TagImportItem)]
+        cards = [(line, item) for line, item in batch if isinstance(item, CardImportItem)]
+        links = [(line, item) for line, item in batch if isinstance(item, LinkImportItem)]
+
+        # 标签：本批用到的名称一次解析，不存在的批量创建
+        colors = {item.name: item.color for _, item in tags}
+        names = set(colors)
+        names.update(item.parent for _, item in tags if item.parent)
+        for _, item in cards:
+            names.update(item.tags)
+        tag_ids, created = TransferService._resolve_tags(db, user_id, names, colors)
+        result.tags = len(created)
+
+        # 新建标签的父标签（已有标签的层级不修改）
+        parents = [
+            {"tag_id": tag_ids[item.name], "parent_id": tag_ids[item.parent]}
+            for _, item in tags
+            if item.parent and item.name in created and item.parent != item.name
+        ]
+        if parents:
+            db.execute(
+                update(Tag.__table__)
+                .where(Tag.__table__.c.id == bindparam("tag_id"))
+                .values(parent_id=bindparam("parent_id")),
+                parents
+            )
+
+        # 卡片：按列集合分组后 executemany 写入
+        cards, blob_ids = TransferService._resolve_blob_urls(db, user_id, cards, result)
+        if cards:
+            card_ids = TransferService._insert_cards(db, user_id, [item for _, item in cards], blob_ids)
+            card_tags = {
+                (card_id, tag_ids[name])
+                for (_, item), card_id in zip(cards, card_ids)
+                for name in item.tags
+            }
+            if card_tags:
+                db.execute(insert(CardTag.__table__), [
+                    {"card_id": card_id, "tag_id": tag_id} for card_id, tag_id in card_tags
+                ])
+            result.cards = len(card_ids)
+            result.id_map = {
+                item.id: card_id
+                for (_, item), card_id in zip(cards, card_ids)
+                if item.id is not None
+            }
+
+        # 链接：引用导入文件中的卡片ID
+        rows = {}
+        for line, item in links:
+            source = result.id_map.get(item.source, id_map.get(item.source))
+            target = result.id_map.get(item.target, id_map.get(item.target))
+            if source is None or target is None:
+                result.errors.append((line, "链接引用的卡片不在本次导入中（卡片记录需出现在链接记录之前）"))
+                continue
+            if source == target:
+                result.errors.append((line, "不能链接到自身"))
+                continue
+            row = canonical_link(source, target, item.link_type.value)
+            rows.setdefault((row["source_card_id"], row["target_card_id"]), row)
+        result.links = insert_ignore(db, CardLink.__table__, list(rows.values()))
+
+        return result
+
+    @staticmethod
+    def _resolve_tags(
+        db: Session,
+        user_id: int,
+        names: Set[str],
+        colors: Dict[str, str]
+    ) -> Tuple[Dict[str, int], Set[str]]:
+        """
+        解析标签名称，不存在的标签批量创建
+
+        Args:
+            db: 数据库会话
+            user_id: 用户ID
+            names: 标签名称
+            colors: 标签记录指定的颜色
+
+        Returns:
+            Tuple[Dict[str, int], Set[str]]: 名称到标签ID的映射，以及新建的标签名称
+        """
+        if not names:
+            return {}, set()
+
+        def lookup(wanted):
+            return dict(db.query(Tag.name, Tag.id).filter(
+                Tag.user_id == user_id,
+                Tag.name.in_(wanted)
+            ).all())
+
+        tag_ids = lookup(names)
+        missing = names - tag_ids.keys()
+        if not missing:
+            return tag_ids, set()
+
+        # 并发导入可能已创建同名标签，由唯一约束兜底
+        default_color = Tag.__table__.c.color.default.arg
+        insert_ignore(db, Tag.__table__, [
+            {"user_id": user_id, "name": name, "color": colors.get(name, default_color)}
+            for name in sorted(missing)
+        ])
+        created = lookup(missing)
+        tag_ids.update(created)
+        return tag_ids, set(created)
+
+    @staticmethod
+    def _resolve_blob_urls(
+        db: Session,
+        user_id: int,
+        cards: List[Tuple[int, CardImportItem]],
+        result: _BatchResult
+    ) -> Tuple[List[Tuple[int, CardImportItem]], List[Optional[int]]]:
+        """
+        关联内容为文件下载地址的图片卡片（一次查询校验文件归属）
+
+        Args:
+            db: 数据库会话
+            user_id: 用户ID
+            cards: 卡片记录
+            result: 本批结果（引用其他用户文件的记录计为失败）
+
+        Returns:
+            Tuple: 可写入的卡片记录，以及对应的文件ID（不是下载地址时为None）
+        """
+        refs = [
+            parse_blob_url(item.content) if item.card_type == CardType.IMAGE else None
+            for _, item in cards
+        ]
+        wanted = {blob_id for blob_id in refs if blob_id is not None}
+        if not wanted:
+            return cards, refs
+
+        owned = {row[0] for row in db.query(Blob.id).filter(
+            Blob.id.in_(wanted),
+            Blob.user_id == user_id
+        )}
+        kept, blob_ids = [], []
+        for (line, item), blob_id in zip(cards, refs):
+            if blob_id is not None and blob_id not in owned:
+                result.errors.append((line, "图片引用的文件不存在或不属于当前用户"))
+                continue
+            kept.append((line, item))
+            blob_ids.append(blob_id)
+        return kept, blob_ids
+
+    @staticmethod
+    def _insert_cards(
+        db: Session,
+        user_id: int,
+        items: List[CardImportItem],
+        blob_ids: List[Optional[int]]
+    ) -> List[int]:
+        """
+        批量插入卡片
+
+        Args:
+            db: 数据库会话
+            user_id: 用户ID
+            items: 卡片记录
+            blob_ids: 已校验的图片文件ID（与 items 对应）
+
+        Returns:
+            List[int]: 新卡片ID（与 items 顺序一致）
+        """
+        rows = []
+        for item, blob_id in zip(items, blob_ids):
+            row = {
+                "user_id": user_id,
+                "title": item.title,
+                "content": item.content,
+                "card_type": item.card_type,
+                "url": item.url,
+                "is_pinned": item.is_pinned,
+                "blob_id": blob_id,
+            }
+            if item.card_type == CardType.IMAGE and item.content.startswith("data:"):
+                blob = BlobService.store_data_uri(db, user_id, item.content)
+                if blob is not None:
+                    row["content"] = blob_url(blob)
+                    row["blob_id"] = blob.id
+            if item.created_at is not None:
+                created_at = item.created_at
+                if created_at.tzinfo is not None:
+                    created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+                row["created_at"] = created_at
+            rows.append(row)
+
+        # executemany 要求每组参数的列相同：未指定创建时间的卡片使用数据库默认值
+        ids: List[Optional[int]] = [None] * len(rows)
+        table = Card.__table__
+        for has_created_at in (False, True):
+            group = [i for i, row in enumerate(rows) if ("created_at" in row) == has_created_at]
+            if not group:
+                continue
+            new_ids = insert_returning_ids(db, table, [rows[i] for i in group])
+            for i, card_id in zip(group, new_ids):
+                ids[i] = card_id
+        return ids
+
+
+async def import_records(db: DBSession, user_id: int, records: AsyncIterator[Record]) -> Dict[str, Any]:
+    """
+    逐条校验导入记录，按 IMPORT_BATCH_SIZE 分批写入
+
+    Args:
+        db: 同步或异步会话
+        user_id: 用户ID
+        records: iter_json_records 解析出的记录
+
+    Returns:
+        Dict[str, Any]: 导入结果（CardImportResponse）
+    """
+    state = ImportState(settings.IMPORT_MAX_ERRORS)
+    batch: ImportBatch = []
+
+    async for line, record in records:
+        if isinstance(record, ValueError):
+            state.fail(line, str(record))
+            continue
+        try:
+            batch.append((line, parse_import_record(record)))
+        except ValueError as e:
+            state.fail(line, str(e))
+            continue
+
+        if len(batch) >= settings.IMPORT_BATCH_SIZE:
+            await AsyncTransferService.import_batch(db, user_id, batch, state)
+            batch = []
+
+    if batch:
+        await AsyncTransferService.import_batch(db, user_id, batch, state)
+
+    return state.summary()
+
+
+def iter_export(user_id: int) -> Iterator[bytes]:
+    """
+    按 NDJSON 导出用户的标签、卡片和链接
+
+    使用独立的会话（响应流式发送期间请求的会话已关闭），
+    查询以 yield_per 分块读取（PostgreSQL 上为服务端游标），每块输出一次。
+
+    Args:
+        user_id: 用户ID
+
+    Yields:
+        bytes: 一块 NDJSON 记录
+    """
+    chunk_size = settings.EXPORT_CHUNK_SIZE
+    db = SessionLocal()
+    try:
+        # 标签（父标签在前，按名称引用）
+        parent = aliased(Tag)
+        tags = db.execute(
+            select(Tag.name, Tag.color, parent.name)
+            .outerjoin(parent, Tag.parent_id == parent.id)
+            .where(Tag.user_id == user_id)
+            .order_by(Tag.id)
+            .execution_options(yield_per=chunk_size)
+        )
+        for rows in tags.partitions():
+            yield b"".join(
+                dumps_line({"type": "tag", "name": name, "color": color, "parent": parent_name})
+                for name, color, parent_name in rows
+            )
+
+        # 卡片（每块一次查询取标签名称，图片卡片的文件内容内联为 data URI）
+        cards = db.execute(
+            select(
+                Card.id, Card.title, Card.content, Card.card_type, Card.url,
+                Card.is_pinned, Card.view_count, Card.created_at, Card.updated_at,
+                Blob.sha256, Blob.content_type
+            )
+            .outerjoin(Blob, Blob.id == Card.blob_id)
+            .where(Card.user_id == user_id)
+            .order_by(Card.id)
+            .execution_options(yield_per=chunk_size)
+        )
+        for rows in cards.partitions():
+            card_tags: Dict[int, List[str]] = {}
+            for card_id, name in db.execute(
+                select(CardTag.card_id, Tag.name)
+                .join(Tag, Tag.id == CardTag.tag_id)
+                .where(CardTag.card_id.in_([row.id for row in rows]))
+                .order_by(CardTag.id)
+            ):
+                card_tags.setdefault(card_id, []).append(name)
+
+            records = []
+            for row in rows:
+                record = row._asdict()
+                sha256, content_type = record.pop("sha256"), record.pop("content_type")
+                if sha256 is not None:
+                    record["content"] = encode_data_uri(sha256, content_type) or record["content"]
+                records.append(dumps_line({"type": "card", **record, "tags": card_tags.get(row.id, [])}))
+            yield b"".join(records)
+
+        # 链接（有方向的链接按逻辑方向输出）
+        links = db.execute(
+            select(
+                CardLink.source_card_id, CardLink.target_card_id,
+                CardLink.link_type, CardLink.direction, CardLink.created_at
+            )
+            .join(Card, Card.id == CardLink.source_card_id)
+            .where(Card.user_id == user_id)
+            .order_by(CardLink.id)
+            .execution_options(yield_per=chunk_size)
+        )
+        for rows in links.partitions():
+            yield b"".join(
+                dumps_line({
+                    "type": "link",
+                    "source": target if direction == LinkDirection.BACKWARD.value else source,
+                    "target": source if direction == LinkDirection.BACKWARD.value else target,
+                    "link_type": link_type,
+                    "created_at": created_at
+                })
+                for source, target, link_type, direction, created_at in rows
+            )
+    finally:
+        db.close()
+
+
+# 异步变体
+AsyncTransferService = AsyncService(TransferService)
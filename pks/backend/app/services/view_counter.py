@@ -0,0 +1,153 @@
+"""
+卡片浏览次数聚合服务
+
+浏览卡片时只在进程内存中累加计数，由后台任务定期把累计值批量写回：
+UPDATE cards SET view_count = view_count + n WHERE id = ...
+读取卡片不再开启写事务，也不会因并发读-改-写丢失计数。
+进程退出时会写回剩余计数；进程异常终止时最多丢失一个写回周期内的计数。
+写回后使相关用户的卡片列表响应缓存失效，列表中的浏览次数最多滞后一个写回周期。
+"""
+import asyncio
+import logging
+import threading
+from typing import Dict, Optional
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.engine import Engine
+from starlette.concurrency import run_in_threadpool
+from app.core.response_cache import response_cache, SCOPE_CARDS
+from app.models.card import Card
+from app.utils.bulk import MAX_BIND_PARAMS
+
+logger = logging.getLogger("pks.view_counter")
+
+
+class ViewCounter:
+    """浏览次数写回缓冲"""
+
+    def __init__(self):
+        self._pending: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def record(self, card_id: int) -> int:
+        """
+        记录一次浏览
+
+        Args:
+            card_id: 卡片ID
+
+        Returns:
+            int: 该卡片尚未写回的浏览次数（含本次）
+        """
+        with self._lock:
+            count = self._pending.get(card_id, 0) + 1
+            self._pending[card_id] = count
+            return count
+
+    def pending(self, card_id: int) -> int:
+        """
+        获取卡片尚未写回的浏览次数
+
+        Args:
+            card_id: 卡片ID
+
+        Returns:
+            int: 未写回的浏览次数
+        """
+        with self._lock:
+            return self._pending.get(card_id, 0)
+
+    def flush(self, engine: Engine) -> int:
+        """
+        将累计的浏览次数批量写回数据库
+
+        写回失败时计数会放回缓冲区，等待下次写回；成功后使卡片所属用户的
+        卡片列表缓存失效。
+
+        Args:
+            engine: 同步数据库引擎
+
+        Returns:
+            int: 写回的卡片数
+        """
+        with self._lock:
+            batch, self._pending = self._pending, {}
+
+        if not batch:
+            return 0
+
+        table = Card.__table__
+        stmt = (
+            update(table)
+            .where(table.c.id == bindparam("card_id"))
+            .values(view_count=table.c.view_count + bindparam("delta"))
+        )
+
+        try:
+            with engine.begin() as conn:
+                conn.execute(stmt, [
+                    {"card_id": card_id, "delta": delta}
+                    for card_id, delta in batch.items()
+                ])
+                card_ids = list(batch)
+                user_ids = {
+                    user_id
+                    for start in range(0, len(card_ids), MAX_BIND_PARAMS)
+                    for user_id in conn.execute(
+                        select(table.c.user_id).distinct().where(
+                            table.c.id.in_(card_ids[start:start + MAX_BIND_PARAMS])
+                        )
+                    ).scalars()
+                }
+        except Exception:
+            with self._lock:
+                for card_id, delta in batch.items():
+                    self._pending[card_id] = self._pending.get(card_id, 0) + delta
+            raise
+
+        for user_id in user_ids:
+            response_cache.invalidate(user_id, SCOPE_CARDS)
+
+        return len(batch)
+
+    def start(self, engine: Engine, interval: float) -> None:
+        """
+        启动后台定期写回任务
+
+        Args:
+            engine: 同步数据库引擎
+            interval: 写回间隔（秒）
+        """
+        if self._task is not None:
+            return
+
+        async def run() -> None:
+            while True:
+                await asyncio.sleep(interval)
+                try:
+                    await run_in_threadpool(self.flush, engine)
+                except Exception:
+                    logger.exception("浏览次数写回失败")
+
+        self._task = asyncio.create_task(run())
+
+    async def stop(self, engine: Engine) -> None:
+        """
+        停止后台任务并写回剩余计数
+
+        Args:
+            engine: 同步数据库引擎
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        await run_in_threadpool(self.flush, engine)
+
+
+# 全局实例（每个进程一个）
+view_counter = ViewCounter()
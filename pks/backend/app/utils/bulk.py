@@ -0,0 +1,74 @@
+"""
+批量写入工具
+
+INSERT ... ON CONFLICT DO NOTHING 在 SQLite 和 PostgreSQL 上语法一致，
+但 SQLAlchemy 需要使用各自方言的 insert 构造。
+"""
+from typing import Any, Dict, List
+from sqlalchemy import Table, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+# 单条语句的绑定参数上限（SQLite 默认 32766，PostgreSQL 65535）
+MAX_BIND_PARAMS = 32000
+
+
+def insert_ignore(db: Session, table: Table, rows: List[Dict[str, Any]]) -> int:
+    """
+    批量插入，忽略违反唯一约束的行
+
+    按绑定参数上限分成多条多值 INSERT，行数不受数据库参数个数限制。
+
+    Args:
+        db: 数据库会话
+        table: 目标表
+        rows: 待插入的行
+
+    Returns:
+        int: 实际插入的行数
+    """
+    if not rows:
+        return 0
+
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        stmt = sqlite.insert(table).on_conflict_do_nothing()
+    elif dialect == "postgresql":
+        stmt = postgresql.insert(table).on_conflict_do_nothing()
+    else:
+        stmt = insert(table)
+
+    # 多值 INSERT 的 rowcount 在两种数据库上都是实际插入行数
+    per_statement = max(1, MAX_BIND_PARAMS // len(rows[0]))
+    return sum(
+        db.execute(stmt.values(rows[start:start + per_statement])).rowcount
+        for start in range(0, len(rows), per_statement)
+    )
+
+
+def insert_returning_ids(db: Session, table: Table, rows: List[Dict[str, Any]]) -> List[int]:
+    """
+    批量插入并返回新行的主键（与 rows 顺序一致）
+
+    PostgreSQL 上由 SQLAlchemy 按参数顺序对齐 RETURNING 结果（仍为多值批量插入）。
+    SQLite 的 RETURNING 不保证顺序，而要求按参数顺序对齐时 SQLAlchemy 会退化为逐行插入；
+    SQLite 写事务独占数据库，同一条多值 INSERT 的 rowid 按 VALUES 顺序递增分配，
+    因此不要求顺序、将返回的主键升序排列即可与 rows 对应。
+
+    Args:
+        db: 数据库会话
+        table: 目标表（整数自增主键）
+        rows: 待插入的行（各行的列相同）
+
+    Returns:
+        List[int]: 新行的主键
+    """
+    if not rows:
+        return []
+
+    sqlite_dialect = db.get_bind().dialect.name == "sqlite"
+    stmt = insert(table).returning(
+        table.c.id, sort_by_parameter_order=not sqlite_dialect
+    )
+    ids = db.execute(stmt, rows).scalars().all()
+    return sorted(ids) if sqlite_dialect else list(ids)
@@ -0,0 +1,123 @@
+"""
+搜索结果摘要和高亮
+
+全文索引生成的摘要用控制字符标记匹配位置（MARK_START / MARK_END），
+这里将其转换为纯文本和高亮区间；索引不可用时在有限长度的内容前缀中查找匹配。
+高亮区间为 [起始, 结束) 字符偏移（按 Unicode 码点计数，即 Python 字符串下标），客户端无需再对原文做匹配。
+"""
+import re
+from typing import List, Optional, Tuple
+
+MARK_START = "\x02"
+MARK_END = "\x03"
+ELLIPSIS = "…"
+
+_WHITESPACE = re.compile(r"\s+")
+
+Highlights = List[List[int]]
+
+
+def search_terms(keyword: str) -> List[str]:
+    """将搜索关键词拆分为去重后的词（按长度降序，优先匹配较长的词）"""
+    terms = {term.casefold() for term in keyword.split() if term}
+    return sorted(terms, key=len, reverse=True)
+
+
+def parse_marked(text: str) -> Tuple[str, Highlights]:
+    """
+    将带匹配标记的文本转换为纯文本和高亮区间
+
+    Args:
+        text: 带 MARK_START / MARK_END 标记的文本
+
+    Returns:
+        Tuple[str, Highlights]: 纯文本（空白已合并）和高亮区间
+    """
+    text = _WHITESPACE.sub(" ", text).strip()
+    plain = []
+    highlights = []
+    length = 0
+    start = None
+
+    for char in text:
+        if char == MARK_START:
+            start = length
+        elif char == MARK_END:
+            if start is not None and length > start:
+                # 相邻的匹配合并为一个区间
+                if highlights and highlights[-1][1] == start:
+                    highlights[-1][1] = length
+                else:
+                    highlights.append([start, length])
+            start = None
+        else:
+            plain.append(char)
+            length += 1
+
+    return "".join(plain), highlights
+
+
+def find_highlights(text: str, terms: List[str]) -> Highlights:
+    """
+    查找文本中所有词的出现位置（不区分大小写，重叠区间合并）
+
+    Args:
+        text: 文本
+        terms: search_terms 返回的词
+
+    Returns:
+        Highlights: 高亮区间
+    """
+    folded = text.casefold()
+    # casefold 可能改变长度（如 ß -> ss），此时无法对应原文偏移
+    if len(folded) != len(text):
+        folded = text.lower()
+        if len(folded) != len(text):
+            return []
+
+    spans = []
+    for term in terms:
+        position = folded.find(term)
+        while position != -1:
+            spans.append([position, position + len(term)])
+            position = folded.find(term, position + len(term))
+
+    merged: Highlights = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def make_snippet(text: str, terms: List[str], length: int) -> Optional[Tuple[str, Highlights]]:
+    """
+    截取第一个匹配附近的片段
+
+    Args:
+        text: 内容（调用方应限制长度，保证耗时有上限）
+        terms: search_terms 返回的词
+        length: 片段最大字符数
+
+    Returns:
+        Optional[Tuple[str, Highlights]]: 片段和片段内的高亮区间，没有匹配时返回None
+    """
+    text = _WHITESPACE.sub(" ", text).strip()
+    highlights = find_highlights(text, terms)
+    if not highlights:
+        return None
+
+    # 匹配位置放在片段前三分之一处
+    first = highlights[0][0]
+    start = max(0, min(first - length // 3, len(text) - length))
+    end = min(len(text), start + length)
+
+    prefix = ELLIPSIS if start > 0 else ""
+    suffix = ELLIPSIS if end < len(text) else ""
+    offset = len(prefix) - start
+
+    return prefix + text[start:end] + suffix, [
+        [max(s, start) + offset, min(e, end) + offset]
+        for s, e in highlights if s < end and e > start
+    ]
@@ -0,0 +1,111 @@
+"""
+HTTP Range 请求工具
+
+支持单个字节范围（bytes=start-end / bytes=start- / bytes=-suffix），
+多范围请求按完整内容返回。
+"""
+import os
+from typing import Dict, Iterator, Optional, Tuple
+from starlette.responses import FileResponse, Response, StreamingResponse
+
+# 流式读取块大小
+CHUNK_SIZE = 64 * 1024
+
+
+class RangeNotSatisfiable(ValueError):
+    """请求范围超出文件大小"""
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    解析 Range 请求头
+
+    Args:
+        header: Range 请求头
+        size: 文件字节数
+
+    Returns:
+        Optional[Tuple[int, int]]: 起止字节位置（含两端），无需分段时返回None
+
+    Raises:
+        RangeNotSatisfiable: 范围无法满足
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+
+    start_text, _, end_text = header[len("bytes="):].strip().partition("-")
+    try:
+        if start_text:
+            start = int(start_text)
+            end = int(end_text) if end_text else size - 1
+        elif end_text:
+            start = max(size - int(end_text), 0)
+            end = size - 1
+        else:
+            return None
+    except ValueError:
+        return None
+
+    if start >= size:
+        raise RangeNotSatisfiable(header)
+    if start < 0 or start > end:
+        return None
+    return start, min(end, size - 1)
+
+
+def _iter_file(path: str, start: int, length: int) -> Iterator[bytes]:
+    """按块读取文件的指定范围"""
+    with open(path, "rb") as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def ranged_file_response(
+    path: str,
+    media_type: str,
+    range_header: Optional[str] = None,
+    headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """
+    发送本地文件，支持 Range 请求
+
+    Args:
+        path: 文件路径
+        media_type: 媒体类型
+        range_header: Range 请求头
+        headers: 额外响应头
+
+    Returns:
+        Response: 完整内容（200）、部分内容（206）或范围无效（416）响应
+    """
+    size = os.path.getsize(path)
+    headers = {**(headers or {}), "Accept-Ranges": "bytes"}
+
+    try:
+        byte_range = parse_range(range_header, size)
+    except RangeNotSatisfiable:
+        return Response(
+            status_code=416,
+            headers={**headers, "Content-Range": f"bytes */{size}"}
+        )
+
+    if byte_range is None:
+        return FileResponse(path, media_type=media_type, headers=headers)
+
+    start, end = byte_range
+    length = end - start + 1
+    headers.update({
+        "Content-Range": f"bytes {start}-{end}/{size}",
+        "Content-Length": str(length),
+    })
+    return StreamingResponse(
+        _iter_file(path, start, length),
+        status_code=206,
+        media_type=media_type,
+        headers=headers
+    )
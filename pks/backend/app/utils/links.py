@@ -0,0 +1,107 @@
+"""
+卡片链接查询工具
+
+链接按 (较小ID, 较大ID) 规范化后只存一行，以下工具负责规范化写入，
+以及把一张卡片的出链/入链还原为"以该卡片为视角"的邻居列表。
+"""
+from typing import Any, Dict, Optional
+from sqlalchemy import Select, and_, literal, select, union_all
+from sqlalchemy.sql.elements import ColumnElement
+from app.models.card import Card
+from app.models.link import CardLink, LinkType, LinkDirection, DIRECTED_LINK_TYPES
+
+
+def canonical_link(card_id: int, other_id: int, link_type: str = LinkType.REFERENCE.value) -> Dict[str, Any]:
+    """
+    构建规范化的链接行
+
+    Args:
+        card_id: 链接起点卡片ID
+        other_id: 链接终点卡片ID
+        link_type: 链接类型
+
+    Returns:
+        Dict[str, Any]: CardLink 的列值
+    """
+    link_type = LinkType(link_type).value
+    if link_type not in DIRECTED_LINK_TYPES:
+        direction = LinkDirection.NONE
+    elif card_id < other_id:
+        direction = LinkDirection.FORWARD
+    else:
+        direction = LinkDirection.BACKWARD
+
+    return {
+        "source_card_id": min(card_id, other_id),
+        "target_card_id": max(card_id, other_id),
+        "link_type": link_type,
+        "direction": direction.value
+    }
+
+
+def link_between(card_id: int, other_id: int) -> ColumnElement:
+    """
+    两张卡片之间链接的筛选条件（与方向无关）
+
+    Args:
+        card_id: 卡片ID
+        other_id: 另一张卡片ID
+
+    Returns:
+        ColumnElement: 筛选条件
+    """
+    return and_(
+        CardLink.source_card_id == min(card_id, other_id),
+        CardLink.target_card_id == max(card_id, other_id)
+    )
+
+
+def card_links_query(card_id: int, link_type: Optional[str] = None) -> Select:
+    """
+    查询卡片的所有链接（以该卡片为视角）
+
+    两个分支分别走 source_card_id / target_card_id 索引，UNION ALL 后一次查询取回。
+    结果列：link_id、id/title（邻居卡片）、link_type、direction、created_at，
+    以及 is_source（该卡片是否为规范化后的 source_card_id）。
+
+    Args:
+        card_id: 卡片ID
+        link_type: 链接类型筛选（None表示全部）
+
+    Returns:
+        Select: 查询语句
+    """
+    def branch(own_column, neighbour_column, is_source: bool) -> Select:
+        query = select(
+            CardLink.id.label("link_id"),
+            Card.id.label("id"),
+            Card.title.label("title"),
+            CardLink.link_type.label("link_type"),
+            CardLink.direction.label("direction"),
+            CardLink.created_at.label("created_at"),
+            literal(is_source).label("is_source")
+        ).join(Card, Card.id == neighbour_column).where(own_column == card_id)
+
+        if link_type is not None:
+            query = query.where(CardLink.link_type == LinkType(link_type).value)
+        return query
+
+    links = union_all(
+        branch(CardLink.source_card_id, CardLink.target_card_id, True),
+        branch(CardLink.target_card_id, CardLink.source_card_id, False)
+    ).subquery("card_links_view")
+    return select(links).order_by(links.c.link_id)
+
+
+def is_outgoing(is_source: bool, direction: int) -> bool:
+    """以 is_source 一端为视角，链接是否为出链（无方向链接既是出链也是入链）"""
+    if direction == LinkDirection.NONE:
+        return True
+    return (direction == LinkDirection.FORWARD) == bool(is_source)
+
+
+def is_incoming(is_source: bool, direction: int) -> bool:
+    """以 is_source 一端为视角，链接是否为入链（无方向链接既是出链也是入链）"""
+    if direction == LinkDirection.NONE:
+        return True
+    return (direction == LinkDirection.BACKWARD) == bool(is_source)
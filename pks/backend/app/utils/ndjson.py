@@ -0,0 +1,166 @@
+"""
+NDJSON / JSON 数组的流式解析和序列化
+
+请求体按块到达时逐条解析记录，内存占用只与单条记录的大小有关：
+- NDJSON：每行一条记录，某一行解析失败不影响后续行
+- JSON 数组：以 "[" 开头时按数组元素逐个解析，语法错误后无法定位下一个元素，解析终止
+"""
+import codecs
+import json
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, AsyncIterator, Tuple, Union
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\r\n"
+_SEPARATORS = _WHITESPACE + ","
+
+
+class RecordTooLarge(ValueError):
+    """单条记录超过大小上限"""
+
+
+class RecordSyntaxError(ValueError):
+    """记录不是有效的 JSON"""
+
+
+# 解析结果：(记录序号, 记录或解析错误)，序号从1开始（NDJSON 为行号）
+Record = Tuple[int, Union[Any, ValueError]]
+
+
+async def iter_json_records(
+    chunks: AsyncIterator[bytes],
+    max_record_size: int
+) -> AsyncIterator[Record]:
+    """
+    从字节流中逐条解析 NDJSON 或 JSON 数组记录
+
+    Args:
+        chunks: 请求体字节块（如 Request.stream()）
+        max_record_size: 单条记录的最大字符数
+
+    Yields:
+        Record: 记录序号和解析后的记录；解析失败时为 RecordSyntaxError / RecordTooLarge
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    stream = chunks.__aiter__()
+    buffer = ""
+    mode = None  # "ndjson" / "array"
+    index = 0
+    skipping = False  # NDJSON：正在跳过超长行的剩余部分
+    retry_size = 0  # 数组：缓冲区达到此长度后才重新尝试解析未完整的元素（避免大元素被反复扫描）
+    more = True
+
+    while more:
+        try:
+            chunk = await stream.__anext__()
+            buffer += decoder.decode(chunk)
+        except StopAsyncIteration:
+            buffer += decoder.decode(b"", final=True)
+            more = False
+
+        if mode is None:
+            stripped = buffer.lstrip(_WHITESPACE)
+            if not stripped:
+                continue
+            if stripped[0] == "[":
+                mode = "array"
+                buffer = stripped[1:]
+            else:
+                mode = "ndjson"
+
+        if mode == "ndjson":
+            if skipping:
+                if "\n" not in buffer:
+                    buffer = ""
+                    continue
+                buffer = buffer.split("\n", 1)[1]
+                skipping = False
+
+            *lines, buffer = buffer.split("\n")
+            if not more:
+                lines.append(buffer)
+                buffer = ""
+
+            for line in lines:
+                index += 1
+                line = line.strip()
+                if not line:
+                    continue
+                if len(line) > max_record_size:
+                    yield index, RecordTooLarge(f"记录超过 {max_record_size} 个字符")
+                    continue
+                try:
+                    yield index, json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield index, RecordSyntaxError(f"JSON 格式错误: {e.msg}")
+
+            if len(buffer) > max_record_size:
+                index += 1
+                yield index, RecordTooLarge(f"记录超过 {max_record_size} 个字符")
+                buffer = ""
+                skipping = True
+            continue
+
+        # JSON 数组：元素之后必须还有字符（"," 或 "]"）才能确认元素完整
+        position = 0
+        while True:
+            while position < len(buffer) and buffer[position] in _SEPARATORS:
+                position += 1
+            if buffer.startswith("]", position):
+                return
+            pending = len(buffer) - position
+            if not pending or (more and pending < retry_size):
+                break
+
+            try:
+                value, end = _decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError as e:
+                if more and pending <= max_record_size:
+                    retry_size = pending * 2
+                    break
+                index += 1
+                if pending > max_record_size:
+                    yield index, RecordTooLarge(f"记录超过 {max_record_size} 个字符")
+                else:
+                    yield index, RecordSyntaxError(f"JSON 格式错误: {e.msg}")
+                return
+
+            if end == len(buffer) and more:
+                retry_size = pending + 1
+                break
+            index += 1
+            retry_size = 0
+            position = end
+            yield index, value
+
+        buffer = buffer[position:]
+
+    if mode == "array":
+        index += 1
+        yield index, RecordSyntaxError("JSON 数组未结束")
+
+
+def _default(value: Any) -> Any:
+    """JSON 序列化扩展：日期时间输出 ISO 8601，枚举输出值"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"无法序列化 {type(value).__name__}")
+
+
+_encoder = json.JSONEncoder(ensure_ascii=False, default=_default)
+
+
+def dumps_line(record: Any) -> bytes:
+    """
+    序列化为一行 NDJSON
+
+    Args:
+        record: 记录
+
+    Returns:
+        bytes: UTF-8 编码的 JSON 加换行符
+    """
+    return (_encoder.encode(record) + "\n").encode("utf-8")
@@ -0,0 +1,123 @@
+"""
+游标分页工具
+
+游标是排序方式和排序键取值的 base64 编码 JSON，对客户端不透明。
+按 (排序列, id) 做 keyset 过滤，翻页代价与页码深度无关；
+游标只能用于生成它的排序方式，排序方式不一致时拒绝而不是返回错位的结果。
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence
+from sqlalchemy import and_, or_, literal, DateTime, String
+
+
+def encode_cursor(values: Sequence[Any], sort_key: str) -> str:
+    """
+    将排序键取值编码为游标
+
+    Args:
+        values: 排序键取值（与排序列一一对应）
+        sort_key: 排序方式标识（如 "created_at:desc"）
+
+    Returns:
+        str: 不透明游标字符串
+    """
+    def default(value: Any) -> Any:
+        if isinstance(value, datetime):
+            return value.isoformat()
+        if hasattr(value, "value"):  # 枚举
+            return value.value
+        raise TypeError(f"无法编码的游标值: {value!r}")
+
+    raw = json.dumps({"s": sort_key, "v": list(values)}, default=default, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_key: str) -> List[Any]:
+    """
+    解码游标
+
+    Args:
+        cursor: 游标字符串
+        sort_key: 当前请求的排序方式标识
+
+    Returns:
+        List[Any]: 排序键取值
+
+    Raises:
+        ValueError: 游标格式无效，或游标不是按当前排序方式生成的
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise ValueError("无效的分页游标")
+
+    if not isinstance(payload, dict) or not isinstance(payload.get("v"), list):
+        raise ValueError("无效的分页游标")
+
+    if payload.get("s") != sort_key:
+        raise ValueError("分页游标与当前排序方式不一致")
+
+    return payload["v"]
+
+
+def _bind_value(column: Any, value: Any, dialect_name: Optional[str]) -> Any:
+    """将游标取值转换为可与列比较的绑定值"""
+    if not isinstance(value, str) or not isinstance(getattr(column, "type", None), DateTime):
+        return value
+
+    try:
+        value = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError("无效的分页游标")
+
+    # SQLite 以文本保存时间，server_default=func.now() 写入的格式不含微秒，
+    # 直接绑定 datetime 会带上 ".000000" 导致文本比较错位
+    if dialect_name == "sqlite":
+        fmt = "%Y-%m-%d %H:%M:%S" if value.microsecond == 0 else "%Y-%m-%d %H:%M:%S.%f"
+        return literal(value.strftime(fmt), String)
+
+    return value
+
+
+def keyset_filter(
+    columns: Sequence[Any],
+    values: Sequence[Any],
+    descending: bool,
+    dialect_name: Optional[str] = None
+):
+    """
+    构建 keyset 分页过滤条件
+
+    等价于 (c1, c2, ...) < (v1, v2, ...)（降序）或 >（升序），
+    展开为 OR 链以兼容不支持行值比较的数据库。
+
+    Args:
+        columns: 排序列（最后一列应唯一，通常为主键）
+        values: 上一页最后一条记录的排序键取值
+        descending: 是否降序
+        dialect_name: 数据库方言名称
+
+    Returns:
+        SQL过滤条件
+
+    Raises:
+        ValueError: 取值个数与排序列不一致
+    """
+    if len(columns) != len(values):
+        raise ValueError("无效的分页游标")
+
+    values = [
+        _bind_value(column, value, dialect_name)
+        for column, value in zip(columns, values)
+    ]
+
+    clauses = []
+    for i, column in enumerate(columns):
+        equal_prefix = [columns[j] == values[j] for j in range(i)]
+        beyond = column < values[i] if descending else column > values[i]
+        clauses.append(and_(*equal_prefix, beyond))
+
+    return or_(*clauses)
@@ -0,0 +1,130 @@
+"""
+卡片列表投影
+
+列表和搜索接口默认只加载轻量列，并在SQL中截取内容前缀作为摘要，
+避免把完整内容（图片卡片可能是数 MB 的 Base64）读出数据库和写入响应。
+客户端可通过 fields 参数额外请求完整内容。
+"""
+import re
+from typing import Any, Dict, List, Optional, Set
+from sqlalchemy import case, func, null
+from sqlalchemy.orm import load_only, with_expression
+from app.core.config import settings
+from app.models.card import Card, CardType
+
+# 列表默认加载的列
+LIST_COLUMNS = (
+    Card.id,
+    Card.user_id,
+    Card.title,
+    Card.card_type,
+    Card.url,
+    Card.is_pinned,
+    Card.view_count,
+    Card.created_at,
+    Card.updated_at,
+)
+
+# 可通过 fields 参数额外请求的字段
+OPTIONAL_FIELDS = {
+    "content": Card.content,
+}
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def parse_fields(fields: Optional[str]) -> Set[str]:
+    """
+    解析 fields 参数
+
+    Args:
+        fields: 逗号分隔的字段名
+
+    Returns:
+        Set[str]: 额外请求的字段
+
+    Raises:
+        ValueError: 包含不支持的字段
+    """
+    if not fields:
+        return set()
+
+    names = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = names - OPTIONAL_FIELDS.keys()
+    if unknown:
+        raise ValueError(
+            f"不支持的字段: {', '.join(sorted(unknown))}（可选: {', '.join(sorted(OPTIONAL_FIELDS))}）"
+        )
+    return names
+
+
+def list_options(fields: Set[str]) -> List[Any]:
+    """
+    构建列表查询的加载选项
+
+    未加载的列设置为 raiseload，误访问时立即报错而不是逐行补查。
+
+    Args:
+        fields: 额外请求的字段
+
+    Returns:
+        List[Any]: 查询选项
+    """
+    columns = list(LIST_COLUMNS) + [OPTIONAL_FIELDS[name] for name in sorted(fields)]
+    return [
+        load_only(*columns, raiseload=True),
+        with_expression(Card.snippet, snippet_expression())
+    ]
+
+
+def snippet_expression():
+    """摘要的SQL表达式：内容前缀（多取一个字符用于判断是否截断），图片卡片不生成摘要"""
+    return case(
+        (Card.card_type == CardType.IMAGE, null()),
+        else_=func.substr(Card.content, 1, settings.LIST_SNIPPET_LENGTH + 1)
+    )
+
+
+def make_snippet(prefix: Optional[str]) -> Optional[str]:
+    """
+    将内容前缀整理为摘要（合并空白，超长时截断并添加省略号）
+
+    Args:
+        prefix: snippet_expression 查询出的内容前缀
+
+    Returns:
+        Optional[str]: 摘要
+    """
+    if prefix is None:
+        return None
+
+    truncated = len(prefix) > settings.LIST_SNIPPET_LENGTH
+    snippet = _WHITESPACE.sub(" ", prefix[:settings.LIST_SNIPPET_LENGTH]).strip()
+    return snippet + "…" if truncated else snippet
+
+
+def card_list_item(card: Card, fields: Set[str]) -> Dict[str, Any]:
+    """
+    将按 list_options 加载的卡片转换为列表项
+
+    Args:
+        card: 卡片对象
+        fields: 额外请求的字段
+
+    Returns:
+        Dict[str, Any]: 列表项
+    """
+    item = {
+        "id": card.id,
+        "title": card.title,
+        "card_type": card.card_type,
+        "url": card.url,
+        "snippet": make_snippet(card.snippet),
+        "is_pinned": card.is_pinned,
+        "view_count": card.view_count,
+        "created_at": card.created_at,
+        "updated_at": card.updated_at
+    }
+    for name in sorted(fields):
+        item[name] = getattr(card, name)
+    return item
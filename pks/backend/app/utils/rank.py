@@ -0,0 +1,154 @@
+"""
+排序键（rank）工具
+
+排序键是 [0-9a-z] 组成的字符串，按字典序比较，可视为 36 进制小数的小数部分。
+在两个键之间总能生成一个新键，因此插入或移动只需修改一行；
+键只用数字和小写字母，在 SQLite 二进制排序和 PostgreSQL 语言排序规则下顺序一致。
+连续在同一位置插入会使键变长，超过 REBALANCE_LENGTH 时应重新均匀分配。
+"""
+from typing import List, Optional
+
+ALPHABET = "0123456789abcdefghijklmnopqrstuvwxyz"
+BASE = len(ALPHABET)
+
+# 排序键数据库列长度
+RANK_MAX_LENGTH = 64
+
+# 键长度超过该值时触发重新分配
+REBALANCE_LENGTH = 24
+
+# 追加到开头或末尾时按该精度步进（每个前缀可容纳 36^6 次连续追加而不变长）
+STEP_WIDTH = 6
+
+_DIGITS = {char: index for index, char in enumerate(ALPHABET)}
+
+
+def _midpoint(low: str, high: Optional[str]) -> str:
+    """
+    计算 low 与 high 之间的键
+
+    Args:
+        low: 下界（空字符串表示 0）
+        high: 上界（None 表示 1）
+    """
+    if high is not None:
+        # 跳过公共前缀（low 不足的位按 "0" 处理）
+        n = 0
+        while n < len(high) and (low[n] if n < len(low) else "0") == high[n]:
+            n += 1
+        if n > 0:
+            return high[:n] + _midpoint(low[n:], high[n:])
+
+    low_digit = _DIGITS[low[0]] if low else 0
+    high_digit = _DIGITS[high[0]] if high is not None else BASE
+
+    if high_digit - low_digit > 1:
+        return ALPHABET[(low_digit + high_digit) // 2]
+
+    # 首位相邻：high 更长时取其首位即可，否则在 low 之后继续细分
+    if high is not None and len(high) > 1:
+        return high[0]
+
+    return ALPHABET[low_digit] + _midpoint(low[1:], None)
+
+
+def _step(rank: str, delta: int) -> Optional[str]:
+    """
+    将键按 STEP_WIDTH 精度加减一个单位
+
+    Args:
+        rank: 排序键
+        delta: 1 或 -1
+
+    Returns:
+        Optional[str]: 新键，超出 (0, 1) 范围时返回None
+    """
+    width = max(len(rank), STEP_WIDTH)
+    value = 0
+    for char in rank.ljust(width, "0"):
+        value = value * BASE + _DIGITS[char]
+
+    value += delta
+    if value <= 0 or value >= BASE ** width:
+        return None
+
+    digits = []
+    for _ in range(width):
+        value, digit = divmod(value, BASE)
+        digits.append(ALPHABET[digit])
+    return "".join(reversed(digits)).rstrip("0")
+
+
+def rank_between(before: Optional[str], after: Optional[str]) -> str:
+    """
+    生成位于两个键之间的新键
+
+    Args:
+        before: 前一个键（None 表示插入到开头）
+        after: 后一个键（None 表示插入到末尾）
+
+    Returns:
+        str: 新键
+
+    Raises:
+        ValueError: before 不小于 after，或键包含非法字符
+    """
+    if before is not None and after is not None and before >= after:
+        raise ValueError("排序键顺序无效")
+
+    for key in (before, after):
+        if key is not None and (not key or key[-1] == "0" or set(key) - set(ALPHABET)):
+            raise ValueError("排序键格式无效")
+
+    # 在开头或末尾追加时按固定精度步进，避免反复取中点使键快速变长
+    if after is None and before is not None:
+        return _step(before, 1) or _midpoint(before, None)
+    if before is None and after is not None:
+        return _step(after, -1) or _midpoint("", after)
+
+    return _midpoint(before or "", after)
+
+
+def initial_ranks(count: int) -> List[str]:
+    """
+    生成均匀分布的一组键（用于初始化和重新分配）
+
+    Args:
+        count: 键数量
+
+    Returns:
+        List[str]: 递增的键列表
+    """
+    if count <= 0:
+        return []
+
+    # 键长度比最少所需多一位，保留插入空间
+    width = 1
+    while BASE ** width <= count:
+        width += 1
+    width += 1
+
+    step = BASE ** width // (count + 1)
+    ranks = []
+    for i in range(1, count + 1):
+        value = i * step
+        digits = []
+        for _ in range(width):
+            value, digit = divmod(value, BASE)
+            digits.append(ALPHABET[digit])
+        ranks.append("".join(reversed(digits)).rstrip("0"))
+
+    return ranks
+
+
+def needs_rebalance(rank: str) -> bool:
+    """
+    判断键是否过长需要重新分配
+
+    Args:
+        rank: 排序键
+
+    Returns:
+        bool: 是否需要重新分配
+    """
+    return len(rank) > REBALANCE_LENGTH
@@ -0,0 +1,54 @@
+"""
+备份脚本
+
+用法:
+    python scripts/backup.py <输出文件>                    # 整个实例（SQLite 为数据库快照）
+    python scripts/backup.py <输出文件> --logical          # 整个实例的逻辑备份（可用 restore.py 恢复）
+    python scripts/backup.py <输出文件> --user <用户名>    # 单个用户的逻辑备份
+
+SQLite 快照使用在线备份 API，服务运行期间也可执行；解压后即为完整的数据库文件。
+"""
+import argparse
+import os
+import sys
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.base import SessionLocal
+from app.models.user import User
+from app.services.backup_service import iter_backup, iter_sqlite_snapshot, sqlite_database_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PKS 备份")
+    parser.add_argument("output", help="输出文件路径（gzip 压缩）")
+    parser.add_argument("--user", help="只备份指定用户（用户名）")
+    parser.add_argument("--logical", action="store_true", help="SQLite 也生成逻辑备份而不是数据库快照")
+    args = parser.parse_args()
+
+    if args.user:
+        with SessionLocal() as db:
+            user = db.query(User).filter(User.username == args.user).first()
+        if user is None:
+            sys.exit(f"用户不存在: {args.user}")
+        chunks = iter_backup(user.id)
+        kind = f"用户 {args.user} 的逻辑备份"
+    elif sqlite_database_path() is not None and not args.logical:
+        chunks = iter_sqlite_snapshot()
+        kind = "SQLite 数据库快照"
+    else:
+        chunks = iter_backup()
+        kind = "实例逻辑备份"
+
+    size = 0
+    with open(args.output, "wb") as f:
+        for chunk in chunks:
+            f.write(chunk)
+            size += len(chunk)
+
+    print(f"✓ 已写入{kind}: {args.output}（{size / 1024 / 1024:.1f} MB）")
+
+
+if __name__ == "__main__":
+    main()
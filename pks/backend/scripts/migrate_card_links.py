@@ -0,0 +1,101 @@
+"""
+卡片链接去重迁移脚本
+
+旧版本每条链接存正反两行，迁移后每条链接只保留一行：
+source_card_id 为较小的卡片ID，target_card_id 为较大的，
+父子关系的实际方向记录在 direction 列（以最早创建的一行为准）。
+脚本可重复执行，已迁移的表会被跳过。
+
+用法: python scripts/migrate_card_links.py
+"""
+import os
+import sys
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import Column, SmallInteger, inspect, text
+from app.db.base import engine
+from app.models.link import CardLink
+from app.utils.links import canonical_link
+
+BATCH_SIZE = 1000
+
+
+def migrate_links(conn) -> int:
+    """
+    合并镜像链接并规范化端点顺序
+
+    Args:
+        conn: 数据库连接
+
+    Returns:
+        int: 删除的冗余行数，未迁移时返回 -1
+    """
+    columns = {column["name"] for column in inspect(conn).get_columns("card_links")}
+    if "direction" in columns:
+        return -1
+
+    op = Operations(MigrationContext.configure(conn))
+    op.add_column(
+        "card_links",
+        Column("direction", SmallInteger, nullable=False, server_default="0")
+    )
+
+    # 每对卡片保留最早创建的一行，方向以该行为准
+    rows = conn.execute(text(
+        "SELECT id, source_card_id, target_card_id, link_type FROM card_links ORDER BY id"
+    )).all()
+
+    kept = {}
+    duplicates = []
+    for link_id, source_id, target_id, link_type in rows:
+        pair = (min(source_id, target_id), max(source_id, target_id))
+        if pair in kept or source_id == target_id:
+            duplicates.append(link_id)
+        else:
+            kept[pair] = (link_id, canonical_link(source_id, target_id, link_type or "reference"))
+
+    for i in range(0, len(duplicates), BATCH_SIZE):
+        conn.execute(
+            text("DELETE FROM card_links WHERE id = :link_id"),
+            [{"link_id": link_id} for link_id in duplicates[i:i + BATCH_SIZE]]
+        )
+
+    # 冗余行已删除，更新端点顺序不会违反唯一约束
+    updates = [{"link_id": link_id, **values} for link_id, values in kept.values()]
+    for i in range(0, len(updates), BATCH_SIZE):
+        conn.execute(text(
+            "UPDATE card_links SET source_card_id = :source_card_id, target_card_id = :target_card_id, "
+            "link_type = :link_type, direction = :direction WHERE id = :link_id"
+        ), updates[i:i + BATCH_SIZE])
+
+    if conn.dialect.name == "sqlite":
+        # SQLite 不支持直接添加约束，按模型定义重建表（保留外键级联），再补建索引
+        with op.batch_alter_table("card_links", copy_from=CardLink.__table__, recreate="always"):
+            pass
+        for index in CardLink.__table__.indexes:
+            index.create(conn, checkfirst=True)
+    else:
+        op.create_check_constraint("ck_card_link_order", "card_links", "source_card_id < target_card_id")
+
+    return len(duplicates)
+
+
+def migrate():
+    """执行迁移"""
+    with engine.begin() as conn:
+        removed = migrate_links(conn)
+
+    if removed < 0:
+        print("- card_links 无需迁移")
+    else:
+        print(f"✓ card_links 已合并，删除冗余行 {removed} 条")
+
+    print("卡片链接迁移完成!")
+
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,96 @@
+"""
+图片卡片文件迁移脚本
+
+创建 blobs 表和 cards.blob_id 列，并将图片卡片内容中的 Base64 data URI
+转存到文件存储（UPLOAD_DIR），卡片内容替换为文件下载地址。
+按卡片ID分批处理并逐批提交，中断后重新执行会从剩余的卡片继续。
+
+用法: python scripts/migrate_image_blobs.py
+"""
+import os
+import sys
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import Column, Integer, inspect
+from sqlalchemy.orm import Session
+from app.db.base import engine
+from app.models.blob import Blob
+from app.models.card import Card, CardType
+from app.services.blob_service import BlobService, blob_url
+
+BATCH_SIZE = 100
+
+
+def migrate_schema() -> None:
+    """创建 blobs 表和 cards.blob_id 列（幂等）"""
+    with engine.begin() as conn:
+        Blob.__table__.create(conn, checkfirst=True)
+
+        columns = {column["name"] for column in inspect(conn).get_columns("cards")}
+        if "blob_id" in columns:
+            return
+
+        op = Operations(MigrationContext.configure(conn))
+        op.add_column("cards", Column("blob_id", Integer, nullable=True))
+        op.create_index("ix_cards_blob_id", "cards", ["blob_id"])
+        if conn.dialect.name != "sqlite":
+            # SQLite 不支持为已有表添加外键，删除文件时由服务层置空 blob_id
+            op.create_foreign_key(
+                "fk_cards_blob_id", "cards", "blobs", ["blob_id"], ["id"], ondelete="SET NULL"
+            )
+        print("✓ 已创建 blobs 表和 cards.blob_id 列")
+
+
+def migrate_images() -> int:
+    """
+    转存图片卡片中的 Base64 内容
+
+    Returns:
+        int: 转存的卡片数
+    """
+    moved = 0
+    last_id = 0
+
+    while True:
+        with Session(engine) as db:
+            rows = db.query(Card.id, Card.user_id, Card.content).filter(
+                Card.card_type == CardType.IMAGE,
+                Card.content.like("data:%"),
+                Card.id > last_id
+            ).order_by(Card.id).limit(BATCH_SIZE).all()
+
+            if not rows:
+                break
+
+            for card_id, user_id, content in rows:
+                blob = BlobService.store_data_uri(db, user_id, content)
+                if blob is None:
+                    print(f"- 卡片 {card_id} 的内容不是有效的 Base64 data URI，已跳过")
+                    continue
+
+                db.query(Card).filter(Card.id == card_id).update(
+                    {Card.content: blob_url(blob), Card.blob_id: blob.id},
+                    synchronize_session=False
+                )
+                moved += 1
+
+            db.commit()
+            last_id = rows[-1].id
+            print(f"  已处理到卡片 {last_id}，累计转存 {moved} 张")
+
+    return moved
+
+
+def migrate():
+    """执行迁移"""
+    migrate_schema()
+    moved = migrate_images()
+    print(f"✓ 图片卡片转存完成，共 {moved} 张")
+
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,91 @@
+"""
+看板排序键迁移脚本
+
+将 kanban_columns / kanban_cards 的整数 position 列转换为排序键 rank 列
+（按原 position 顺序均匀分配），并替换对应的唯一约束。
+脚本可重复执行，已迁移的表会被跳过。
+
+用法: python scripts/migrate_kanban_ranks.py
+"""
+import os
+import sys
+from collections import defaultdict
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import Column, String, inspect, text
+from app.db.base import engine
+from app.utils.rank import RANK_MAX_LENGTH, initial_ranks
+
+# (表名, 分组列, 旧唯一约束, 新唯一约束)
+TABLES = [
+    ("kanban_columns", "user_id", "uq_kanban_column_user_position", "uq_kanban_column_user_rank"),
+    ("kanban_cards", "column_id", "uq_kanban_card_column_position", "uq_kanban_card_column_rank"),
+]
+
+
+def migrate_table(conn, table: str, group_column: str, old_constraint: str, new_constraint: str) -> bool:
+    """
+    迁移单张表
+
+    Args:
+        conn: 数据库连接
+        table: 表名
+        group_column: 排序分组列
+        old_constraint: 旧唯一约束名称
+        new_constraint: 新唯一约束名称
+
+    Returns:
+        bool: 是否执行了迁移
+    """
+    columns = {column["name"] for column in inspect(conn).get_columns(table)}
+    if "rank" in columns or "position" not in columns:
+        return False
+
+    op = Operations(MigrationContext.configure(conn))
+    op.add_column(table, Column("rank", String(RANK_MAX_LENGTH), nullable=True))
+
+    # 按原顺序为每组生成均匀分布的排序键
+    rows = conn.execute(text(
+        f"SELECT id, {group_column} FROM {table} ORDER BY {group_column}, position, id"
+    )).all()
+
+    groups = defaultdict(list)
+    for row_id, group in rows:
+        groups[group].append(row_id)
+
+    params = [
+        {"row_id": row_id, "rank": rank}
+        for row_ids in groups.values()
+        for row_id, rank in zip(row_ids, initial_ranks(len(row_ids)))
+    ]
+    if params:
+        conn.execute(text(f"UPDATE {table} SET rank = :rank WHERE id = :row_id"), params)
+
+    # SQLite 不支持直接删除约束列，batch 模式会重建表
+    with op.batch_alter_table(table) as batch:
+        batch.drop_constraint(old_constraint, type_="unique")
+        batch.drop_column("position")
+        batch.alter_column("rank", existing_type=String(RANK_MAX_LENGTH), nullable=False)
+        batch.create_unique_constraint(new_constraint, [group_column, "rank"])
+
+    return True
+
+
+def migrate():
+    """执行迁移"""
+    with engine.begin() as conn:
+        for table, group_column, old_constraint, new_constraint in TABLES:
+            if migrate_table(conn, table, group_column, old_constraint, new_constraint):
+                print(f"✓ {table} 已转换为排序键")
+            else:
+                print(f"- {table} 无需迁移")
+
+    print("看板排序键迁移完成!")
+
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,62 @@
+"""
+恢复脚本（逻辑备份）
+
+用法:
+    python scripts/restore.py <备份文件>                    # 实例备份：按备份中的用户恢复（用户名不能已存在）
+    python scripts/restore.py <备份文件> --user <用户名>    # 单用户备份：恢复到指定用户（该用户需没有数据）
+
+SQLite 数据库快照（backup.py 默认输出）无需本脚本：停止服务后解压覆盖数据库文件即可，
+    gunzip -c pks-xxx.db.gz > pks.db
+"""
+import argparse
+import os
+import sys
+import time
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.base import SessionLocal
+from app.models.user import User
+from app.services.backup_service import restore_archive_sync
+
+# 读取块大小
+CHUNK_SIZE = 1024 * 1024
+
+
+def read_chunks(path: str):
+    """按块读取备份文件"""
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            yield chunk
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PKS 恢复")
+    parser.add_argument("archive", help="备份文件路径")
+    parser.add_argument("--user", help="单用户备份恢复到的用户（用户名）")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        user_id = None
+        if args.user:
+            user = db.query(User).filter(User.username == args.user).first()
+            if user is None:
+                sys.exit(f"用户不存在: {args.user}")
+            user_id = user.id
+
+        try:
+            result = restore_archive_sync(db, read_chunks(args.archive), user_id)
+        except ValueError as e:
+            sys.exit(f"恢复失败: {e}")
+
+    print(f"✓ 恢复完成（{time.perf_counter() - started:.1f} 秒）")
+    for table, count in result["restored"].items():
+        print(f"  {table}: {count}")
+    if result["skipped"]:
+        print(f"  跳过 {result['skipped']} 行（引用的记录缺失）")
+
+
+if __name__ == "__main__":
+    main()
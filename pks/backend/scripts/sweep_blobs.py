@@ -0,0 +1,45 @@
+"""
+孤立文件清理脚本
+
+删除文件记录时文件内容保留在存储中（避免与并发上传相同内容竞争），
+本脚本删除存储中已没有任何文件记录引用的文件。
+只处理最后写入时间早于 --min-age 秒的文件，刚上传尚未登记的文件不会被删除；
+建议在访问量较低时执行。
+
+用法: python scripts/sweep_blobs.py [--min-age 秒] [--dry-run]
+"""
+import argparse
+import os
+import sys
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.base import SessionLocal
+from app.services.blob_service import BlobService
+
+# 默认文件最短存在时间（秒）
+DEFAULT_MIN_AGE = 24 * 60 * 60
+
+
+def main() -> None:
+    """执行清理"""
+    parser = argparse.ArgumentParser(description="删除没有文件记录引用的文件")
+    parser.add_argument("--min-age", type=float, default=DEFAULT_MIN_AGE, help="文件最短存在时间（秒）")
+    parser.add_argument("--dry-run", action="store_true", help="只统计不删除")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        removed = BlobService.sweep_orphans(db, args.min_age, dry_run=args.dry_run)
+    finally:
+        db.close()
+
+    if args.dry_run:
+        print(f"✓ 共 {removed} 个孤立文件（未删除）")
+    else:
+        print(f"✓ 已删除 {removed} 个孤立文件")
+
+
+if __name__ == "__main__":
+    main()
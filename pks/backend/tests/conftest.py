@@ -0,0 +1,41 @@
+"""
+测试配置
+
+使用临时目录中的 SQLite 数据库和上传目录，须在导入 app 之前设置环境变量。
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+_TMP_DIR = tempfile.mkdtemp(prefix="pks-test-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_TMP_DIR}/test.db"
+os.environ["UPLOAD_DIR"] = f"{_TMP_DIR}/uploads"
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+import app.models  # noqa: E402,F401
+from app.db.base import Base, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.services.search_index import SearchIndex  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def client() -> TestClient:
+    """测试客户端（不触发启动事件，直接建表）"""
+    Base.metadata.create_all(engine)
+    SearchIndex.ensure_index(engine)
+    return TestClient(app)
+
+
+@pytest.fixture(scope="session")
+def auth_headers(client: TestClient) -> dict:
+    """已注册用户的认证请求头"""
+    response = client.post("/api/v1/auth/register", json={
+        "username": "tester",
+        "email": "tester@example.com",
+        "password": "secret123"
+    })
+    assert response.status_code == 201, response.text
+    return {"Authorization": f"Bearer {response.json()['data']['access_token']}"}
@@ -0,0 +1,25 @@
+"""
+游标分页测试
+"""
+from datetime import datetime
+
+import pytest
+from app.schemas.common import PaginatedResponse
+from app.utils.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_roundtrip():
+    cursor = encode_cursor([datetime(2025, 1, 8, 10, 0, 0), 42], "created_at:desc")
+    assert decode_cursor(cursor, "created_at:desc") == ["2025-01-08T10:00:00", 42]
+
+
+def test_cursor_rejects_other_sort():
+    cursor = encode_cursor(["标题", 7], "title:asc")
+    with pytest.raises(ValueError, match="排序方式"):
+        decode_cursor(cursor, "title:desc")
+
+
+def test_schema_example_cursor_is_accepted():
+    # OpenAPI 文档中的示例游标应能被卡片列表的默认排序（created_at:desc）接受
+    example = PaginatedResponse.model_config["json_schema_extra"]["example"]["next_cursor"]
+    assert decode_cursor(example, "created_at:desc") == ["2025-01-08T10:00:00", 42]
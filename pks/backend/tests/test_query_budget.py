@@ -0,0 +1,119 @@
+"""
+接口查询预算测试
+
+pytest 下查询预算生效且超出时抛出 QueryBudgetExceeded（TestClient 会重新抛出），
+因此接口引入逐行查询（N+1）或语句数超出 @query_budget 声明时这些测试会失败。
+数据量取得比 QUERY_BUDGET_MAX_REPEATS 大，逐行查询才会被发现。
+"""
+import pytest
+from app.core.query_budget import QueryBudgetExceeded, budget_enabled, query_budget
+from app.db.base import SessionLocal
+from app.models.tag import Tag
+
+TAG_COUNT = 12
+CARD_COUNT = 8
+
+
+@pytest.fixture(scope="module")
+def tag_ids(client, auth_headers):
+    ids = []
+    for i in range(TAG_COUNT):
+        response = client.post("/api/v1/tags", json={"name": f"budget-{i}"}, headers=auth_headers)
+        assert response.status_code == 201, response.text
+        ids.append(response.json()["data"]["id"])
+    return ids
+
+
+@pytest.fixture(scope="module")
+def card_ids(client, auth_headers, tag_ids):
+    ids = []
+    for i in range(CARD_COUNT):
+        response = client.post("/api/v1/cards", json={
+            "title": f"卡片{i}",
+            "content": "内容",
+            "card_type": "note",
+            "tag_ids": tag_ids
+        }, headers=auth_headers)
+        assert response.status_code == 201, response.text
+        ids.append(response.json()["data"]["id"])
+    return ids
+
+
+@pytest.fixture(scope="module")
+def linked_card(client, auth_headers, tag_ids, card_ids):
+    response = client.post("/api/v1/cards", json={
+        "title": "关联卡片",
+        "content": "内容",
+        "card_type": "note",
+        "tag_ids": tag_ids,
+        "link_ids": card_ids
+    }, headers=auth_headers)
+    assert response.status_code == 201, response.text
+    return response.json()["data"]
+
+
+@pytest.fixture(scope="module")
+def linked_card_id(linked_card):
+    return linked_card["id"]
+
+
+def test_budget_enabled_under_pytest(client):
+    assert budget_enabled()
+
+    db = SessionLocal()
+    try:
+        with pytest.raises(QueryBudgetExceeded):
+            with query_budget(1):
+                db.query(Tag).count()
+                db.query(Tag).count()
+    finally:
+        db.close()
+
+
+def test_create_card(linked_card):
+    # 创建卡片（含标签和关联）在 fixture 中完成
+    assert len(linked_card["tags"]) == TAG_COUNT
+
+
+def test_get_card(client, auth_headers, linked_card_id):
+    response = client.get(f"/api/v1/cards/{linked_card_id}", headers=auth_headers)
+    assert response.status_code == 200, response.text
+    assert len(response.json()["data"]["links"]["outgoing"]) == CARD_COUNT
+
+
+def test_update_card(client, auth_headers, linked_card_id, tag_ids):
+    response = client.put(f"/api/v1/cards/{linked_card_id}", json={
+        "title": "关联卡片（已更新）",
+        "tag_ids": tag_ids[:TAG_COUNT // 2]
+    }, headers=auth_headers)
+    assert response.status_code == 200, response.text
+    assert len(response.json()["data"]["tags"]) == TAG_COUNT // 2
+
+
+def test_get_card_links(client, auth_headers, linked_card_id):
+    response = client.get(f"/api/v1/cards/{linked_card_id}/links", headers=auth_headers)
+    assert response.status_code == 200, response.text
+    assert len(response.json()["data"]["outgoing"]) == CARD_COUNT
+
+
+def test_batch_tag_cards(client, auth_headers, card_ids, tag_ids):
+    response = client.post("/api/v1/cards/batch-tag", json={
+        "card_ids": card_ids,
+        "tag_ids": tag_ids
+    }, headers=auth_headers)
+    assert response.status_code == 200, response.text
+
+
+def test_get_kanban_board(client, auth_headers, card_ids):
+    columns = client.get("/api/v1/kanban", headers=auth_headers).json()["data"]["columns"]
+    response = client.post("/api/v1/kanban/cards/batch-move", json={
+        "card_ids": card_ids,
+        "target_column_id": columns[0]["id"]
+    }, headers=auth_headers)
+    assert response.status_code == 200, response.text
+
+    # 移动后响应缓存已失效，看板接口会重新执行
+    response = client.get("/api/v1/kanban", headers=auth_headers)
+    assert response.status_code == 200, response.text
+    board = response.json()["data"]["columns"]
+    assert len(board[0]["cards"]) == CARD_COUNT
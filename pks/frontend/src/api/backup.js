@@ -0,0 +1,27 @@
+import request from './index'
+
+/**
+ * 下载当前用户的备份（gzip 压缩的 NDJSON）
+ */
+export function downloadBackup() {
+  return request({
+    url: '/backup',
+    method: 'get',
+    responseType: 'blob',
+    timeout: 0
+  })
+}
+
+/**
+ * 从备份恢复到当前用户（当前用户需没有卡片、标签和看板列）
+ * @param {Blob} file - 备份文件
+ */
+export function restoreBackup(file) {
+  return request({
+    url: '/backup/restore',
+    method: 'post',
+    data: file,
+    headers: { 'Content-Type': 'application/gzip' },
+    timeout: 0
+  })
+}
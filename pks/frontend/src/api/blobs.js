@@ -0,0 +1,39 @@
+import request from './index'
+
+/**
+ * 上传文件（返回的 url 可作为图片卡片的内容）
+ * @param {File} file - 文件
+ */
+export function uploadBlob(file) {
+  const data = new FormData()
+  data.append('file', file)
+  return request({
+    url: '/blobs',
+    method: 'post',
+    data,
+    headers: { 'Content-Type': 'multipart/form-data' }
+  })
+}
+
+/**
+ * 删除文件
+ * @param {number} blobId - 文件 ID
+ */
+export function deleteBlob(blobId) {
+  return request({
+    url: `/blobs/${blobId}`,
+    method: 'delete'
+  })
+}
+
+/**
+ * 带认证下载文件内容（<img> 无法携带 Authorization 头，需先下载再生成对象 URL）
+ * @param {string} url - 文件下载地址（/api/v1/blobs/{id}）
+ */
+export function fetchBlob(url) {
+  return request({
+    url: url.replace(/^\/api\/v1/, ''),
+    method: 'get',
+    responseType: 'blob'
+  })
+}
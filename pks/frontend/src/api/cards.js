@@ -86,3 +86,45 @@ export function batchTagCards(cardIds, tagIds) {
     }
   })
 }
+
+/**
+ * 批量移除卡片标签
+ * @param {Array<number>} cardIds - 卡片 ID 数组
+ * @param {Array<number>} tagIds - 标签 ID 数组
+ */
+export function batchUntagCards(cardIds, tagIds) {
+  return request({
+    url: '/cards/batch-untag',
+    method: 'post',
+    data: {
+      card_ids: cardIds,
+      tag_ids: tagIds
+    }
+  })
+}
+
+/**
+ * 批量导入卡片、标签和链接
+ * @param {Blob|string} data - NDJSON（每行一条记录）或 JSON 数组，格式与导出一致
+ */
+export function importCards(data) {
+  return request({
+    url: '/cards/import',
+    method: 'post',
+    data,
+    headers: { 'Content-Type': 'application/x-ndjson' },
+    timeout: 0
+  })
+}
+
+/**
+ * 导出全部标签、卡片和链接（NDJSON）
+ */
+export function exportCards() {
+  return request({
+    url: '/cards/export',
+    method: 'get',
+    responseType: 'blob',
+    timeout: 0
+  })
+}
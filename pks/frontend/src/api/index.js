@@ -31,6 +31,11 @@ request.interceptors.response.use(
   response => {
     const res = response.data
 
+    // 文件下载（如导出）直接返回内容
+    if (response.config.responseType === 'blob') {
+      return res
+    }
+
     // 如果 code 为 0，表示成功
     if (res.code === 0) {
       return res.data
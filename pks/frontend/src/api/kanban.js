@@ -2,11 +2,26 @@ import request from './index'
 
 /**
  * 获取看板配置
+ * @param {Object} params - 查询参数（cards_limit: 每列最多返回的卡片数）
  */
-export function getKanban() {
+export function getKanban(params) {
   return request({
     url: '/kanban',
-    method: 'get'
+    method: 'get',
+    params
+  })
+}
+
+/**
+ * 加载看板列中的更多卡片
+ * @param {number} columnId - 列 ID
+ * @param {Object} params - 查询参数（cursor, limit）
+ */
+export function getKanbanColumnCards(columnId, params) {
+  return request({
+    url: `/kanban/columns/${columnId}/cards`,
+    method: 'get',
+    params
   })
 }
 
@@ -73,3 +88,15 @@ export function batchMoveCards(cardIds, targetColumnId) {
     }
   })
 }
+
+/**
+ * 按顺序提交一次拖拽会话中的多个移动操作
+ * @param {Array<Object>} moves - 移动操作数组（card_id, column_id, position）
+ */
+export function applyKanbanMoves(moves) {
+  return request({
+    url: '/kanban/cards/moves',
+    method: 'post',
+    data: { moves }
+  })
+}
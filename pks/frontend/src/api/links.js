@@ -39,3 +39,44 @@ export function deleteCardLink(cardId, targetCardId) {
     method: 'delete'
   })
 }
+
+/**
+ * 获取卡片的 k 跳邻域
+ * @param {number} cardId - 中心卡片 ID
+ * @param {Object} params - 查询参数
+ * @param {number} params.depth - 最大跳数
+ * @param {number} params.limit - 最多返回的节点数
+ */
+export function getCardGraph(cardId, params) {
+  return request({
+    url: `/cards/${cardId}/graph`,
+    method: 'get',
+    params
+  })
+}
+
+/**
+ * 获取两张卡片之间的最短链接路径
+ * @param {number} cardId - 起点卡片 ID
+ * @param {number} targetCardId - 终点卡片 ID
+ * @param {Object} params - 查询参数
+ */
+export function getCardPath(cardId, targetCardId, params) {
+  return request({
+    url: `/cards/${cardId}/path/${targetCardId}`,
+    method: 'get',
+    params
+  })
+}
+
+/**
+ * 获取链接图的连通分量
+ * @param {Object} params - 查询参数
+ */
+export function getGraphComponents(params) {
+  return request({
+    url: '/cards/graph/components',
+    method: 'get',
+    params
+  })
+}
@@ -24,6 +24,16 @@ export function getTags(params) {
   })
 }
 
+/**
+ * 获取完整标签树
+ */
+export function getTagTree() {
+  return request({
+    url: '/tags/tree',
+    method: 'get'
+  })
+}
+
 /**
  * 获取标签详情
  * @param {number} tagId - 标签 ID
@@ -0,0 +1,43 @@
+import { ref, watch, onBeforeUnmount } from 'vue'
+import { fetchBlob } from '@/api/blobs'
+
+const BLOB_URL = /^\/api\/v1\/blobs\/\d+$/
+
+/**
+ * 将需要认证的文件下载地址转换为可用于 <img src> 的对象 URL
+ * 其他地址（data URI、外部链接）原样返回；组件卸载或地址变化时释放对象 URL
+ * @param {import('vue').Ref<string>} source - 图片地址
+ */
+export function useBlobUrl(source) {
+  const src = ref('')
+  let objectUrl = null
+
+  const release = () => {
+    if (objectUrl) {
+      URL.revokeObjectURL(objectUrl)
+      objectUrl = null
+    }
+  }
+
+  watch(source, async (url) => {
+    release()
+    src.value = ''
+    if (!url || !BLOB_URL.test(url)) {
+      src.value = url || ''
+      return
+    }
+
+    try {
+      const data = await fetchBlob(url)
+      if (source.value !== url) return
+      objectUrl = URL.createObjectURL(data)
+      src.value = objectUrl
+    } catch (error) {
+      console.error('加载图片失败:', error)
+    }
+  }, { immediate: true })
+
+  onBeforeUnmount(release)
+
+  return src
+}